@@ -1,16 +1,29 @@
 import streamlit as st
-import json
-from fpdf import FPDF
-import io
-import zipfile
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import copy
 from datetime import datetime
-import docx
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_TABLE_ALIGNMENT
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import base64
+import os
+import uuid
+from concurrent.futures import BrokenExecutor
+from cvbuilder.templates import LAYOUTS, THEME_COLORS, FONTS, DEFAULT_SETTINGS, SETTING_RANGES, empty_cv_data, normalize_cv_data
+from cvbuilder.analysis import analyze
+from cvbuilder.matching import JobIndex, split_postings
+from cvbuilder.ranking import CVIndex
+from cvbuilder.preview import get_html_preview_enhanced
+from cvbuilder.text import generate_plain_text
+from cvbuilder.render import RENDERERS
+from cvbuilder.package import build_package
+from cvbuilder.photo import PHOTOS
+from cvbuilder.pagination import estimate_pages
+from cvbuilder.cache import RenderCache
+from cvbuilder.artifacts import ArtifactCache
+from cvbuilder.history import EditHistory
+from cvbuilder.serialize import SchemaError, dumps_binary, dumps_json, loads as load_backup
+from cvbuilder.resume import ResumeError, cached_resume, merge_resume, parse_resume, remember_resume, resume_key
+from cvbuilder.export import get_export_job, process_pool, ExportQueue, QueueFull, queued, FAILED, READY, INTERACTIVE, BATCH
+from cvbuilder.instrument import Profiler
+from cvbuilder.store import open_store, Autosaver, UUID_CV_ID_PATTERN, EDIT_TOKEN_PATTERN, anonymous_owner, new_edit_token
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(
@@ -25,890 +38,193 @@ st.set_page_config(
     }
 )
 
-# --- STATE MANAGEMENT ---
-if 'cv_data' not in st.session_state:
-    st.session_state.cv_data = {
-        'personal_info': {
-            'nama': '', 'email': '', 'telepon': '', 'alamat': '',
-            'linkedin': '', 'github': '', 'website': '', 'posisi_target': '',
-            'foto': None
-        },
-        'ringkasan': '',
-        'pengalaman': [],
-        'pendidikan': [],
-        'keahlian': [],
-        'sertifikasi': [],
-        'proyek': [],
-        'bahasa': [],
-        'hobi': []
-    }
-
-if 'settings' not in st.session_state:
-    st.session_state.settings = {
-        'template_style': 'modern_sidebar',
-        'font_family': 'Helvetica',
-        'base_color': '#2563eb',
-        'accent_color': '#1e40af',
-        'font_size_body': 10,
-        'font_size_header': 24,
-        'section_spacing': 5,
-        'show_icons': True,
-        'theme': 'light',
-        'ats_friendly': True
-    }
+# --- PENYIMPANAN (SQLite WAL, fallback ke file) ---
+@st.cache_resource
+def get_store():
+    return open_store()
 
-# --- DATA TEMPLATES & PRESETS ---
-LAYOUTS = {
-    'modern_sidebar': {'name': 'Modern Sidebar', 'type': '2_column', 'ats_score': 85},
-    'classic_vertical': {'name': 'ATS Professional', 'type': '1_column', 'ats_score': 95},
-    'minimal_clean': {'name': 'Minimalist Clean', 'type': '1_column_compact', 'ats_score': 80},
-    'executive': {'name': 'Executive Style', 'type': '2_column', 'ats_score': 90},
-    'creative': {'name': 'Creative Portfolio', 'type': 'creative', 'ats_score': 70}
-}
+@st.cache_resource
+def get_autosaver():
+    return Autosaver(get_store())
 
-THEME_COLORS = {
-    'professional_blue': {'primary': '#1e40af', 'secondary': '#3b82f6'},
-    'corporate_gray': {'primary': '#374151', 'secondary': '#6b7280'},
-    'green_teal': {'primary': '#0f766e', 'secondary': '#14b8a6'},
-    'purple_premium': {'primary': '#7c3aed', 'secondary': '#a78bfa'},
-    'red_passion': {'primary': '#dc2626', 'secondary': '#ef4444'}
-}
-
-FONTS = {
-    'Helvetica': {'pdf': 'Helvetica', 'docx': 'Calibri'},
-    'Times': {'pdf': 'Times', 'docx': 'Times New Roman'},
-    'Arial': {'pdf': 'Arial', 'docx': 'Arial'},
-    'Georgia': {'pdf': 'Georgia', 'docx': 'Georgia'},
-    'Verdana': {'pdf': 'Verdana', 'docx': 'Verdana'}
-}
-
-# --- FUNGSI HELPER ---
-def hex_to_rgb(hex_color):
+def current_user_id():
     try:
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 6:
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        elif len(hex_color) == 3:
-            return tuple(int(hex_color[i:i+1]*2, 16) for i in (0, 1, 2))
-        else:
-            return (37, 99, 235)
-    except:
-        return (37, 99, 235)
-
-def calculate_ats_score(data):
-    score = 0
-    max_score = 100
-    
-    if data['personal_info']['nama']: score += 10
-    if data['personal_info']['email']: score += 10
-    if data['personal_info']['posisi_target']: score += 10
-    if data['ringkasan']: score += 10
-    
-    if len(data['pengalaman']) >= 1: score += 15
-    if len(data['pengalaman']) >= 3: score += 10
-    
-    if len(data['pendidikan']) >= 1: score += 10
-    
-    if len(data['keahlian']) >= 5: score += 15
-    if len(data['keahlian']) >= 10: score += 10
-    
-    keywords = ['managed', 'developed', 'created', 'improved', 'increased', 'reduced']
-    summary_text = data['ringkasan'].lower()
-    for keyword in keywords:
-        if keyword in summary_text:
-            score += 5
-            break
-    
-    return min(score, 100)
+        return st.user.email if st.user.is_logged_in else None
+    except Exception:
+        return None
+
+def current_user_in(env_var):
+    # Role lewat env var berisi daftar email (dipisah koma); visitor anonim tidak pernah punya role.
+    user = current_user_id()
+    return user is not None and user in {e.strip() for e in os.environ.get(env_var, '').split(',') if e.strip()}
+
+def current_owner():
+    # Pemilik CV: email user yang login. Visitor anonim membuktikan kepemilikan dengan edit token acak (?edit=...)
+    # yang terpisah dari id CV; di store hanya hash token itu yang disimpan.
+    user = current_user_id()
+    if user is not None:
+        return user
+    token = st.query_params.get('edit')
+    if not token or not EDIT_TOKEN_PATTERN.match(token):
+        token = new_edit_token()
+        st.query_params['edit'] = token
+    return anonymous_owner(token)
+
+store = get_store()
+autosaver = get_autosaver()
+owner = current_owner()
+
+# CV id ada di URL (?cv=...), jadi reload halaman memuat CV yang sama. Hanya id uuid4 yang diterima,
+# dan CV milik orang lain (user lain, atau tanpa edit token yang cocok) tidak dimuat dan tidak ditimpa:
+# sesi itu dapat id baru.
+cv_id = st.query_params.get('cv')
+if not cv_id or not UUID_CV_ID_PATTERN.match(cv_id):
+    cv_id = uuid.uuid4().hex
+    st.query_params['cv'] = cv_id
 
-# --- PDF GENERATOR ENHANCED ---
-class CVPDF(FPDF):
-    def header(self):
-        pass
-    
-    def footer(self):
-        self.set_y(-15)
-        font_family = st.session_state.settings['font_family']
-        if font_family in FONTS:
-            font_family = FONTS[font_family]['pdf']
-        self.set_font(font_family, 'I', 8)
-        self.set_text_color(128)
-        self.cell(0, 10, f"Generated by CV Builder Pro Ultra - Page {self.page_no()}", 0, 0, 'C')
-    
-    # ✅ TAMBAHKAN METHOD CIRCLE UNTUK TEMPLATE CREATIVE
-    def circle(self, x, y, r, style='D'):
-        """Draw a circle using ellipse (FPDF doesn't have native circle)"""
-        self.ellipse(x - r, y - r, 2 * r, 2 * r, style)
+# --- STATE MANAGEMENT ---
+if st.session_state.get('cv_id') != cv_id:
+    record = store.load(cv_id)
+    if record is not None and record.user_id != owner:
+        record = None
+        cv_id = uuid.uuid4().hex
+        st.query_params['cv'] = cv_id
+    if record is not None:
+        st.session_state.cv_data = normalize_cv_data(record.data)
+        st.session_state.settings = dict(DEFAULT_SETTINGS, **record.settings)
+        st.session_state.history = EditHistory(st.session_state.cv_data)
+        autosaver.mark_saved(cv_id, st.session_state.cv_data, st.session_state.settings, owner,
+                             st.session_state.history.version)
+    st.session_state.cv_stored = record is not None
+    st.session_state.cv_id = cv_id
 
-def generate_pdf_enhanced(data, settings):
-    pdf = CVPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    
-    font = settings['font_family']
-    if font in FONTS:
-        font = FONTS[font]['pdf']
-    
-    try:
-        r_prim, g_prim, b_prim = hex_to_rgb(settings['base_color'])
-        r_sec, g_sec, b_sec = hex_to_rgb(settings['accent_color'])
-    except:
-        r_prim, g_prim, b_prim = (37, 99, 235)
-        r_sec, g_sec, b_sec = (30, 64, 175)
-    
-    # EXECUTIVE TEMPLATE
-    if settings['template_style'] == 'executive':
-        pdf.set_fill_color(r_prim, g_prim, b_prim)
-        pdf.rect(0, 0, 210, 40, 'F')
-        
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font(font, 'B', 28)
-        pdf.set_xy(20, 12)
-        pdf.cell(0, 10, data['personal_info']['nama'].upper() if data['personal_info']['nama'] else "YOUR NAME", ln=True)
-        
-        pdf.set_text_color(50, 50, 50)
-        pdf.set_font(font, '', 10)
-        pdf.set_xy(20, 45)
-        contact_items = []
-        if data['personal_info']['email']: contact_items.append(f"✉️ {data['personal_info']['email']}")
-        if data['personal_info']['telepon']: contact_items.append(f"📱 {data['personal_info']['telepon']}")
-        if data['personal_info']['linkedin']: contact_items.append(f"🔗 {data['personal_info']['linkedin']}")
-        pdf.cell(0, 6, " | ".join(contact_items) if contact_items else "Add your contact information", ln=True)
-        
-        pdf.set_xy(20, 60)
-        
-        pdf.set_font(font, 'B', 16)
-        pdf.set_text_color(r_prim, g_prim, b_prim)
-        pdf.cell(85, 10, "PROFESSIONAL SUMMARY", ln=True)
-        pdf.set_font(font, '', settings['font_size_body'])
-        pdf.set_text_color(0, 0, 0)
-        pdf.multi_cell(85, 5, data['ringkasan'] if data['ringkasan'] else "Add your professional summary here.")
-        pdf.ln(5)
-        
-        if data['pengalaman']:
-            pdf.set_font(font, 'B', 16)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(85, 10, "WORK EXPERIENCE", ln=True)
-            
-            for exp in data['pengalaman']:
-                pdf.set_font(font, 'B', 12)
-                pdf.set_text_color(0, 0, 0)
-                pdf.cell(85, 6, exp.get('posisi', 'Position'), ln=True)
-                
-                pdf.set_font(font, 'I', 10)
-                pdf.set_text_color(r_sec, g_sec, b_sec)
-                pdf.cell(85, 5, f"{exp.get('perusahaan', 'Company')} | {exp.get('periode', 'Period')}", ln=True)
-                
-                pdf.set_font(font, '', 9)
-                pdf.set_text_color(0, 0, 0)
-                pdf.multi_cell(85, 4, exp.get('deskripsi', 'Description'))
-                pdf.ln(2)
-        
-        pdf.set_xy(115, 60)
-        
-        if data['keahlian']:
-            pdf.set_font(font, 'B', 16)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(85, 10, "KEY SKILLS", ln=True)
-            
-            pdf.set_font(font, '', 10)
-            pdf.set_text_color(0, 0, 0)
-            for skill in data['keahlian']:
-                pdf.cell(85, 6, f"• {skill}", ln=True)
-            
-            pdf.ln(5)
-        
-        if data['pendidikan']:
-            pdf.set_font(font, 'B', 16)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(85, 10, "EDUCATION", ln=True)
-            
-            for edu in data['pendidikan']:
-                pdf.set_font(font, 'B', 11)
-                pdf.set_text_color(0, 0, 0)
-                pdf.cell(85, 6, edu.get('institusi', 'Institution'), ln=True)
-                
-                pdf.set_font(font, '', 10)
-                pdf.set_text_color(r_sec, g_sec, b_sec)
-                pdf.cell(85, 5, f"{edu.get('gelar', 'Degree')} | {edu.get('tahun', 'Year')}", ln=True)
-                pdf.ln(2)
-    
-    # CREATIVE TEMPLATE
-    elif settings['template_style'] == 'creative':
-        pdf.set_fill_color(r_prim, g_prim, b_prim)
-        pdf.rect(0, 0, 210, 80, 'F')
-        
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font(font, 'B', 36)
-        pdf.set_xy(20, 30)
-        pdf.cell(0, 15, data['personal_info']['nama'] if data['personal_info']['nama'] else "YOUR NAME", ln=True)
-        
-        if data['personal_info']['posisi_target']:
-            pdf.set_font(font, 'I', 18)
-            pdf.set_text_color(255, 255, 200)
-            pdf.set_x(20)
-            pdf.cell(0, 10, data['personal_info']['posisi_target'], ln=True)
-        
-        pdf.set_xy(20, 90)
-        
-        contact_info = [
-            data['personal_info']['email'],
-            data['personal_info']['telepon'],
-            data['personal_info']['alamat']
-        ]
-        valid_contacts = [c for c in contact_info if c]
-        for i, contact in enumerate(valid_contacts):
-            pdf.set_font(font, '', 10)
-            pdf.set_text_color(0, 0, 0)
-            pdf.cell(55, 8, contact, border=1, fill=True, ln=False)
-            if i < len(valid_contacts) - 1:
-                pdf.cell(5)
-        
-        if valid_contacts:
-            pdf.ln(15)
-        else:
-            pdf.ln(5)
-        
-        if data['ringkasan']:
-            pdf.set_font(font, 'B', 14)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(0, 8, "✨ ABOUT ME", ln=True)
-            pdf.set_font(font, '', 11)
-            pdf.set_text_color(0, 0, 0)
-            pdf.multi_cell(0, 5, data['ringkasan'])
-            pdf.ln(10)
-        
-        if data['pengalaman']:
-            pdf.set_font(font, 'B', 14)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(0, 8, "📈 EXPERIENCE TIMELINE", ln=True)
-            
-            for i, exp in enumerate(data['pengalaman']):
-                pdf.set_fill_color(r_prim, g_prim, b_prim)
-                pdf.circle(25, pdf.get_y() + 5, 2, style='F')  # ✅ SEKARANG WORKING!
-                
-                pdf.set_font(font, 'B', 12)
-                pdf.set_text_color(0, 0, 0)
-                pdf.set_x(35)
-                pdf.cell(0, 6, exp.get('posisi', 'Position'), ln=True)
-                
-                pdf.set_font(font, 'I', 10)
-                pdf.set_text_color(100, 100, 100)
-                pdf.set_x(35)
-                pdf.cell(0, 5, f"{exp.get('perusahaan', 'Company')} • {exp.get('periode', 'Period')}", ln=True)
-                
-                pdf.set_font(font, '', 10)
-                pdf.set_text_color(0, 0, 0)
-                pdf.set_x(35)
-                pdf.multi_cell(0, 5, exp.get('deskripsi', 'Description'))
-                pdf.ln(5)
-    
-    # DEFAULT TEMPLATE (modern_sidebar, minimal_clean, etc.)
-    else:
-        pdf.set_font(font, 'B', 24)
-        pdf.set_text_color(r_prim, g_prim, b_prim)
-        pdf.cell(0, 10, data['personal_info']['nama'] if data['personal_info']['nama'] else "YOUR NAME", ln=True)
-        
-        if data['personal_info']['posisi_target']:
-            pdf.set_font(font, 'B', 14)
-            pdf.set_text_color(r_sec, g_sec, b_sec)
-            pdf.cell(0, 8, data['personal_info']['posisi_target'], ln=True)
-        
-        pdf.ln(5)
-        
-        pdf.set_font(font, '', 10)
-        pdf.set_text_color(100, 100, 100)
-        contact_items = []
-        if data['personal_info']['email']: contact_items.append(data['personal_info']['email'])
-        if data['personal_info']['telepon']: contact_items.append(data['personal_info']['telepon'])
-        if data['personal_info']['alamat']: contact_items.append(data['personal_info']['alamat'])
-        
-        if contact_items:
-            pdf.cell(0, 6, " | ".join(contact_items), ln=True)
-        pdf.ln(10)
-        
-        if data['ringkasan']:
-            pdf.set_font(font, 'B', 12)
-            pdf.set_text_color(0, 0, 0)
-            pdf.cell(0, 8, "PROFESSIONAL SUMMARY", ln=True)
-            pdf.set_font(font, '', settings['font_size_body'])
-            pdf.multi_cell(0, 5, data['ringkasan'])
-            pdf.ln(10)
-        
-        if data['pengalaman']:
-            pdf.set_font(font, 'B', 12)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(0, 8, "WORK EXPERIENCE", ln=True)
-            
-            for exp in data['pengalaman']:
-                pdf.set_font(font, 'B', 11)
-                pdf.set_text_color(0, 0, 0)
-                pdf.cell(0, 6, exp.get('posisi', 'Position'), ln=True)
-                
-                pdf.set_font(font, 'I', 10)
-                pdf.set_text_color(r_sec, g_sec, b_sec)
-                pdf.cell(0, 5, f"{exp.get('perusahaan', 'Company')} | {exp.get('periode', 'Period')}", ln=True)
-                
-                pdf.set_font(font, '', settings['font_size_body'])
-                pdf.set_text_color(0, 0, 0)
-                pdf.multi_cell(0, 5, exp.get('deskripsi', 'Description'))
-                pdf.ln(3)
-        
-        if data['pendidikan']:
-            pdf.set_font(font, 'B', 12)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(0, 8, "EDUCATION", ln=True)
-            
-            for edu in data['pendidikan']:
-                pdf.set_font(font, 'B', 11)
-                pdf.set_text_color(0, 0, 0)
-                pdf.cell(0, 6, edu.get('institusi', 'Institution'), ln=True)
-                
-                pdf.set_font(font, '', 10)
-                pdf.set_text_color(r_sec, g_sec, b_sec)
-                pdf.cell(0, 5, f"{edu.get('gelar', 'Degree')} | {edu.get('tahun', 'Year')}", ln=True)
-                pdf.ln(2)
-        
-        if data['keahlian']:
-            pdf.set_font(font, 'B', 12)
-            pdf.set_text_color(r_prim, g_prim, b_prim)
-            pdf.cell(0, 8, "SKILLS", ln=True)
-            
-            pdf.set_font(font, '', 10)
-            pdf.set_text_color(0, 0, 0)
-            skills_text = ", ".join(data['keahlian'][:15])
-            pdf.multi_cell(0, 5, skills_text)
-    
-    pdf_bytes = pdf.output(dest='S')
-    buffer = io.BytesIO(pdf_bytes)
-    buffer.seek(0)
-    return buffer
+if 'cv_data' not in st.session_state:
+    st.session_state.cv_data = empty_cv_data()
 
-# --- WORD DOCX GENERATOR ---
-def generate_word_doc(data, settings):
-    doc = docx.Document()
-    doc.core_properties.author = "CV Builder Pro Ultra"
-    doc.core_properties.title = f"CV - {data['personal_info']['nama']}"
-    
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(0.5)
-        section.bottom_margin = Inches(0.5)
-        section.left_margin = Inches(0.5)
-        section.right_margin = Inches(0.5)
-    
-    if settings['template_style'] == 'classic_vertical':
-        generate_word_classic(doc, data, settings)
-    elif settings['template_style'] == 'executive':
-        generate_word_executive(doc, data, settings)
-    elif settings['template_style'] == 'creative':
-        generate_word_creative(doc, data, settings)
-    else:
-        generate_word_modern(doc, data, settings)
-    
-    pdf_str = pdf.output(dest='S')
-    pdf_bytes = pdf_str.encode('latin1')
-    buffer = io.BytesIO(pdf_bytes)
-    buffer.seek(0)
-    return buffer
+# --- UNDO/REDO (diff per langkah edit, bukan snapshot penuh) ---
+if 'history' not in st.session_state:
+    st.session_state.history = EditHistory(st.session_state.cv_data)
 
-# [Fungsi Word generator tetap sama seperti di file asli — tidak ada error kritis]
-# Untuk efisiensi, saya pertahankan struktur asli karena sudah benar
-def generate_word_executive(doc, data, settings):
-    try:
-        r_prim, g_prim, b_prim = hex_to_rgb(settings['base_color'])
-        r_sec, g_sec, b_sec = hex_to_rgb(settings['accent_color'])
-    except:
-        r_prim, g_prim, b_prim = (37, 99, 235)
-        r_sec, g_sec, b_sec = (30, 64, 175)
-    
-    header = doc.add_paragraph()
-    header_run = header.add_run(data['personal_info']['nama'].upper() if data['personal_info']['nama'] else "YOUR NAME")
-    header_run.font.size = Pt(28)
-    header_run.font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-    header_run.font.bold = True
-    header.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    
-    if data['personal_info']['posisi_target']:
-        position = doc.add_paragraph(data['personal_info']['posisi_target'])
-        position.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        position_run = position.runs[0]
-        position_run.font.size = Pt(14)
-        position_run.font.color.rgb = RGBColor(r_sec, g_sec, b_sec)
-        position_run.italic = True
-    
-    contact_info = []
-    if data['personal_info']['email']: contact_info.append(data['personal_info']['email'])
-    if data['personal_info']['telepon']: contact_info.append(data['personal_info']['telepon'])
-    if data['personal_info']['alamat']: contact_info.append(data['personal_info']['alamat'])
-    
-    if contact_info:
-        contact = doc.add_paragraph(" | ".join(contact_info))
-        contact.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        contact.runs[0].font.size = Pt(10)
-        doc.add_paragraph()
-    
-    p = doc.add_paragraph()
-    p.add_run().add_break()
-    
-    table = doc.add_table(rows=1, cols=2)
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = False
-    table.columns[0].width = Inches(4)
-    table.columns[1].width = Inches(2.5)
-    
-    left_cell = table.cell(0, 0)
-    left_cell.paragraphs[0].add_run("PROFESSIONAL SUMMARY").bold = True
-    left_cell.paragraphs[0].runs[0].font.size = Pt(12)
-    left_cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-    left_cell.add_paragraph(data['ringkasan'] if data['ringkasan'] else "Add your professional summary here.")
-    
-    if data['pengalaman']:
-        left_cell.add_paragraph().add_run("WORK EXPERIENCE").bold = True
-        left_cell.paragraphs[-1].runs[0].font.size = Pt(12)
-        left_cell.paragraphs[-1].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for exp in data['pengalaman']:
-            p = left_cell.add_paragraph()
-            p.add_run(f"{exp.get('posisi', 'Position')}\n").bold = True
-            p.add_run(f"{exp.get('perusahaan', 'Company')} | {exp.get('periode', 'Period')}\n").italic = True
-            p.add_run(f"{exp.get('deskripsi', 'Description')}")
-            p.paragraph_format.space_after = Pt(8)
-    
-    right_cell = table.cell(0, 1)
-    if data['keahlian']:
-        right_cell.paragraphs[0].add_run("KEY SKILLS").bold = True
-        right_cell.paragraphs[0].runs[0].font.size = Pt(12)
-        right_cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for skill in data['keahlian'][:10]:
-            right_cell.add_paragraph(f"• {skill}")
-    
-    if data['pendidikan']:
-        right_cell.add_paragraph().add_run("EDUCATION").bold = True
-        right_cell.paragraphs[-1].runs[0].font.size = Pt(12)
-        right_cell.paragraphs[-1].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for edu in data['pendidikan']:
-            p = right_cell.add_paragraph()
-            p.add_run(f"{edu.get('institusi', 'Institution')}\n").bold = True
-            p.add_run(f"{edu.get('gelar', 'Degree')} | {edu.get('tahun', 'Year')}")
-            p.paragraph_format.space_after = Pt(6)
+FORM_WIDGET_KEYS = ('name_input', 'email_input', 'phone_input', 'position_input', 'linkedin_input', 'location_input',
+                    'summary_input', 'skills_input', 'lang_input')
+FORM_WIDGET_PREFIXES = ('pos_', 'comp_', 'period_', 'desc_', 'inst_', 'degree_', 'year_', 'edu_desc_')
+DESIGN_WIDGET_KEYS = ('layout_select', 'theme_select', 'theme_mode', 'base_color_picker', 'accent_color_picker',
+                      'font_select', 'font_size_slider')
 
-def generate_word_classic(doc, data, settings):
-    try:
-        r_prim, g_prim, b_prim = hex_to_rgb(settings['base_color'])
-    except:
-        r_prim, g_prim, b_prim = (37, 99, 235)
-    
-    title = doc.add_paragraph(data['personal_info']['nama'].upper() if data['personal_info']['nama'] else "YOUR NAME")
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title.runs[0].bold = True
-    title.runs[0].font.size = Pt(22)
-    title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-    
-    contact = doc.add_paragraph()
-    contact.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    contact_info = []
-    if data['personal_info']['email']: contact_info.append(data['personal_info']['email'])
-    if data['personal_info']['telepon']: contact_info.append(data['personal_info']['telepon'])
-    if data['personal_info']['alamat']: contact_info.append(data['personal_info']['alamat'])
-    if data['personal_info']['linkedin']: contact_info.append("LinkedIn: " + data['personal_info']['linkedin'])
-    
-    contact.add_run(" | ".join(contact_info) if contact_info else "Add your contact information")
-    contact.runs[0].font.size = Pt(10)
-    
-    doc.add_paragraph().add_run().add_break()
-    
-    if data['ringkasan']:
-        summary_title = doc.add_paragraph("PROFESSIONAL SUMMARY")
-        summary_title.runs[0].bold = True
-        summary_title.runs[0].font.size = Pt(12)
-        summary_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        doc.add_paragraph(data['ringkasan'])
-    
-    if data['pengalaman']:
-        exp_title = doc.add_paragraph("WORK EXPERIENCE")
-        exp_title.runs[0].bold = True
-        exp_title.runs[0].font.size = Pt(12)
-        exp_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for exp in data['pengalaman']:
-            p = doc.add_paragraph()
-            p.add_run(f"{exp.get('posisi', 'Position')}\n").bold = True
-            p.add_run(f"{exp.get('perusahaan', 'Company')}, {exp.get('periode', 'Period')}\n").italic = True
-            p.add_run(exp.get('deskripsi', 'Description'))
-            p.paragraph_format.space_after = Pt(6)
-    
-    if data['pendidikan']:
-        edu_title = doc.add_paragraph("EDUCATION")
-        edu_title.runs[0].bold = True
-        edu_title.runs[0].font.size = Pt(12)
-        edu_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for edu in data['pendidikan']:
-            p = doc.add_paragraph()
-            p.add_run(f"{edu.get('institusi', 'Institution')}\n").bold = True
-            p.add_run(f"{edu.get('gelar', 'Degree')}, {edu.get('tahun', 'Year')}")
-            p.paragraph_format.space_after = Pt(6)
-    
-    if data['keahlian']:
-        skills_title = doc.add_paragraph("SKILLS")
-        skills_title.runs[0].bold = True
-        skills_title.runs[0].font.size = Pt(12)
-        skills_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        skills_text = ", ".join(data['keahlian'][:15])
-        doc.add_paragraph(skills_text)
+def reload_form(design=False):
+    # Widget yang punya key menyimpan nilainya sendiri; hapus supaya terisi ulang dari cv_data (dan settings).
+    for key in list(st.session_state):
+        if key in FORM_WIDGET_KEYS or key.startswith(FORM_WIDGET_PREFIXES) or (design and key in DESIGN_WIDGET_KEYS):
+            del st.session_state[key]
 
-def generate_word_modern(doc, data, settings):
-    try:
-        r_prim, g_prim, b_prim = hex_to_rgb(settings['base_color'])
-    except:
-        r_prim, g_prim, b_prim = (37, 99, 235)
-    
-    table = doc.add_table(rows=1, cols=2)
-    table.autofit = False
-    table.columns[0].width = Inches(2)
-    table.columns[1].width = Inches(5)
-    
-    left_cell = table.cell(0, 0)
-    name_para = left_cell.paragraphs[0]
-    name_run = name_para.add_run(data['personal_info']['nama'][:15].upper() + "..." if len(data['personal_info']['nama']) > 15 else data['personal_info']['nama'].upper() if data['personal_info']['nama'] else "YOUR NAME")
-    name_run.font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-    name_run.font.bold = True
-    name_run.font.size = Pt(14)
-    
-    contact_items = []
-    if data['personal_info']['email']: contact_items.append(data['personal_info']['email'])
-    if data['personal_info']['telepon']: contact_items.append(data['personal_info']['telepon'])
-    
-    for item in contact_items:
-        p = left_cell.add_paragraph(item[:20] + "..." if len(item) > 20 else item)
-        p.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        p.runs[0].font.size = Pt(9)
-    
-    right_cell = table.cell(0, 1)
-    if data['ringkasan']:
-        right_cell.paragraphs[0].add_run("Professional Summary").bold = True
-        right_cell.paragraphs[0].runs[0].font.size = Pt(14)
-        right_cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        right_cell.add_paragraph(data['ringkasan'])
-    
-    if data['pengalaman']:
-        right_cell.add_paragraph().add_run("Work Experience").bold = True
-        right_cell.paragraphs[-1].runs[0].font.size = Pt(14)
-        right_cell.paragraphs[-1].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for exp in data['pengalaman']:
-            p = right_cell.add_paragraph()
-            p.add_run(f"{exp.get('posisi', 'Position')}\n").bold = True
-            p.add_run(f"{exp.get('perusahaan', 'Company')} | {exp.get('periode', 'Period')}\n").italic = True
-            p.add_run(exp.get('deskripsi', 'Description'))
-            p.paragraph_format.space_after = Pt(6)
-    
-    if data['pendidikan']:
-        right_cell.add_paragraph().add_run("Education").bold = True
-        right_cell.paragraphs[-1].runs[0].font.size = Pt(14)
-        right_cell.paragraphs[-1].runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        
-        for edu in data['pendidikan']:
-            p = right_cell.add_paragraph()
-            p.add_run(f"{edu.get('institusi', 'Institution')}\n").bold = True
-            p.add_run(f"{edu.get('gelar', 'Degree')} | {edu.get('tahun', 'Year')}")
-            p.paragraph_format.space_after = Pt(4)
-
-def generate_word_creative(doc, data, settings):
-    try:
-        r_prim, g_prim, b_prim = hex_to_rgb(settings['base_color'])
-        r_sec, g_sec, b_sec = hex_to_rgb(settings['accent_color'])
-    except:
-        r_prim, g_prim, b_prim = (37, 99, 235)
-        r_sec, g_sec, b_sec = (30, 64, 175)
-    
-    header = doc.add_paragraph()
-    header_run = header.add_run(data['personal_info']['nama'] if data['personal_info']['nama'] else "YOUR NAME")
-    header_run.font.size = Pt(36)
-    header_run.font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-    header_run.font.bold = True
-    
-    if data['personal_info']['posisi_target']:
-        position = doc.add_paragraph(data['personal_info']['posisi_target'])
-        position_run = position.runs[0]
-        position_run.font.size = Pt(18)
-        position_run.font.color.rgb = RGBColor(r_sec, g_sec, b_sec)
-        position_run.italic = True
-    
-    doc.add_paragraph()
-    
-    contact_info = []
-    if data['personal_info']['email']: contact_info.append(f"📧 {data['personal_info']['email']}")
-    if data['personal_info']['telepon']: contact_info.append(f"📱 {data['personal_info']['telepon']}")
-    if data['personal_info']['alamat']: contact_info.append(f"📍 {data['personal_info']['alamat']}")
-    
-    if contact_info:
-        contact_para = doc.add_paragraph()
-        for contact in contact_info:
-            contact_para.add_run(f"{contact}   ")
-        contact_para.runs[0].font.size = Pt(10)
-        doc.add_paragraph()
-    
-    if data['ringkasan']:
-        summary_title = doc.add_paragraph("✨ ABOUT ME")
-        summary_title.runs[0].font.size = Pt(14)
-        summary_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        summary_title.runs[0].bold = True
-        doc.add_paragraph(data['ringkasan'])
-    
-    if data['pengalaman']:
-        exp_title = doc.add_paragraph("📈 EXPERIENCE TIMELINE")
-        exp_title.runs[0].font.size = Pt(14)
-        exp_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        exp_title.runs[0].bold = True
-        
-        for exp in data['pengalaman']:
-            p = doc.add_paragraph()
-            p.add_run(f"{exp.get('posisi', 'Position')}\n").bold = True
-            p.add_run(f"{exp.get('perusahaan', 'Company')} • {exp.get('periode', 'Period')}\n").italic = True
-            p.add_run(exp.get('deskripsi', 'Description'))
-            p.paragraph_format.space_after = Pt(8)
-    
-    if data['keahlian']:
-        skills_title = doc.add_paragraph("🛠️ SKILLS")
-        skills_title.runs[0].font.size = Pt(14)
-        skills_title.runs[0].font.color.rgb = RGBColor(r_prim, g_prim, b_prim)
-        skills_title.runs[0].bold = True
-        skills_text = " • ".join(data['keahlian'][:12])
-        doc.add_paragraph(skills_text)
-
-# --- HTML PREVIEW ---
-def get_html_preview_enhanced(data, settings):
-    ats_score = calculate_ats_score(data)
-    
-    if settings['theme'] == 'dark':
-        border_color = '#444'
-        text_color = '#fff'
-        bg_color = '#1e1e1e'
-        skill_bg = '#333'
-        date_color = '#aaa'
-    else:
-        border_color = '#eee'
-        text_color = '#333'
-        bg_color = 'white'
-        skill_bg = '#f0f0f0'
-        date_color = '#666'
-    
-    html_parts = []
-    html_parts.append(f"""
-    <style>
-        .cv-container {{
-            max-width: 800px;
-            margin: 0 auto;
-            background: {bg_color};
-            color: {text_color};
-            box-shadow: 0 5px 25px rgba(0,0,0,0.1);
-            border-radius: 10px;
-            overflow: hidden;
-        }}
-        .cv-header {{
-            background: linear-gradient(135deg, {settings['base_color']}, {settings['accent_color']});
-            padding: 40px;
-            color: white;
-        }}
-        .ats-score {{
-            position: absolute;
-            top: 20px;
-            right: 20px;
-            background: rgba(255,255,255,0.2);
-            padding: 5px 15px;
-            border-radius: 20px;
-            font-size: 12px;
-        }}
-        .name {{
-            font-size: 36px;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        .position {{
-            font-size: 20px;
-            opacity: 0.9;
-            margin-bottom: 20px;
-        }}
-        .contact-bar {{
-            display: flex;
-            gap: 20px;
-            flex-wrap: wrap;
-            font-size: 14px;
-        }}
-        .section {{
-            padding: 25px 40px;
-            border-bottom: 1px solid {border_color};
-        }}
-        .section-title {{
-            color: {settings['base_color']};
-            font-size: 18px;
-            font-weight: bold;
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-        .skill-tag {{
-            display: inline-block;
-            background: {skill_bg};
-            padding: 5px 15px;
-            border-radius: 20px;
-            margin: 5px;
-            font-size: 14px;
-            border-left: 4px solid {settings['accent_color']};
-        }}
-        .timeline-item {{
-            position: relative;
-            padding-left: 30px;
-            margin-bottom: 25px;
-        }}
-        .timeline-item:before {{
-            content: '';
-            position: absolute;
-            left: 0;
-            top: 5px;
-            width: 12px;
-            height: 12px;
-            background: {settings['accent_color']};
-            border-radius: 50%;
-        }}
-        .job-title {{
-            font-weight: bold;
-            font-size: 16px;
-            margin-bottom: 5px;
-        }}
-        .company {{
-            color: {settings['accent_color']};
-            font-style: italic;
-            margin-bottom: 5px;
-        }}
-        .date {{
-            float: right;
-            color: {date_color};
-            font-size: 14px;
-        }}
-    </style>
-    
-    <div class="cv-container">
-        <div class="cv-header">
-            <div class="ats-score">ATS Score: {ats_score}%</div>
-            <div class="name">{data['personal_info']['nama'] or 'Your Name'}</div>
-            <div class="position">{data['personal_info']['posisi_target'] or 'Professional'}</div>
-            <div class="contact-bar">
-    """)
-    
-    if data['personal_info']['email']:
-        html_parts.append(f'<div>📧 {data["personal_info"]["email"]}</div>')
-    if data['personal_info']['telepon']:
-        html_parts.append(f'<div>📱 {data["personal_info"]["telepon"]}</div>')
-    if data['personal_info']['alamat']:
-        html_parts.append(f'<div>📍 {data["personal_info"]["alamat"]}</div>')
-    
-    html_parts.append('</div></div>')
-    
-    html_parts.append('<div class="section">')
-    html_parts.append('<div class="section-title">📝 Professional Summary</div>')
-    html_parts.append(f'<p>{data["ringkasan"] or "No summary provided"}</p>')
-    html_parts.append('</div>')
-    
-    if data['pengalaman']:
-        html_parts.append('<div class="section">')
-        html_parts.append('<div class="section-title">💼 Work Experience</div>')
-        for exp in data['pengalaman']:
-            html_parts.append(f'''
-            <div class="timeline-item">
-                <span class="date">{exp.get('periode', 'Period')}</span>
-                <div class="job-title">{exp.get('posisi', 'Position')}</div>
-                <div class="company">{exp.get('perusahaan', 'Company')}</div>
-                <p>{exp.get('deskripsi', 'Description')}</p>
-            </div>
-            ''')
-        html_parts.append('</div>')
-    
-    if data['pendidikan']:
-        html_parts.append('<div class="section">')
-        html_parts.append('<div class="section-title">🎓 Education</div>')
-        for edu in data['pendidikan']:
-            html_parts.append(f'''
-            <div class="timeline-item">
-                <span class="date">{edu.get('tahun', 'Year')}</span>
-                <div class="job-title">{edu.get('institusi', 'Institution')}</div>
-                <p>{edu.get('gelar', 'Degree')}</p>
-            </div>
-            ''')
-        html_parts.append('</div>')
-    
-    if data['keahlian']:
-        html_parts.append('<div class="section">')
-        html_parts.append('<div class="section-title">🛠️ Skills</div>')
-        for skill in data['keahlian'][:20]:
-            html_parts.append(f'<span class="skill-tag">{skill}</span>')
-        html_parts.append('</div>')
-    
-    if data['bahasa']:
-        html_parts.append('<div class="section">')
-        html_parts.append('<div class="section-title">🌐 Languages</div>')
-        html_parts.append(f'<p>{", ".join(data["bahasa"][:5])}</p>')
-        html_parts.append('</div>')
-    
-    html_parts.append('</div>')
-    
-    return ''.join(html_parts)
-
-# --- AI SUGGESTION ENGINE ---
-def get_ai_suggestions(data):
-    suggestions = []
-    
-    if not data['ringkasan']:
-        suggestions.append("✨ **Tambahkan Ringkasan Profesional** - Bagian ini sangat penting untuk ATS")
-    
-    if len(data['keahlian']) < 5:
-        suggestions.append("🛠️ **Tambahkan lebih banyak keahlian** - Minimal 5-10 skill untuk CV yang kompetitif")
-    
-    if not data['pengalaman']:
-        suggestions.append("💼 **Tambahkan pengalaman kerja** - Wajib untuk CV profesional")
-    
-    keywords = ['managed', 'achieved', 'developed', 'increased', 'reduced', 'led']
-    summary = data['ringkasan'].lower()
-    missing_keywords = [kw for kw in keywords if kw not in summary]
-    
-    if missing_keywords and len(missing_keywords) > 2:
-        suggestions.append("🔑 **Gunakan lebih banyak action verbs** - Seperti: " + ", ".join(keywords[:3]))
-    
-    return suggestions
+if 'settings' not in st.session_state:
+    st.session_state.settings = dict(DEFAULT_SETTINGS)
+
+if 'export_jobs' not in st.session_state:
+    st.session_state.export_jobs = {}
+
+# --- RENDER CACHE (dibagi ke semua session di worker ini, disimpan juga di store) ---
+# Multi-worker: CVBUILDER_ARTIFACT_DIR=<dir> membuat semua proses Streamlit di mesin ini berbagi hasil render di disk.
+ARTIFACT_DIR = os.environ.get('CVBUILDER_ARTIFACT_DIR')
+
+@st.cache_resource
+def get_render_cache():
+    return RenderCache(backing=ArtifactCache(ARTIFACT_DIR) if ARTIFACT_DIR else get_store())
+
+render_cache = get_render_cache()
+
+# --- JOB MATCHING (index per kumpulan lowongan, dibagi ke semua session) ---
+@st.cache_resource(max_entries=16)
+def get_job_index(postings):
+    return JobIndex(postings)
+
+# --- TALENT SEARCH (opt-in: CVBUILDER_TALENT_SEARCH=1, semua CV di store dirangking per lowongan) ---
+# Hanya untuk recruiter yang login dan terdaftar di CVBUILDER_RECRUITERS; link ?cv= hanya untuk CV milik sendiri.
+TALENT_SEARCH = os.environ.get('CVBUILDER_TALENT_SEARCH') == '1' and current_user_in('CVBUILDER_RECRUITERS')
+
+@st.cache_resource
+def get_cv_index():
+    index = CVIndex()
+    # Listener dipasang dulu, jadi CV yang disimpan selama index dibangun tidak terlewat.
+    get_store().add_listener(index)
+    index.add_records(get_store().iter_records())
+    return index
+
+# --- EXPORT QUEUE (PDF & DOCX dirender di process pool, antre per prioritas & dibatasi per session) ---
+EXPORT_WORKERS = int(os.environ.get('CVBUILDER_EXPORT_WORKERS', '2'))
+
+def session_alive(session_id):
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+@st.cache_resource
+def get_export_queue():
+    # Worker dari forkserver (bukan fork di dalam server yang multi-thread), dengan prioritas CPU lebih rendah,
+    # jadi rerun UI tetap didahulukan. Default 2 job per session: PDF dan DOCX satu package dirender bersamaan.
+    pool = process_pool(EXPORT_WORKERS, initializer=os.nice, initargs=(10,))
+    return ExportQueue(
+        pool, EXPORT_WORKERS,
+        max_pending=int(os.environ.get('CVBUILDER_EXPORT_QUEUE', '32')),
+        per_session=int(os.environ.get('CVBUILDER_EXPORT_PER_SESSION', '2')),
+        is_alive=session_alive,
+    )
+
+export_queue = get_export_queue()
+ctx = get_script_run_ctx()
+export_session = ctx.session_id if ctx is not None else 'local'
+RENDERERS = dict(RENDERERS, pdf=queued(export_queue, 'pdf', export_session, INTERACTIVE),
+                 docx=queued(export_queue, 'docx', export_session, INTERACTIVE))
+BATCH_RENDERERS = dict(RENDERERS, pdf=queued(export_queue, 'pdf', export_session, BATCH),
+                       docx=queued(export_queue, 'docx', export_session, BATCH))
+
+# --- PROFILING (opt-in: CVBUILDER_PROFILE=1, atau ?debug=1 untuk admin di CVBUILDER_ADMINS) ---
+# Log file hanya ditulis kalau CVBUILDER_PROFILE_LOG di-set. Panel debug visitor biasa hanya memuat trace
+# sesinya sendiri; angka worker (semua sesi), antrean export dan Prometheus hanya untuk admin.
+@st.cache_resource
+def get_profiler():
+    return Profiler(
+        log_path=os.environ.get('CVBUILDER_PROFILE_LOG'),
+        sample_rate=float(os.environ.get('CVBUILDER_PROFILE_SAMPLE', '0.1')),
+        slow_ms=float(os.environ.get('CVBUILDER_PROFILE_SLOW_MS', '1000')),
+    )
+
+IS_ADMIN = current_user_in('CVBUILDER_ADMINS')
+PROFILING = os.environ.get('CVBUILDER_PROFILE') == '1' or (IS_ADMIN and st.query_params.get('debug') == '1')
+rerun_trace = None
+if PROFILING:
+    profiler = get_profiler()
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:12]
+    rerun_trace = profiler.start_rerun(st.session_state.session_id)
+    export_queue.observe = profiler.observe
+    analyze = profiler.wrap('analyze', analyze)
+    get_html_preview_enhanced = profiler.wrap('html_preview', get_html_preview_enhanced)
+    build_package = profiler.wrap('zip_package', build_package)
+    estimate_pages = profiler.wrap('estimate_pages', estimate_pages)
+    RENDERERS = {fmt: profiler.wrap(f'render_{fmt}', fn) for fmt, fn in RENDERERS.items()}
 
 # --- UI MAIN ---
 st.title("🚀 CV Builder Pro Ultra v2.1")
 st.markdown("Build professional, ATS-friendly CVs with AI-powered optimization")
 
+# Satu analisis per isi CV; sidebar, preview dan quick checks membaca dari sini.
+analysis = analyze(st.session_state.cv_data)
+
 with st.sidebar:
     st.header("📊 CV Progress")
-    completion = 0
-    if st.session_state.cv_data['personal_info']['nama']: completion += 15
-    if st.session_state.cv_data['personal_info']['email']: completion += 15
-    if st.session_state.cv_data['ringkasan']: completion += 20
-    if st.session_state.cv_data['pengalaman']: completion += 25
-    if st.session_state.cv_data['pendidikan']: completion += 15
-    if st.session_state.cv_data['keahlian']: completion += 10
-    st.progress(completion/100)
-    st.caption(f"{completion}% Complete")
+    st.progress(analysis.completion/100)
+    st.caption(f"{analysis.completion}% Complete")
     
     st.divider()
     st.header("🤖 AI Suggestions")
-    suggestions = get_ai_suggestions(st.session_state.cv_data)
-    if suggestions:
-        for suggestion in suggestions:
+    if analysis.suggestions:
+        for suggestion in analysis.suggestions:
             st.info(suggestion)
     else:
         st.success("✅ CV Anda sudah optimal!")
     
     st.divider()
     st.header("🎯 ATS Score")
-    ats_score = calculate_ats_score(st.session_state.cv_data)
+    ats_score = analysis.score
     st.metric("Compatibility", f"{ats_score}%")
     if ats_score < 70:
         st.warning("ATS score rendah. Perbaiki CV Anda.")
@@ -919,22 +235,23 @@ with st.sidebar:
     
     st.divider()
     st.header("⚡ Quick Actions")
+    history = st.session_state.history
+    col_undo, col_redo = st.columns(2)
+    with col_undo:
+        if st.button("↩️ Undo", key="undo_edit", disabled=not history.can_undo, use_container_width=True):
+            if history.undo(st.session_state.cv_data):
+                reload_form()
+                st.rerun()
+    with col_redo:
+        if st.button("↪️ Redo", key="redo_edit", disabled=not history.can_redo, use_container_width=True):
+            if history.redo(st.session_state.cv_data):
+                reload_form()
+                st.rerun()
+
     if st.button("🔄 Reset CV", type="secondary", key="reset_cv"):
-        st.session_state.cv_data = {
-            'personal_info': {
-                'nama': '', 'email': '', 'telepon': '', 'alamat': '',
-                'linkedin': '', 'github': '', 'website': '', 'posisi_target': '',
-                'foto': None
-            },
-            'ringkasan': '',
-            'pengalaman': [],
-            'pendidikan': [],
-            'keahlian': [],
-            'sertifikasi': [],
-            'proyek': [],
-            'bahasa': [],
-            'hobi': []
-        }
+        history.record(st.session_state.cv_data)
+        st.session_state.cv_data = empty_cv_data()
+        reload_form()
         st.rerun()
     
     if st.button("📋 Generate AI Summary", key="ai_summary"):
@@ -952,8 +269,16 @@ with tab1:
         st.subheader("Personal Information")
         uploaded_file = st.file_uploader("Upload Profile Photo (Optional)", type=['jpg', 'png', 'jpeg'], key="photo_upload")
         if uploaded_file:
-            st.session_state.cv_data['personal_info']['foto'] = base64.b64encode(uploaded_file.read()).decode()
-            st.image(uploaded_file, width=150)
+            # Diproses sekali per file upload (bukan setiap rerun): resize, buang EXIF, simpan per hash.
+            if st.session_state.get('photo_file_id') != uploaded_file.file_id:
+                try:
+                    st.session_state.cv_data['personal_info']['foto'] = PHOTOS.ingest(uploaded_file.getvalue())
+                    st.session_state.photo_file_id = uploaded_file.file_id
+                except ValueError as e:
+                    st.error(f"Could not read photo: {e}")
+            photo_ref = PHOTOS.resolve(st.session_state.cv_data['personal_info']['foto'])
+            if photo_ref:
+                st.image(PHOTOS.path(photo_ref), width=150)
         
         cols = st.columns(2)
         with cols[0]:
@@ -1031,16 +356,16 @@ with tab2:
     col_d1, col_d2, col_d3 = st.columns([1, 2, 1])
     with col_d1:
         st.subheader("Template")
-        selected_layout = st.selectbox("Choose Layout", options=list(LAYOUTS.keys()), format_func=lambda x: f"{LAYOUTS[x]['name']} (ATS: {LAYOUTS[x]['ats_score']}%)", key="layout_select")
+        selected_layout = st.selectbox("Choose Layout", options=list(LAYOUTS.keys()), index=list(LAYOUTS).index(st.session_state.settings['template_style']) if st.session_state.settings['template_style'] in LAYOUTS else 0, format_func=lambda x: f"{LAYOUTS[x]['name']} (ATS: {LAYOUTS[x]['ats_score']}%)", key="layout_select")
         st.session_state.settings['template_style'] = selected_layout
         
         st.divider()
         st.subheader("Theme")
-        theme_color = st.selectbox("Color Theme", options=list(THEME_COLORS.keys()), format_func=lambda x: x.replace('_', ' ').title(), key="theme_select")
+        theme_color = st.selectbox("Color Theme", options=list(THEME_COLORS.keys()), index=next((i for i, c in enumerate(THEME_COLORS.values()) if c['primary'] == st.session_state.settings['base_color']), 0), format_func=lambda x: x.replace('_', ' ').title(), key="theme_select")
         if theme_color:
             st.session_state.settings['base_color'] = THEME_COLORS[theme_color]['primary']
             st.session_state.settings['accent_color'] = THEME_COLORS[theme_color]['secondary']
-        st.session_state.settings['theme'] = st.radio("Theme Mode", options=['light', 'dark'], horizontal=True, key="theme_mode")
+        st.session_state.settings['theme'] = st.radio("Theme Mode", options=['light', 'dark'], index=1 if st.session_state.settings['theme'] == 'dark' else 0, horizontal=True, key="theme_mode")
     
     with col_d2:
         st.subheader("Customize Colors")
@@ -1064,10 +389,10 @@ with tab2:
         st.subheader("Typography")
         font_col1, font_col2 = st.columns(2)
         with font_col1:
-            selected_font = st.selectbox("Font Family", options=list(FONTS.keys()), index=0, key="font_select")
+            selected_font = st.selectbox("Font Family", options=list(FONTS.keys()), index=list(FONTS).index(st.session_state.settings['font_family']) if st.session_state.settings['font_family'] in FONTS else 0, key="font_select")
             st.session_state.settings['font_family'] = selected_font
         with font_col2:
-            st.session_state.settings['font_size_body'] = st.slider("Body Font Size", min_value=8, max_value=14, value=st.session_state.settings['font_size_body'], key="font_size_slider")
+            st.session_state.settings['font_size_body'] = st.slider("Body Font Size", min_value=SETTING_RANGES['font_size_body'][0], max_value=SETTING_RANGES['font_size_body'][1], value=int(st.session_state.settings['font_size_body']), key="font_size_slider")
         st.markdown("**Font Preview:**")
         st.markdown(f"<span style='font-family:{FONTS[selected_font]['docx']}; font-size:16px;'>The quick brown fox jumps over the lazy dog</span>", unsafe_allow_html=True)
     
@@ -1103,10 +428,12 @@ with tab2:
 
 # TAB 3: PREVIEW
 with tab3:
+    # Build CV bisa mengubah data di rerun ini; tanpa perubahan ini hanya hit memo.
+    analysis = analyze(st.session_state.cv_data)
     if not st.session_state.cv_data['personal_info']['nama']:
         st.warning("Please enter your name in the Build CV tab to see preview.")
     else:
-        ats_score = calculate_ats_score(st.session_state.cv_data)
+        ats_score = analysis.score
         col_score, col_actions = st.columns([1, 3])
         with col_score:
             st.metric(label="ATS Score", value=f"{ats_score}%")
@@ -1125,25 +452,14 @@ with tab3:
             st.components.v1.html(html_preview, height=1000, scrolling=True)
         with preview_col2:
             st.subheader("Quick Checks")
-            checklist_items = [
-                ("Name included", bool(st.session_state.cv_data['personal_info']['nama'])),
-                ("Email included", bool(st.session_state.cv_data['personal_info']['email'])),
-                ("Professional summary", bool(st.session_state.cv_data['ringkasan'])),
-                ("Work experience", len(st.session_state.cv_data['pengalaman']) > 0),
-                ("Education", len(st.session_state.cv_data['pendidikan']) > 0),
-                ("Skills (5+)", len(st.session_state.cv_data['keahlian']) >= 5),
-                ("Action verbs used", any(word in st.session_state.cv_data['ringkasan'].lower() for word in ['managed', 'achieved', 'developed', 'increased'])),
-                ("Quantifiable achievements", any(char.isdigit() for char in st.session_state.cv_data['ringkasan']))
-            ]
-            for item, checked in checklist_items:
+            for item, checked in analysis.checklist:
                 if checked:
                     st.markdown(f"✅ {item}")
                 else:
                     st.markdown(f"❌ {item}")
             st.divider()
             st.subheader("Word Count")
-            total_words = len(st.session_state.cv_data['ringkasan'].split())
-            total_words += sum(len(exp['deskripsi'].split()) for exp in st.session_state.cv_data['pengalaman'])
+            total_words = analysis.word_counts.total
             st.metric("Total Words", total_words)
             if total_words < 300:
                 st.warning("CV might be too short")
@@ -1152,6 +468,44 @@ with tab3:
             else:
                 st.success("Good length")
 
+        with st.expander("🎯 Match Against Job Postings", expanded=False):
+            postings_text = st.text_area("Paste one or more job descriptions (separate postings with a line containing ---)", height=200, key="job_postings")
+            match_method = st.radio("Scoring", options=['bm25', 'tfidf'], format_func=lambda x: {'bm25': 'Keyword coverage (BM25)', 'tfidf': 'Similarity (TF-IDF)'}[x], horizontal=True, key="match_method")
+            postings = split_postings(postings_text)
+            if postings:
+                job_index = get_job_index(tuple(postings))
+                matches = job_index.rank(st.session_state.cv_data, method=match_method, top=50)
+                st.caption(f"Top {len(matches)} of {len(postings)} postings")
+                st.dataframe(
+                    [{
+                        'Posting': postings[m.index].splitlines()[0][:60],
+                        'Match': f"{m.score * 100:.0f}%",
+                        'Matched keywords': ", ".join(m.matched[:6]),
+                        'Missing keywords': ", ".join(m.missing[:6]),
+                    } for m in matches],
+                    hide_index=True, use_container_width=True
+                )
+
+    if TALENT_SEARCH:
+        with st.expander("🔎 Rank Stored CVs Against a Job Posting", expanded=False):
+            talent_posting = st.text_area("Paste a job description", height=200, key="talent_posting")
+            talent_top = st.slider("Show top", 5, 100, 20, key="talent_top")
+            if talent_posting.strip():
+                cv_index = get_cv_index()
+                ranked = cv_index.top(talent_posting, k=talent_top)
+                records = store.load_many([m.cv_id for m in ranked])
+                st.caption(f"Top {len(ranked)} of {len(cv_index)} stored CVs")
+                st.dataframe(
+                    [{
+                        'Name': records[m.cv_id].data['personal_info'].get('nama') or '—',
+                        'Target position': records[m.cv_id].data['personal_info'].get('posisi_target') or '—',
+                        'Score': round(m.score, 2),
+                        'Open': f"?cv={m.cv_id}" if records[m.cv_id].user_id == owner else None,
+                    } for m in ranked if m.cv_id in records],
+                    hide_index=True, use_container_width=True,
+                    column_config={'Open': st.column_config.LinkColumn('Open')}
+                )
+
 # TAB 4: EXPORT
 with tab4:
     st.header("Export Your CV")
@@ -1167,39 +521,48 @@ with tab4:
             st.markdown("- Email attachments")
             st.markdown("- Printing")
             try:
-                pdf_file = generate_pdf_enhanced(st.session_state.cv_data, st.session_state.settings)
-                st.download_button(
-                    label="⬇️ Download PDF",
-                    data=pdf_file,
-                    file_name=f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.pdf",
-                    mime="application/pdf",
-                    type="primary",
-                    use_container_width=True,
-                    key="download_pdf"
-                )
-            except Exception as e:
-                st.error(f"Error generating PDF: {str(e)}")
+                page_count = estimate_pages(st.session_state.cv_data, st.session_state.settings)
+                st.caption(f"📏 About {page_count} page{'s' if page_count > 1 else ''}")
+            except RuntimeError:
+                pass  # font fpdf tidak dikenal; error-nya tampil saat PDF dibuat
+            pdf_job = get_export_job(st.session_state.export_jobs, 'pdf', st.session_state.cv_data, st.session_state.settings, RENDERERS['pdf'], render_cache)
+            if pdf_job.status == FAILED and isinstance(pdf_job.error, QueueFull):
+                st.warning(str(pdf_job.error))
+            elif pdf_job.status == FAILED:
+                st.error(f"Error generating PDF: {str(pdf_job.error)}")
                 st.info("Try using a simpler template or check your data.")
+            st.download_button(
+                label="⬇️ Download PDF",
+                data=pdf_job,
+                file_name=f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.pdf",
+                mime="application/pdf",
+                type="primary",
+                use_container_width=True,
+                key="download_pdf"
+            )
+            st.caption("✅ Ready" if pdf_job.status == READY else "⏳ Generated when you click download")
         with col_format2:
             st.markdown("### 📝 Word (DOCX)")
             st.markdown("**Best for:**")
             st.markdown("- Easy editing")
             st.markdown("- ATS systems")
             st.markdown("- Further customization")
-            try:
-                docx_file = generate_word_doc(st.session_state.cv_data, st.session_state.settings)
-                st.download_button(
-                    label="⬇️ Download Word",
-                    data=docx_file,
-                    file_name=f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    type="primary",
-                    use_container_width=True,
-                    key="download_docx"
-                )
-            except Exception as e:
-                st.error(f"Error generating Word document: {str(e)}")
+            docx_job = get_export_job(st.session_state.export_jobs, 'docx', st.session_state.cv_data, st.session_state.settings, RENDERERS['docx'], render_cache)
+            if docx_job.status == FAILED and isinstance(docx_job.error, QueueFull):
+                st.warning(str(docx_job.error))
+            elif docx_job.status == FAILED:
+                st.error(f"Error generating Word document: {str(docx_job.error)}")
                 st.info("Make sure python-docx is installed: pip install python-docx")
+            st.download_button(
+                label="⬇️ Download Word",
+                data=docx_job,
+                file_name=f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.docx",
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                type="primary",
+                use_container_width=True,
+                key="download_docx"
+            )
+            st.caption("✅ Ready" if docx_job.status == READY else "⏳ Generated when you click download")
         with col_format3:
             st.markdown("### 📦 All Formats")
             st.markdown("**Get everything:**")
@@ -1208,107 +571,116 @@ with tab4:
             st.markdown("- Cover letter template")
             if st.button("🛠️ Create Package", use_container_width=True, key="create_package"):
                 try:
-                    zip_buffer = io.BytesIO()
-                    with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-                        pdf_file = generate_pdf_enhanced(st.session_state.cv_data, st.session_state.settings)
-                        zip_file.writestr(f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.pdf", pdf_file.getvalue())
-                        docx_file = generate_word_doc(st.session_state.cv_data, st.session_state.settings)
-                        zip_file.writestr(f"CV_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.docx", docx_file.getvalue())
-                        json_str = json.dumps(st.session_state.cv_data, indent=2)
-                        zip_file.writestr(f"CV_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", json_str)
-                        cover_letter = f"""
-Date: {datetime.now().strftime('%B %d, %Y')}
-
-Hiring Manager
-[Company Name]
-[Company Address]
-
-Dear Hiring Manager,
-
-I am writing to express my interest in the [Position Name] position at [Company Name]. 
-With my background in [Your Field] and experience in [Key Skill], I believe I would be 
-a valuable addition to your team.
-
-In my previous role at [Previous Company], I [Achievement 1]. Additionally, I 
-[Achievement 2]. These experiences have equipped me with the skills necessary to 
-contribute effectively to [Company Name].
-
-I have attached my CV for your review and would welcome the opportunity to discuss 
-how my skills and experiences align with your needs.
-
-Sincerely,
-{st.session_state.cv_data['personal_info']['nama']}
-{st.session_state.cv_data['personal_info']['email']}
-{st.session_state.cv_data['personal_info']['telepon']}
-                        """
-                        zip_file.writestr(f"Cover_Letter_Template_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.txt", cover_letter)
-                    zip_buffer.seek(0)
+                    jobs = st.session_state.export_jobs
+                    zip_bytes = build_package(
+                        st.session_state.cv_data, st.session_state.settings,
+                        lambda fmt, data, settings: get_export_job(jobs, fmt, data, settings, RENDERERS[fmt], render_cache)(BATCH_RENDERERS[fmt])
+                    )
                     st.download_button(
                         label="⬇️ Download Complete Package",
-                        data=zip_buffer,
+                        data=zip_bytes,
                         file_name=f"CV_Package_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.zip",
                         mime="application/zip",
                         type="primary",
                         use_container_width=True,
                         key="download_zip"
                     )
+                except QueueFull as e:
+                    st.warning(str(e))
                 except Exception as e:
                     st.error(f"Error creating package: {str(e)}")
         st.divider()
         st.subheader("Additional Options")
         col_opt1, col_opt2 = st.columns(2)
         with col_opt1:
-            json_str = json.dumps(st.session_state.cv_data, indent=2)
+            backup_data = copy.deepcopy(st.session_state.cv_data)
+            backup_settings = dict(st.session_state.settings)
             st.download_button(
                 label="💾 Backup Data (JSON)",
-                data=json_str,
+                data=lambda: dumps_json(backup_data, backup_settings),
                 file_name=f"CV_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
                 mime="application/json",
                 use_container_width=True,
                 key="download_json"
             )
+            st.download_button(
+                label="🗜️ Compact Backup (CVB)",
+                data=lambda: dumps_binary(backup_data, backup_settings, compress=True),
+                file_name=f"CV_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.cvb",
+                mime="application/octet-stream",
+                use_container_width=True,
+                key="download_cvb"
+            )
         with col_opt2:
-            plain_text = f"""
-CV - {st.session_state.cv_data['personal_info']['nama']}
-============================================
-
-CONTACT INFORMATION
--------------------
-Name: {st.session_state.cv_data['personal_info']['nama']}
-Email: {st.session_state.cv_data['personal_info']['email']}
-Phone: {st.session_state.cv_data['personal_info']['telepon']}
-Location: {st.session_state.cv_data['personal_info']['alamat']}
-LinkedIn: {st.session_state.cv_data['personal_info']['linkedin']}
-
-PROFESSIONAL SUMMARY
---------------------
-{st.session_state.cv_data['ringkasan']}
-
-WORK EXPERIENCE
----------------
-{chr(10).join([f'- {exp["posisi"]} at {exp["perusahaan"]} ({exp["periode"]})' for exp in st.session_state.cv_data['pengalaman']])}
-
-EDUCATION
----------
-{chr(10).join([f'- {edu["gelar"]} from {edu["institusi"]} ({edu["tahun"]})' for edu in st.session_state.cv_data['pendidikan']])}
-
-SKILLS
-------
-{', '.join(st.session_state.cv_data['keahlian'])}
-
-LANGUAGES
----------
-{', '.join(st.session_state.cv_data['bahasa'])}
-            """
+            txt_snapshot = copy.deepcopy(st.session_state.cv_data)
             st.download_button(
                 label="📋 Plain Text Version",
-                data=plain_text,
+                data=lambda: generate_plain_text(txt_snapshot),
                 file_name=f"CV_Text_{st.session_state.cv_data['personal_info']['nama'].replace(' ', '_')}.txt",
                 mime="text/plain",
                 use_container_width=True,
                 key="download_txt"
             )
 
+# --- RESTORE BACKUP (JSON/CVB versi apa pun: dimigrasi & divalidasi) ---
+with st.sidebar:
+    backup_file = st.file_uploader("📥 Restore Backup", type=['json', 'cvb'], key="restore_upload")
+    if backup_file and st.session_state.get('restored_file_id') != backup_file.file_id:
+        try:
+            restored_data, restored_settings = load_backup(backup_file.getvalue())
+        except SchemaError as e:
+            st.error(str(e))
+        else:
+            st.session_state.history.record(st.session_state.cv_data)
+            st.session_state.cv_data = restored_data
+            st.session_state.settings = dict(DEFAULT_SETTINGS, **restored_settings)
+            st.session_state.restored_file_id = backup_file.file_id
+            reload_form(design=True)
+            st.rerun()
+
+# --- IMPORT CV LAMA (.docx/.pdf diparse di process pool, dibatasi waktu, di-cache per hash file) ---
+RESUME_BUDGET = float(os.environ.get('CVBUILDER_RESUME_BUDGET', '5'))
+
+def import_resume(raw, name):
+    key = resume_key(raw)
+    parsed = cached_resume(key)
+    if parsed is not None:
+        return parsed
+    future = export_queue.submit(export_session, parse_resume, raw, name, RESUME_BUDGET, priority=INTERACTIVE)
+    try:
+        parsed = future.result(timeout=RESUME_BUDGET + 10)
+    except BrokenExecutor:
+        return parse_resume(raw, name, RESUME_BUDGET)
+    except TimeoutError:
+        future.cancel()  # drops a job still waiting in the queue; a running parse stops itself at the budget
+        raise
+    remember_resume(key, parsed)
+    return parsed
+
+with st.sidebar:
+    resume_file = st.file_uploader("📄 Import Existing CV", type=['docx', 'pdf'], key="resume_upload",
+                                   help="Fills the form from a CV you already have (text-based PDFs only)")
+    if resume_file and st.session_state.get('resume_file_id') != resume_file.file_id:
+        try:
+            parsed = import_resume(resume_file.getvalue(), resume_file.name)
+        except ResumeError as e:
+            st.error(str(e))
+        except (QueueFull, TimeoutError):
+            st.warning("The server is busy; try importing the CV again in a moment.")
+        except Exception as e:
+            st.error(f"Could not import {resume_file.name}: {str(e)}")
+        else:
+            st.session_state.history.record(st.session_state.cv_data)
+            st.session_state.cv_data = merge_resume(st.session_state.cv_data, parsed.data)
+            st.session_state.resume_file_id = resume_file.file_id
+            st.session_state.resume_notice = (
+                f"Imported {resume_file.name}" + (" (partially: the file took too long to read)" if parsed.partial else "")
+                + ". Check the Build tab; Undo restores the previous CV.")
+            reload_form()
+            st.rerun()
+    if st.session_state.get('resume_notice'):
+        st.success(st.session_state.pop('resume_notice'))
+
 # Footer
 st.markdown("---")
 col_footer1, col_footer2, col_footer3 = st.columns(3)
@@ -1318,3 +690,36 @@ with col_footer2:
     st.caption("Built with Streamlit & Python")
 with col_footer3:
     st.caption("v2.1 | Production Ready")
+
+# --- EDIT HISTORY (satu langkah per rerun yang mengubah CV) ---
+st.session_state.history.record(st.session_state.cv_data)
+
+# --- AUTOSAVE (debounced: edit beruntun digabung jadi satu write; CV baru yang masih kosong tidak disimpan) ---
+if st.session_state.cv_stored or st.session_state.cv_data != empty_cv_data():
+    autosaver.schedule(cv_id, st.session_state.cv_data, st.session_state.settings, owner,
+                       st.session_state.history.version)
+    st.session_state.cv_stored = True
+
+# --- DEBUG PANEL ---
+if rerun_trace is not None:
+    record = profiler.finish_rerun(rerun_trace)
+    with st.sidebar:
+        st.divider()
+        with st.expander("🐞 Profiling", expanded=True):
+            st.caption(f"Session {record['session']} · rerun {record['total_ms']:.1f} ms")
+            st.dataframe(
+                [{'span': name, 'calls': span['calls'], 'ms': span['ms']} for name, span in record['spans'].items()],
+                hide_index=True, use_container_width=True
+            )
+            st.download_button("🧾 JSONL trace", data=profiler.jsonl(record['session']), file_name="cvbuilder_trace.jsonl",
+                               mime="application/jsonl", use_container_width=True, key="download_trace")
+            if IS_ADMIN:
+                st.caption("Worker totals (incl. background renders)")
+                st.dataframe(
+                    [{'span': name, 'calls': calls, 'mean ms': round(mean, 3)} for name, (calls, mean) in profiler.summary().items()],
+                    hide_index=True, use_container_width=True
+                )
+                st.caption("Export queue")
+                st.dataframe([export_queue.stats()], hide_index=True, use_container_width=True)
+                st.download_button("📈 Prometheus metrics", data=profiler.prometheus_text, file_name="cvbuilder_metrics.prom",
+                                   mime="text/plain", use_container_width=True, key="download_prom")
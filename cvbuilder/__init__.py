@@ -0,0 +1 @@
+"""Rendering core for CV Builder Pro Ultra."""
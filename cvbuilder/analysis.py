@@ -0,0 +1,142 @@
+"""ATS scoring and suggestion heuristics.
+
+:func:`analyze` walks ``cv_data`` once and returns a :class:`CVAnalysis` with
+everything the UI shows about a CV: ATS score, suggestions, completion,
+Quick Checks, word counts and action-verb hits. Results are memoized on the
+content of the fields they depend on (:func:`analysis_key`). The sidebar, the
+Preview tab and the HTML preview header therefore all read the same object
+within a rerun, and reruns that did not change the CV do no analysis at all.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+SCORE_KEYWORDS = ('managed', 'developed', 'created', 'improved', 'increased', 'reduced')
+SUGGESTION_KEYWORDS = ('managed', 'achieved', 'developed', 'increased', 'reduced', 'led')
+CHECKLIST_KEYWORDS = ('managed', 'achieved', 'developed', 'increased')
+ACTION_VERBS = tuple(dict.fromkeys(SCORE_KEYWORDS + SUGGESTION_KEYWORDS + CHECKLIST_KEYWORDS))
+
+CVAnalysis = namedtuple('CVAnalysis', 'score suggestions completion checklist word_counts keyword_hits')
+WordCounts = namedtuple('WordCounts', 'summary experience total')
+
+
+def analysis_key(data):
+    """Content key of exactly the fields the analysis reads.
+
+    A tuple rather than a digest: ``str`` objects cache their hash and equal
+    keys built from the same session objects compare by identity, so a hit
+    costs one pass over the entries instead of serializing and hashing every
+    description again.
+    """
+    info = data['personal_info']
+    return (
+        info['nama'], info['email'], info['posisi_target'], data['ringkasan'],
+        tuple(exp.get('deskripsi') for exp in data['pengalaman']),
+        len(data['pendidikan']), len(data['keahlian']),
+    )
+
+
+def _analyze(data):
+    info = data['personal_info']
+    summary = data['ringkasan'] or ''
+    summary_lower = summary.lower()
+    experience = data['pengalaman']
+    n_experience = len(experience)
+    n_education = len(data['pendidikan'])
+    n_skills = len(data['keahlian'])
+
+    keyword_hits = frozenset(kw for kw in ACTION_VERBS if kw in summary_lower)
+    summary_words = len(summary.split())
+    experience_words = sum(len((exp.get('deskripsi') or '').split()) for exp in experience)
+
+    score = 0
+    if info['nama']: score += 10
+    if info['email']: score += 10
+    if info['posisi_target']: score += 10
+    if summary: score += 10
+    if n_experience >= 1: score += 15
+    if n_experience >= 3: score += 10
+    if n_education >= 1: score += 10
+    if n_skills >= 5: score += 15
+    if n_skills >= 10: score += 10
+    if keyword_hits.intersection(SCORE_KEYWORDS): score += 5
+
+    suggestions = []
+    if not summary:
+        suggestions.append("✨ **Tambahkan Ringkasan Profesional** - Bagian ini sangat penting untuk ATS")
+    if n_skills < 5:
+        suggestions.append("🛠️ **Tambahkan lebih banyak keahlian** - Minimal 5-10 skill untuk CV yang kompetitif")
+    if not experience:
+        suggestions.append("💼 **Tambahkan pengalaman kerja** - Wajib untuk CV profesional")
+    missing_keywords = [kw for kw in SUGGESTION_KEYWORDS if kw not in keyword_hits]
+    if len(missing_keywords) > 2:
+        suggestions.append("🔑 **Gunakan lebih banyak action verbs** - Seperti: " + ", ".join(SUGGESTION_KEYWORDS[:3]))
+
+    completion = 0
+    if info['nama']: completion += 15
+    if info['email']: completion += 15
+    if summary: completion += 20
+    if experience: completion += 25
+    if n_education: completion += 15
+    if n_skills: completion += 10
+
+    checklist = (
+        ("Name included", bool(info['nama'])),
+        ("Email included", bool(info['email'])),
+        ("Professional summary", bool(summary)),
+        ("Work experience", n_experience > 0),
+        ("Education", n_education > 0),
+        ("Skills (5+)", n_skills >= 5),
+        ("Action verbs used", bool(keyword_hits.intersection(CHECKLIST_KEYWORDS))),
+        ("Quantifiable achievements", any(char.isdigit() for char in summary)),
+    )
+
+    return CVAnalysis(
+        score=min(score, 100),
+        suggestions=tuple(suggestions),
+        completion=completion,
+        checklist=checklist,
+        word_counts=WordCounts(summary_words, experience_words, summary_words + experience_words),
+        keyword_hits=tuple(kw for kw in ACTION_VERBS if kw in keyword_hits),
+    )
+
+
+class AnalysisCache:
+    """Small LRU of :class:`CVAnalysis` by :func:`analysis_key`, shared by every session on a worker."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, data):
+        key = analysis_key(data)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+        result = _analyze(data)
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+
+ANALYSES = AnalysisCache()
+
+
+def analyze(data):
+    """The :class:`CVAnalysis` of ``cv_data``, computed once per distinct content."""
+    return ANALYSES.get(data)
+
+
+def calculate_ats_score(data):
+    return analyze(data).score
+
+# --- AI SUGGESTION ENGINE ---
+def get_ai_suggestions(data):
+    return list(analyze(data).suggestions)
@@ -0,0 +1,193 @@
+"""Rendered artifacts shared by every process on the machine.
+
+An :class:`ArtifactCache` keeps rendered files (PDF, DOCX, HTML, ...) in a
+local directory, named by their content key (:func:`cvbuilder.cache.render_key`).
+Several Streamlit processes behind a load balancer, the render pool and
+``python -m cvbuilder render --cache`` workers can all point at the same
+directory and reuse each other's renders:
+
+* files are written to a temporary name and renamed into place, so a reader
+  sees either nothing or the whole file;
+* reads map the file (``mmap``), so every process serves from the same page
+  cache pages instead of each holding its own copy;
+* ``flock`` locks (striped over 256 lock files) make one process render a
+  key while the others wait for its file;
+* the directory is kept under ``max_bytes`` by removing the least recently
+  read files, going by their access time (which reads set explicitly, since
+  ``relatime``/``noatime`` mounts do not).
+
+Without ``fcntl`` (Windows) the locks only cover threads of one process.
+"""
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAX_BYTES = 1024 * 1024 * 1024
+# Access times are refreshed at most this often per file (seconds): LRU order does not need more.
+TOUCH_INTERVAL = 60
+PRUNE_EVERY = 32
+
+
+class ArtifactCache:
+    def __init__(self, root=None, max_bytes=MAX_BYTES, touch_interval=TOUCH_INTERVAL):
+        self.root = root or os.environ.get('CVBUILDER_ARTIFACT_DIR') or os.path.join(tempfile.gettempdir(), 'cvbuilder-artifacts')
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._locks = os.path.join(self.root, 'locks')
+        os.makedirs(self._locks, exist_ok=True)
+        self._thread_locks = [threading.Lock() for _ in range(256)]
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.renders = 0
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    # --- reading ---
+    @contextmanager
+    def view(self, key):
+        """A read-only ``memoryview`` of the artifact's mapped file, or ``None``. Valid inside the ``with`` block only."""
+        path = self.path(key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            yield None
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            if time.time() - stat.st_atime > self.touch_interval:
+                try:
+                    os.utime(f.fileno(), ns=(time.time_ns(), stat.st_mtime_ns))
+                except OSError:
+                    pass
+            with self._lock:
+                self.hits += 1
+            if not stat.st_size:
+                yield memoryview(b'')
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def get_artifact(self, key):
+        with self.view(key) as view:
+            return None if view is None else view.tobytes()
+
+    # --- writing ---
+    def put_artifact(self, key, kind, data):
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 1
+        if prune:
+            self.prune()
+
+    @contextmanager
+    def lock(self, key):
+        """Exclusive lock on ``key`` across threads and processes."""
+        stripe = int(key[:2], 16) if len(key) >= 2 else 0
+        with self._thread_locks[stripe]:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self._locks, f'{stripe:02x}.lock'), 'a+b') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def get_or_render(self, key, kind, render):
+        """The artifact for ``key``; on a miss ``render()`` it, unless another process is already doing so."""
+        value = self.get_artifact(key)
+        if value is not None:
+            return value
+        with self.lock(key):
+            value = self.get_artifact(key)
+            if value is not None:
+                return value
+            value = render()
+            if hasattr(value, 'getvalue'):
+                value = value.getvalue()
+            with self._lock:
+                self.renders += 1
+            self.put_artifact(key, kind, value)
+        return value
+
+    # --- eviction ---
+    def _entries(self):
+        for shard in os.scandir(self.root):
+            if shard.name == 'locks' or not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_atime, stat.st_size, entry.path
+
+    def prune(self):
+        """Remove least recently read files until the cache is within ``max_bytes``. One process prunes at a time."""
+        if fcntl is None:
+            return self._prune()
+        with open(os.path.join(self._locks, 'prune.lock'), 'a+b') as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0  # someone else is pruning right now
+            try:
+                return self._prune()
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _prune(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        entries = list(self._entries())
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'hits': self.hits,
+                'renders': self.renders,
+            }
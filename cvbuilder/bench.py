@@ -0,0 +1,397 @@
+"""Render benchmarks across templates, formats and CV sizes.
+
+Usage::
+
+    python -m cvbuilder bench --out bench.json
+    python -m cvbuilder bench --out new.json --compare bench.json
+    python -m cvbuilder bench-rank --sizes 1000,5000,20000
+    python -m cvbuilder bench-serialize --profiles large,xlarge
+
+Each case renders a synthetic ``cv_data`` payload and records the median wall
+time over ``--repeat`` runs, the peak traced memory of one extra run
+(``tracemalloc``) and the output size. With ``--compare`` every case slower
+than the baseline by more than ``--threshold`` (and by at least
+``--min-delta-ms``) is reported as a regression and the command exits with
+status 1.
+
+Every run also times a cold ``import cvbuilder.cli`` (the CLI and pool
+worker start-up path) in fresh interpreters; above
+:data:`STARTUP_BUDGET_MS` the case fails, so a heavy import slipping back
+into the start-up path is caught like any other regression.
+
+``bench-rank`` measures top-k query latency of :class:`cvbuilder.ranking.CVIndex`
+against corpus size, with and without MaxScore pruning, on synthetic CVs drawn
+from a Zipf-distributed vocabulary (a few very common terms, a long tail).
+
+``bench-serialize`` compares the size and encode/decode time of a CV with a
+photo in the legacy backup (``json.dumps(..., indent=2)``, photo as base64),
+the versioned JSON and the binary CVB encoding of :mod:`cvbuilder.serialize`.
+"""
+import base64
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from cvbuilder.templates import DEFAULT_SETTINGS, LAYOUTS, empty_cv_data
+from cvbuilder.render import RENDERERS
+
+PROFILES = {
+    'small': {'experience': 1, 'skills': 5, 'desc_words': 40},
+    'medium': {'experience': 10, 'skills': 25, 'desc_words': 80},
+    'large': {'experience': 50, 'skills': 100, 'desc_words': 150},
+    'xlarge': {'experience': 200, 'skills': 500, 'desc_words': 300},
+}
+
+FORMATS = ('pdf', 'docx', 'html', 'package')
+# Start-up path of the CLI and of the render pool workers; fpdf/python-docx must stay lazy to keep it cheap.
+STARTUP_MODULE = 'cvbuilder.cli'
+STARTUP_BUDGET_MS = 100
+
+WORDS = ('managed developed created improved increased reduced led delivered built designed '
+         'data pipeline team customers revenue platform analytics migration latency budget '
+         'stakeholders roadmap quarterly automated reporting python sql cloud strategy').split()
+
+
+def synthetic_photo(seed=0, size=(1200, 1600)):
+    """A phone-sized JPEG of noise (worst case for compression), base64 encoded like the Build tab stores it."""
+    from PIL import Image
+    rng = random.Random(seed)
+    image = Image.frombytes('RGB', size, rng.randbytes(size[0] * size[1] * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=90)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def synthetic_cv(experience=1, skills=5, desc_words=40, photo=False, seed=0):
+    rng = random.Random(seed)
+
+    def sentence(n):
+        return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+    data = empty_cv_data()
+    data['personal_info'].update({
+        'nama': 'Budi Santoso', 'email': 'budi.santoso@example.com', 'telepon': '+62 812-3456-7890',
+        'alamat': 'Jakarta, Indonesia', 'linkedin': 'linkedin.com/in/budisantoso',
+        'posisi_target': 'Senior Data Scientist',
+        'foto': synthetic_photo(seed) if photo else None,
+    })
+    data['ringkasan'] = sentence(60)
+    data['pengalaman'] = [
+        {'posisi': f'Data Engineer {i + 1}', 'perusahaan': f'PT Contoh {i + 1}', 'periode': f'{2000 + i % 25} - {2001 + i % 25}',
+         'deskripsi': sentence(desc_words), 'lokasi': 'Jakarta'}
+        for i in range(experience)
+    ]
+    data['pendidikan'] = [{'institusi': 'Universitas Indonesia', 'gelar': 'S1 Ilmu Komputer', 'tahun': '2015', 'deskripsi': ''}]
+    data['keahlian'] = [f'Skill {i + 1}' for i in range(skills)]
+    data['bahasa'] = ['Indonesian', 'English']
+    return data
+
+
+RANK_TITLES = ('Data Scientist', 'Data Engineer', 'Software Engineer', 'Product Manager', 'Marketing Manager',
+               'Accountant', 'Sales Executive', 'UX Designer', 'DevOps Engineer', 'Business Analyst')
+
+
+def _zipf_sampler(rng, size=5000, exponent=1.1):
+    vocabulary = WORDS + [f"term{i}" for i in range(size)]
+    cumulative = []
+    total = 0.0
+    for rank in range(len(vocabulary)):
+        total += 1 / (rank + 1) ** exponent
+        cumulative.append(total)
+    return lambda n: rng.choices(vocabulary, cum_weights=cumulative, k=n)
+
+
+def synthetic_corpus(n, seed=0):
+    """``n`` varied ``(cv_id, cv_data)`` pairs drawn from a Zipf vocabulary."""
+    rng = random.Random(seed)
+    sample = _zipf_sampler(rng)
+    corpus = []
+    for i in range(n):
+        data = empty_cv_data()
+        data['personal_info'].update({'nama': f'Candidate {i}', 'posisi_target': rng.choice(RANK_TITLES)})
+        data['ringkasan'] = ' '.join(sample(40))
+        data['pengalaman'] = [{'posisi': rng.choice(RANK_TITLES), 'perusahaan': f'PT {j}', 'periode': '2020 - 2023',
+                               'deskripsi': ' '.join(sample(60))} for j in range(rng.randint(1, 5))]
+        data['keahlian'] = sample(rng.randint(5, 20))
+        corpus.append((f"cv{i}", data))
+    return corpus
+
+
+def synthetic_posting(seed=0):
+    rng = random.Random(seed + 1_000_003)
+    sample = _zipf_sampler(rng)
+    return f"{rng.choice(RANK_TITLES)}. " + ' '.join(sample(150)) + ". Required: " + ', '.join(sample(10))
+
+
+def run_rank_benchmarks(sizes, queries=20, k=10, progress=None):
+    from cvbuilder.ranking import CVIndex
+
+    postings = [synthetic_posting(q) for q in range(queries)]
+    results = []
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        index = CVIndex()
+        started = time.perf_counter()
+        for cv_id, data in corpus:
+            index.add(cv_id, data)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        timings = {True: [], False: []}
+        for posting in postings:
+            top = {}
+            for prune in (True, False):
+                started = time.perf_counter()
+                top[prune] = index.top(posting, k, prune=prune)
+                timings[prune].append((time.perf_counter() - started) * 1000)
+            if [round(m.score, 9) for m in top[True]] != [round(m.score, 9) for m in top[False]]:
+                raise AssertionError(f"pruned top-{k} differs from exhaustive top-{k} at size {size}")
+        case = {
+            'size': size, 'k': k, 'queries': queries,
+            'build_ms': round(build_ms, 1),
+            'pruned_median_ms': round(statistics.median(timings[True]), 3),
+            'pruned_max_ms': round(max(timings[True]), 3),
+            'exhaustive_median_ms': round(statistics.median(timings[False]), 3),
+            'exhaustive_max_ms': round(max(timings[False]), 3),
+        }
+        results.append(case)
+        if progress:
+            progress(case)
+    return results
+
+
+def run_rank_bench(args):
+    sizes = [int(v) for v in args.sizes.split(',') if v.strip()]
+
+    def progress(case):
+        print(f"{case['size']:>7} CVs: top-{case['k']} pruned {case['pruned_median_ms']:.2f} ms "
+              f"(max {case['pruned_max_ms']:.2f}), exhaustive {case['exhaustive_median_ms']:.2f} ms "
+              f"(max {case['exhaustive_max_ms']:.2f}), index build {case['build_ms'] / 1000:.1f} s")
+
+    results = run_rank_benchmarks(sizes, args.queries, args.top, progress)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(build_report(results, args.queries), f, indent=2)
+        print(f"Wrote {len(results)} cases to {args.out}")
+    return 0
+
+
+def _legacy_dumps(data, settings):
+    from cvbuilder.photo import inline_photo
+    return json.dumps(inline_photo(data), indent=2).encode('utf-8')
+
+
+def _legacy_loads(raw):
+    from cvbuilder.templates import normalize_cv_data
+    return normalize_cv_data(json.loads(raw)), {}
+
+
+def run_serialize_benchmarks(profiles=None, repeat=20, progress=None):
+    from cvbuilder.photo import PHOTOS
+    from cvbuilder import serialize
+
+    codecs = (
+        ('legacy_json', _legacy_dumps, _legacy_loads),
+        ('json', serialize.dumps_json, serialize.loads_json),
+        ('cvb', serialize.dumps_binary, serialize.loads_binary),
+        ('cvb_zlib', lambda data, settings: serialize.dumps_binary(data, settings, compress=True), serialize.loads_binary),
+    )
+    results = []
+    for profile in profiles or PROFILES:
+        data = synthetic_cv(**PROFILES[profile])
+        data['personal_info']['foto'] = PHOTOS.resolve(synthetic_photo())
+        for name, dumps, loads in codecs:
+            raw = dumps(data, DEFAULT_SETTINGS)
+            loads(raw)
+            encode, decode = [], []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                raw = dumps(data, DEFAULT_SETTINGS)
+                encode.append((time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                loads(raw)
+                decode.append((time.perf_counter() - started) * 1000)
+            case = {
+                'profile': profile, 'codec': name, 'bytes': len(raw),
+                'encode_ms': round(statistics.median(encode), 3),
+                'decode_ms': round(statistics.median(decode), 3),
+            }
+            results.append(case)
+            if progress:
+                progress(case)
+    return results
+
+
+def run_serialize_bench(args):
+    profiles = [p.strip() for p in args.profiles.split(',')] if args.profiles else None
+
+    def progress(case):
+        print(f"{case['profile']:>7} {case['codec']:<12} {case['bytes'] / 1024:9.1f} KiB  "
+              f"encode {case['encode_ms']:7.3f} ms  decode {case['decode_ms']:7.3f} ms")
+
+    results = run_serialize_benchmarks(profiles, args.repeat, progress)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(build_report(results, args.repeat), f, indent=2)
+        print(f"Wrote {len(results)} cases to {args.out}")
+    return 0
+
+
+def _runner(fmt):
+    if fmt == 'package':
+        from cvbuilder.package import build_package
+        return build_package
+    return RENDERERS[fmt]
+
+
+def measure(fn, data, settings, repeat):
+    fn(data, settings)  # warm-up: imports, plan compilation, font tables
+    times = []
+    output = b''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = fn(data, settings)
+        times.append((time.perf_counter() - started) * 1000)
+    tracemalloc.start()
+    try:
+        fn(data, settings)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'wall_ms': round(statistics.median(times), 3),
+        'min_ms': round(min(times), 3),
+        'peak_kib': round(peak / 1024, 1),
+        'bytes': len(output),
+    }
+
+
+def measure_startup(module=STARTUP_MODULE, repeat=5):
+    """Median time to import ``module`` in a fresh interpreter (interpreter start-up itself excluded)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get('PYTHONPATH')))))
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+        times.append(float(out.stdout) * 1000)
+    case = {'template': 'startup', 'format': 'import', 'profile': module, 'photo': False,
+            'wall_ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3)}
+    if case['wall_ms'] > STARTUP_BUDGET_MS:
+        case['error'] = f"import {module} took {case['wall_ms']:.1f} ms (budget {STARTUP_BUDGET_MS} ms)"
+    return case
+
+
+def case_key(case):
+    return f"{case['template']}/{case['format']}/{case['profile']}/{'photo' if case['photo'] else 'nophoto'}"
+
+
+def run_benchmarks(templates=None, profiles=None, formats=None, photo_modes=(False, True), repeat=3, progress=None,
+                   startup=True):
+    templates = templates or list(LAYOUTS)
+    profiles = profiles or list(PROFILES)
+    formats = formats or list(FORMATS)
+    payloads = {(p, photo): synthetic_cv(photo=photo, **PROFILES[p]) for p in profiles for photo in photo_modes}
+    total = len(templates) * len(formats) * len(payloads)
+    results = []
+    for template in templates:
+        settings = dict(DEFAULT_SETTINGS, template_style=template)
+        for fmt in formats:
+            fn = _runner(fmt)
+            for (profile, photo), data in payloads.items():
+                case = {'template': template, 'format': fmt, 'profile': profile, 'photo': photo}
+                try:
+                    case.update(measure(fn, data, settings, repeat))
+                except Exception as e:
+                    case['error'] = f"{type(e).__name__}: {e}"
+                results.append(case)
+                if progress:
+                    progress(len(results), total, case)
+    if startup:
+        try:
+            case = measure_startup(repeat=max(repeat, 5))
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            case = {'template': 'startup', 'format': 'import', 'profile': STARTUP_MODULE, 'photo': False,
+                    'error': f"{type(e).__name__}: {e}"}
+        results.append(case)
+        if progress:
+            progress(len(results), total + 1, case)
+    return results
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(results, repeat):
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_reports(current, baseline, threshold=0.25, min_delta_ms=1.0):
+    """Return ``(key, old_ms, new_ms)`` for every case slower than ``baseline`` by more than ``threshold``.
+
+    Slowdowns smaller than ``min_delta_ms`` in absolute terms are timer noise
+    on sub-millisecond cases and are ignored.
+    """
+    old = {case_key(c): c for c in baseline['results'] if 'wall_ms' in c}
+    regressions = []
+    for case in current['results']:
+        before = old.get(case_key(case))
+        if before is None or 'wall_ms' not in case:
+            continue
+        if case['wall_ms'] > before['wall_ms'] * (1 + threshold) and case['wall_ms'] - before['wall_ms'] >= min_delta_ms:
+            regressions.append((case_key(case), before['wall_ms'], case['wall_ms']))
+    return regressions
+
+
+def run_bench(args):
+    photo_modes = {'both': (False, True), 'with': (True,), 'without': (False,)}[args.photo]
+
+    def split(value):
+        return [v.strip() for v in value.split(',') if v.strip()] if value else None
+
+    def progress(done, total, case):
+        if not args.quiet:
+            status = case.get('error') or f"{case['wall_ms']:.1f} ms"
+            print(f"[{done}/{total}] {case_key(case)}: {status}", file=sys.stderr)
+
+    results = run_benchmarks(split(args.templates), split(args.profiles), split(args.formats), photo_modes, args.repeat, progress,
+                             startup=not args.no_startup)
+    report = build_report(results, args.repeat)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    failed = [c for c in results if 'error' in c]
+    print(f"Wrote {len(results)} cases to {args.out} ({len(failed)} failed)")
+
+    status = 1 if failed else 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.threshold, args.min_delta_ms)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.1f} ms -> {after:.1f} ms (+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            status = 1
+        else:
+            print(f"No regressions above {args.threshold * 100:.0f}% against {args.compare}")
+    return status
@@ -0,0 +1,196 @@
+"""Bulk import of candidates from CSV or JSONL files.
+
+:func:`import_records` streams a file row by row (``csv.DictReader`` or one
+JSON object per line), so a 100k-row export takes as much memory as one row.
+It yields an :class:`ImportedCV` for every row it can turn into ``cv_data``
+and a :class:`RowError` for every row it cannot, without stopping.
+
+CSV columns are mapped to ``cv_data`` fields by a ``{field: column}`` dict.
+Fields are the ``personal_info`` keys (``nama``, ``email``, ``posisi_target``,
+...), ``ringkasan`` and the comma-separated lists ``keahlian``, ``bahasa``
+and ``hobi`` (written like the Build tab's text areas). Without a mapping,
+columns are matched by :data:`COLUMN_ALIASES`. A JSONL line is either a flat
+object mapped the same way or a full backup/``cv_data`` object. Every row
+goes through :mod:`cvbuilder.serialize` (migration and validation) and needs
+a name. Rows that are not valid UTF-8 or that the CSV reader rejects (say,
+a cell over ``csv.field_size_limit()``) become a :class:`RowError` too; only
+an unreadable header stops the import (``ValueError``).
+
+``python -m cvbuilder import`` feeds the rows straight into batch rendering
+(see :mod:`cvbuilder.cli`).
+"""
+import contextlib
+import csv
+import io
+import json
+import sys
+from collections import namedtuple
+
+from cvbuilder.serialize import SchemaError, load_payload
+from cvbuilder.templates import empty_cv_data
+
+ImportedCV = namedtuple('ImportedCV', 'line data settings')
+RowError = namedtuple('RowError', 'line error raw')
+
+LIST_FIELDS = ('keahlian', 'bahasa', 'hobi')
+FIELDS = tuple(empty_cv_data()['personal_info']) + ('ringkasan',) + LIST_FIELDS
+COLUMN_ALIASES = {
+    'nama': ('nama', 'name', 'full name', 'candidate', 'candidate name'),
+    'email': ('email', 'e-mail', 'email address'),
+    'telepon': ('telepon', 'phone', 'phone number', 'mobile'),
+    'alamat': ('alamat', 'location', 'address', 'city'),
+    'linkedin': ('linkedin', 'linkedin url'),
+    'github': ('github',),
+    'website': ('website', 'portfolio'),
+    'posisi_target': ('posisi_target', 'posisi', 'position', 'target position', 'role', 'title', 'job title'),
+    'ringkasan': ('ringkasan', 'summary', 'profile'),
+    'keahlian': ('keahlian', 'skills'),
+    'bahasa': ('bahasa', 'languages'),
+    'hobi': ('hobi', 'hobbies', 'interests'),
+}
+
+
+def _normalize(column):
+    return ' '.join(column.replace('_', ' ').split()).lower()
+
+
+def resolve_mapping(columns, mapping=None):
+    """``{field: column}`` for ``columns``: ``mapping`` as given (checked), or matched by :data:`COLUMN_ALIASES`."""
+    if mapping:
+        unknown = [field for field in mapping if field not in FIELDS]
+        if unknown:
+            raise ValueError(f"unknown field(s) in mapping: {', '.join(unknown)} (choose from {', '.join(FIELDS)})")
+        missing = [column for column in mapping.values() if column not in columns]
+        if missing:
+            raise ValueError(f"column(s) not in the file: {', '.join(missing)}")
+        return dict(mapping)
+    by_name = {_normalize(column): column for column in columns}
+    resolved = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in by_name:
+                resolved[field] = by_name[alias]
+                break
+    return resolved
+
+
+def row_to_payload(row, mapping):
+    """The (unversioned) backup payload of one flat row."""
+    data = {'personal_info': {}}
+    for field, column in mapping.items():
+        value = row.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            continue
+        if field in ('ringkasan',) + LIST_FIELDS:
+            data[field] = value
+        else:
+            data['personal_info'][field] = value
+    return data
+
+
+def _printable(text):
+    """``text`` read with ``surrogateescape``, with its undecodable bytes shown as U+FFFD."""
+    return text.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+
+
+def _undecodable(values):
+    for value in values:
+        if isinstance(value, str):
+            try:
+                value.encode('utf-8')
+            except UnicodeEncodeError:
+                return True
+    return False
+
+
+def _convert(line, row, mapping, settings):
+    if not isinstance(row, dict):
+        return RowError(line, "expected an object", row)
+    try:
+        payload = row if 'cv_data' in row or 'personal_info' in row or 'schema' in row else row_to_payload(row, mapping)
+        data, row_settings = load_payload(payload)
+    except SchemaError as e:
+        return RowError(line, '; '.join(e.problems), row)
+    if not data['personal_info']['nama']:
+        return RowError(line, "nama: required", row)
+    return ImportedCV(line, data, dict(settings or {}, **row_settings))
+
+
+def _csv_rows(f, mapping, settings):
+    reader = csv.DictReader(f)
+    try:
+        columns = reader.fieldnames or []
+    except csv.Error as e:
+        raise ValueError(f"unreadable CSV header ({e})") from e
+    if _undecodable(columns):
+        raise ValueError("CSV header is not valid UTF-8")
+    mapping = resolve_mapping(columns, mapping)
+    # line_num counts physical lines (a quoted cell can span several); a row is reported by the line it starts on.
+    line = reader.line_num + 1
+    rows = iter(reader)
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The reader resumes on the next line.
+            yield RowError(line, f"unreadable CSV row ({e})", '')
+        else:
+            if _undecodable(row.values()):
+                yield RowError(line, "not valid UTF-8", {key: _printable(value) if isinstance(value, str) else value
+                                                         for key, value in row.items()})
+            else:
+                yield _convert(line, row, mapping, settings)
+        line = reader.line_num + 1
+
+
+def _jsonl_rows(f, mapping, settings):
+    if mapping:
+        mapping = resolve_mapping(list(mapping.values()), mapping)
+    mappings = {}
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        if _undecodable((text,)):
+            yield RowError(line, "not valid UTF-8", _printable(text.strip()))
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as e:
+            yield RowError(line, f"not valid JSON ({e})", text.strip())
+            continue
+        row_mapping = mapping
+        if not row_mapping and isinstance(row, dict):
+            # Keys can differ from line to line; lines of the same shape share their matched mapping.
+            keys = tuple(row)
+            row_mapping = mappings.get(keys)
+            if row_mapping is None:
+                if len(mappings) >= 64:
+                    mappings.clear()
+                row_mapping = mappings[keys] = resolve_mapping(keys)
+        yield _convert(line, row, row_mapping, settings)
+
+
+def import_records(path, mapping=None, settings=None, fmt=None):
+    """Yield an :class:`ImportedCV` or :class:`RowError` per data row of the CSV/JSONL file at ``path``.
+
+    ``fmt`` is ``'csv'`` or ``'jsonl'`` (default: from the extension; ``-`` reads stdin as CSV).
+    ``settings`` is merged under each row's own settings. The file is decoded
+    with ``surrogateescape`` so a stray Latin-1 byte costs one row, not the run.
+    """
+    fmt = fmt or ('jsonl' if str(path).endswith(('.jsonl', '.ndjson')) else 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"unknown import format: {fmt}")
+    newline = '' if fmt == 'csv' else None
+    if path == '-':
+        stdin = sys.stdin
+        if hasattr(stdin, 'buffer'):
+            stdin = io.TextIOWrapper(stdin.buffer, encoding='utf-8-sig', errors='surrogateescape', newline=newline)
+        f = contextlib.nullcontext(stdin)
+    else:
+        f = open(path, encoding='utf-8-sig', errors='surrogateescape', newline=newline)
+    with f as lines:
+        yield from (_csv_rows if fmt == 'csv' else _jsonl_rows)(lines, mapping, settings)
@@ -0,0 +1,123 @@
+"""Content-addressed cache for rendered PDF/DOCX artifacts.
+
+Keys are SHA-256 digests of the canonicalized ``cv_data`` + ``settings``
+(sorted keys, fixed separators), so two dicts with the same content always
+map to the same key regardless of insertion order. A :class:`RenderCache` can
+sit in front of a persistent store (:mod:`cvbuilder.store`) so rendered
+artifacts survive worker restarts, or in front of an on-disk
+:class:`cvbuilder.artifacts.ArtifactCache` shared by several worker processes.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def canonical_json(obj):
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def render_key(kind, data, settings):
+    payload = canonical_json({'kind': kind, 'data': data, 'settings': settings})
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """LRU cache of rendered bytes, bounded by entry count and total size.
+
+    One instance is shared by every session on a worker, so all access
+    goes through a lock. With a ``backing`` store, misses are looked up there
+    before rendering and fresh renders are written through to it.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, backing=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backing = backing
+        self.backing_hits = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, kind, data, settings, render):
+        """Return the cached artifact, or call ``render(data, settings)`` and store the result."""
+        key = render_key(kind, data, settings)
+        value = self.get(key)
+        if value is not None:
+            return value
+        if hasattr(self.backing, 'get_or_render'):
+            # Shared backing (cvbuilder.artifacts): one process renders, the others wait for its file.
+            # It reads the file itself, so nothing is read here first.
+            rendered = []
+
+            def render_here():
+                rendered.append(True)
+                return render(data, settings)
+
+            value = self.backing.get_or_render(key, kind, render_here)
+            if not rendered:
+                self.backing_hits += 1
+            self.put(key, value)
+            return value
+        if self.backing is not None:
+            value = self.backing.get_artifact(key)
+            if value is not None:
+                self.backing_hits += 1
+                self.put(key, value)
+                return value
+        value = render(data, settings)
+        if hasattr(value, 'getvalue'):
+            value = value.getvalue()
+        self.put(key, value)
+        if self.backing is not None:
+            self.backing.put_artifact(key, kind, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'backing_hits': self.backing_hits,
+        }
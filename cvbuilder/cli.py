@@ -0,0 +1,510 @@
+"""Headless batch rendering.
+
+Usage::
+
+    python -m cvbuilder render --in cvs/ --out build/ --formats pdf,docx --jobs 8 [--cache DIR]
+    python -m cvbuilder parse --in old_cvs/ --out cvs/ --jobs 8
+    python -m cvbuilder import --in candidates.csv --out build/ [--mapping map.json] [--errors bad_rows.csv]
+    python -m cvbuilder bench --out bench.json [--compare baseline.json]
+    python -m cvbuilder bench-rank --sizes 1000,5000,20000
+    python -m cvbuilder bench-serialize --profiles large,xlarge
+
+Each ``*.json`` file in ``--in`` is a backup in any schema version the app
+reads (see :mod:`cvbuilder.serialize`: the app's "Backup Data (JSON)"
+export, ``{"cv_data": ..., "settings": ...}`` or a bare ``cv_data`` dict);
+``*.cvb`` files are the binary encoding of the same. Every file is migrated
+and validated before rendering. Settings not given per file come from
+``--settings`` and then from the app defaults. With ``--cache`` every worker reads and writes rendered files
+through a shared :class:`cvbuilder.artifacts.ArtifactCache` directory, so
+repeated runs (or several runs at once) only render what is new.
+
+``import`` renders a spreadsheet export instead, one CV per row (see
+:mod:`cvbuilder.bulk` for the column mapping); the file is streamed, never
+loaded whole. ``parse`` turns a folder of existing .docx/.pdf CVs into
+JSON backups (see :mod:`cvbuilder.resume`) that ``render`` and the app's
+Restore Backup read.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from cvbuilder.templates import DEFAULT_SETTINGS, LAYOUTS
+from cvbuilder.render import RENDERERS
+
+_artifact_caches = {}
+# How often ``import`` replaces a pool whose worker died before giving up.
+MAX_POOL_RESTARTS = 3
+
+
+def artifact_cache(root):
+    """One :class:`ArtifactCache` per directory and process."""
+    cache = _artifact_caches.get(root)
+    if cache is None:
+        from cvbuilder.artifacts import ArtifactCache
+        cache = _artifact_caches[root] = ArtifactCache(root)
+    return cache
+
+
+def load_cv_file(path, base_settings):
+    from cvbuilder.serialize import loads
+    with open(path, 'rb') as f:
+        data, settings = loads(f.read())
+    return data, dict(base_settings, **settings)
+
+
+def write_outputs(data, settings, stem, out_dir, formats, cache_dir=None):
+    """Render ``data`` to ``out_dir/stem.<fmt>`` for every format; returns the bytes written."""
+    written = 0
+    for fmt in formats:
+        if cache_dir:
+            from cvbuilder.cache import render_key
+            output = artifact_cache(cache_dir).get_or_render(
+                render_key(fmt, data, settings), fmt, lambda: RENDERERS[fmt](data, settings))
+        else:
+            output = RENDERERS[fmt](data, settings)
+        with open(Path(out_dir) / f"{stem}.{fmt}", 'wb') as f:
+            f.write(output)
+        written += len(output)
+    return written
+
+
+def render_file(task):
+    """Render one CV file to every requested format. Runs inside a worker process."""
+    path, out_dir, formats, base_settings, cache_dir = task
+    started = time.perf_counter()
+    try:
+        data, settings = load_cv_file(path, base_settings)
+        written = write_outputs(data, settings, Path(path).stem, out_dir, formats, cache_dir)
+    except Exception as e:
+        return path, False, f"{type(e).__name__}: {e}", 0, time.perf_counter() - started
+    return path, True, None, written, time.perf_counter() - started
+
+
+def render_record(task):
+    """Render one imported row (see :func:`run_import`). Runs inside a worker process."""
+    line, stem, data, settings, out_dir, formats, cache_dir = task
+    started = time.perf_counter()
+    try:
+        written = write_outputs(data, settings, stem, out_dir, formats, cache_dir)
+    except Exception as e:
+        return line, False, f"{type(e).__name__}: {e}", 0, time.perf_counter() - started
+    return line, True, None, written, time.perf_counter() - started
+
+
+def _parse_formats(value):
+    formats = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in RENDERERS]
+    if unknown:
+        print(f"error: unknown format(s): {', '.join(unknown)} (choose from {', '.join(RENDERERS)})", file=sys.stderr)
+        return None
+    return formats
+
+
+def _base_settings(args):
+    """App defaults, then ``--settings``, then ``--template``; ``None`` (after printing why) if they do not validate."""
+    from cvbuilder.serialize import SchemaError, validate
+    base_settings = dict(DEFAULT_SETTINGS)
+    try:
+        if args.settings:
+            with open(args.settings, encoding='utf-8') as f:
+                base_settings.update(json.load(f))
+        if args.template:
+            base_settings['template_style'] = args.template
+        validate({}, base_settings)
+    except SchemaError as e:
+        print(f"error: {args.settings or 'settings'}: {'; '.join(e.problems)}", file=sys.stderr)
+        return None
+    except (OSError, ValueError) as e:
+        print(f"error: {args.settings}: {e}", file=sys.stderr)
+        return None
+    return base_settings
+
+
+def run_render(args):
+    in_dir = Path(args.input)
+    out_dir = Path(args.output)
+    formats = _parse_formats(args.formats)
+    if formats is None:
+        return 2
+    if not in_dir.is_dir():
+        print(f"error: input directory not found: {in_dir}", file=sys.stderr)
+        return 2
+
+    base_settings = _base_settings(args)
+    if base_settings is None:
+        return 2
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = sorted(str(p) for pattern in ('*.json', '*.cvb') for p in in_dir.glob(pattern))
+    total = len(paths)
+    if not total:
+        print(f"No .json or .cvb files found in {in_dir}", file=sys.stderr)
+        return 0
+
+    tasks = [(p, str(out_dir), formats, base_settings, args.cache) for p in paths]
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, total))
+    failures = []
+    bytes_out = 0
+    started = time.perf_counter()
+
+    if jobs == 1:
+        results = map(render_file, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(jobs)
+        chunksize = max(1, min(32, total // (jobs * 4)))
+        results = pool.imap_unordered(render_file, tasks, chunksize=chunksize)
+
+    try:
+        for done, (path, ok, error, written, elapsed) in enumerate(results, 1):
+            bytes_out += written
+            if not ok:
+                failures.append((path, error))
+                print(f"\n[FAIL] {path}: {error}", file=sys.stderr)
+            if not args.quiet:
+                print(f"\r[{done}/{total}] {done * 100 // total}%", end='', file=sys.stderr, flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        print(file=sys.stderr)
+    ok_count = total - len(failures)
+    print(f"Rendered {ok_count}/{total} CVs ({', '.join(formats)}) with {jobs} worker(s) "
+          f"in {elapsed:.2f}s - {ok_count / elapsed if elapsed else 0:.1f} CV/s, "
+          f"{bytes_out / (1024 * 1024):.1f} MB written")
+    if failures:
+        print(f"{len(failures)} file(s) failed:", file=sys.stderr)
+        for path, error in failures:
+            print(f"  {path}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_file(task):
+    """Parse one .docx/.pdf CV into a JSON backup in ``out_dir``. Runs inside a worker process."""
+    path, out_dir, budget = task
+    from cvbuilder.resume import parse_resume
+    from cvbuilder.serialize import dumps_json
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            parsed = parse_resume(f.read(), path, budget)
+        # cv.docx and cv.pdf side by side must not overwrite each other.
+        with open(Path(out_dir) / f"{Path(path).stem}_{Path(path).suffix[1:].lower()}.json", 'wb') as f:
+            f.write(dumps_json(parsed.data))
+    except Exception as e:
+        return path, False, f"{type(e).__name__}: {e}", False, time.perf_counter() - started
+    return path, True, None, parsed.partial, time.perf_counter() - started
+
+
+def run_parse(args):
+    in_dir = Path(args.input)
+    out_dir = Path(args.output)
+    if not in_dir.is_dir():
+        print(f"error: input directory not found: {in_dir}", file=sys.stderr)
+        return 2
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = sorted(str(p) for pattern in ('*.docx', '*.pdf') for p in in_dir.glob(pattern))
+    total = len(paths)
+    if not total:
+        print(f"No .docx or .pdf files found in {in_dir}", file=sys.stderr)
+        return 0
+
+    tasks = [(p, str(out_dir), args.budget) for p in paths]
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, total))
+    failures = []
+    partial = []
+    started = time.perf_counter()
+    pool = multiprocessing.Pool(jobs) if jobs > 1 else None
+    results = pool.imap_unordered(parse_file, tasks, chunksize=max(1, min(16, total // (jobs * 4)))) if pool else map(parse_file, tasks)
+    try:
+        for done, (path, ok, error, was_partial, elapsed) in enumerate(results, 1):
+            if not ok:
+                failures.append((path, error))
+                print(f"\n[FAIL] {path}: {error}", file=sys.stderr)
+            elif was_partial:
+                partial.append(path)
+            if not args.quiet:
+                print(f"\r[{done}/{total}] {done * 100 // total}%", end='', file=sys.stderr, flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Parsed {total - len(failures)}/{total} CVs with {jobs} worker(s) in {elapsed:.2f}s "
+          f"({len(partial)} cut short by the {args.budget:g}s budget)")
+    for path in partial:
+        print(f"  partial: {path}", file=sys.stderr)
+    if failures:
+        print(f"{len(failures)} file(s) failed:", file=sys.stderr)
+        for path, error in failures:
+            print(f"  {path}: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _output_stem(line, data):
+    name = re.sub(r'[^\w-]+', '_', data['personal_info']['nama']).strip('_')[:60]
+    return f"{line:06d}_{name or 'cv'}"
+
+
+def run_import(args):
+    """Stream ``--in`` through :func:`cvbuilder.bulk.import_records` into the render workers.
+
+    Rows are read one at a time and at most ``jobs * 4`` of them are in
+    flight, so memory stays flat however long the file is. Rows that do not
+    validate go to ``--errors`` (CSV: line, error, raw row) as they are found.
+    If a worker process dies, the rows it took down count as failed and the
+    pool is started again, up to :data:`MAX_POOL_RESTARTS` times.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from concurrent.futures.process import BrokenProcessPool
+    from cvbuilder.bulk import RowError, import_records
+
+    formats = _parse_formats(args.formats)
+    if formats is None:
+        return 2
+    if args.input != '-' and not os.path.isfile(args.input):
+        print(f"error: input file not found: {args.input}", file=sys.stderr)
+        return 2
+    mapping = None
+    if args.mapping:
+        with open(args.mapping, encoding='utf-8') as f:
+            mapping = json.load(f)
+    base_settings = _base_settings(args)
+    if base_settings is None:
+        return 2
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    store = None
+    pending_records = []
+    if args.store:
+        from cvbuilder.store import CVRecord, open_store
+        store = open_store(args.store)
+
+    def save_pending():
+        if pending_records:
+            store.save_many(pending_records)
+            pending_records.clear()
+
+    errors_file = open(args.errors, 'w', encoding='utf-8', newline='') if args.errors else None
+    errors_writer = csv.writer(errors_file) if errors_file else None
+    if errors_writer:
+        errors_writer.writerow(['line', 'error', 'raw'])
+
+    jobs = max(1, args.jobs or os.cpu_count() or 1)
+    # fork where the platform has it (workers start at once); spawn elsewhere (Windows, macOS builds without fork).
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+
+    def new_pool():
+        return ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context(start_method)) if jobs > 1 else None
+
+    pool = new_pool()
+    in_flight = {}
+    counts = {'rows': 0, 'rendered': 0, 'invalid': 0, 'failed': 0}
+    restarts = 0
+    bytes_out = 0
+    started = time.perf_counter()
+
+    def record(result):
+        nonlocal bytes_out
+        line, ok, error, written, elapsed = result
+        bytes_out += written
+        if ok:
+            counts['rendered'] += 1
+        else:
+            counts['failed'] += 1
+            print(f"\n[FAIL] line {line}: {error}", file=sys.stderr)
+
+    def restart(error):
+        nonlocal pool, restarts
+        restarts += 1
+        pool.shutdown(cancel_futures=True)
+        if restarts > MAX_POOL_RESTARTS:
+            pool = None
+            raise error
+        print(f"\n[WARN] a worker process died; restarting the pool ({restarts}/{MAX_POOL_RESTARTS})",
+              file=sys.stderr)
+        pool = new_pool()
+
+    def collect(futures):
+        broken = None
+        for future in futures:
+            line = in_flight.pop(future)
+            try:
+                record(future.result())
+            except BrokenProcessPool as e:
+                broken = e
+                record((line, False, "worker process died", 0, 0.0))
+        if broken is not None:
+            # The rest of the rows in flight went down with the same pool.
+            for future in wait(list(in_flight)).done:
+                line = in_flight.pop(future)
+                try:
+                    record(future.result())
+                except BrokenProcessPool:
+                    record((line, False, "worker process died", 0, 0.0))
+            restart(broken)
+
+    def submit(task):
+        try:
+            future = pool.submit(render_record, task)
+        except BrokenProcessPool as e:
+            broken_pool = pool
+            collect(list(in_flight))
+            if pool is broken_pool:
+                restart(e)
+            future = pool.submit(render_record, task)
+        in_flight[future] = task[0]
+
+    try:
+        for item in import_records(args.input, mapping, base_settings, args.format):
+            counts['rows'] += 1
+            if isinstance(item, RowError):
+                counts['invalid'] += 1
+                if errors_writer:
+                    raw = item.raw if isinstance(item.raw, str) else json.dumps(item.raw, ensure_ascii=False)
+                    errors_writer.writerow([item.line, item.error, raw])
+                elif not args.quiet:
+                    print(f"\n[SKIP] line {item.line}: {item.error}", file=sys.stderr)
+                continue
+            if store is not None:
+                pending_records.append(CVRecord(uuid.uuid4().hex, None, item.data, item.settings, None))
+                if len(pending_records) >= 500:
+                    save_pending()
+            task = (item.line, _output_stem(item.line, item.data), item.data, item.settings,
+                    str(out_dir), formats, args.cache)
+            if pool is None:
+                record(render_record(task))
+            else:
+                submit(task)
+                if len(in_flight) >= jobs * 4:
+                    collect(wait(list(in_flight), return_when=FIRST_COMPLETED).done)
+            if not args.quiet and counts['rows'] % 100 == 0:
+                print(f"\r{counts['rows']} rows, {counts['rendered']} rendered, {counts['invalid']} invalid",
+                      end='', file=sys.stderr, flush=True)
+        collect(wait(list(in_flight)).done)
+        if store is not None:
+            save_pending()
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"\nerror: {e}", file=sys.stderr)
+        return 2
+    except BrokenProcessPool as e:
+        print(f"\nerror: worker processes kept dying, stopped after {MAX_POOL_RESTARTS} restarts ({e})",
+              file=sys.stderr)
+        return 2
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if errors_file is not None:
+            errors_file.close()
+        if store is not None:
+            store.close()
+
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"Imported {counts['rows']} rows: {counts['rendered']} rendered ({', '.join(formats)}), "
+          f"{counts['invalid']} invalid, {counts['failed']} failed with {jobs} worker(s) in {elapsed:.2f}s - "
+          f"{counts['rendered'] / elapsed if elapsed else 0:.1f} CV/s, {bytes_out / (1024 * 1024):.1f} MB written")
+    return 1 if counts['invalid'] or counts['failed'] else 0
+
+
+def run_bench_command(args):
+    from cvbuilder.bench import run_bench
+    return run_bench(args)
+
+
+def run_rank_bench_command(args):
+    from cvbuilder.bench import run_rank_bench
+    return run_rank_bench(args)
+
+
+def run_serialize_bench_command(args):
+    from cvbuilder.bench import run_serialize_bench
+    return run_serialize_bench(args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cvbuilder', description="CV Builder Pro Ultra command line tools")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    render = sub.add_parser('render', help="Render a directory of cv_data JSON/CVB files")
+    render.add_argument('--in', dest='input', required=True, help="directory of *.json / *.cvb cv_data files")
+    render.add_argument('--out', dest='output', required=True, help="directory to write rendered files to")
+    render.add_argument('--formats', default='pdf,docx', help="comma separated list of: " + ", ".join(RENDERERS))
+    render.add_argument('--jobs', type=int, default=0, help="worker processes (default: CPU count)")
+    render.add_argument('--settings', help="JSON file with settings applied to every CV")
+    render.add_argument('--template', choices=tuple(LAYOUTS), help="override settings['template_style']")
+    render.add_argument('--cache', help="shared artifact cache directory (reused across runs and processes)")
+    render.add_argument('--quiet', action='store_true', help="no progress output")
+    render.set_defaults(func=run_render)
+
+    imp = sub.add_parser('import', help="Render every row of a CSV/JSONL candidate export")
+    imp.add_argument('--in', dest='input', required=True, help="CSV or JSONL file (- reads CSV from stdin)")
+    imp.add_argument('--out', dest='output', required=True, help="directory to write rendered files to")
+    imp.add_argument('--format', choices=('csv', 'jsonl'), help="input format (default: from the file extension)")
+    imp.add_argument('--mapping', help='JSON file mapping cv_data fields to columns, e.g. {"nama": "Full Name"}')
+    imp.add_argument('--errors', help="write rows that fail validation to this CSV file")
+    imp.add_argument('--formats', default='pdf', help="comma separated list of: " + ", ".join(RENDERERS))
+    imp.add_argument('--jobs', type=int, default=0, help="worker processes (default: CPU count)")
+    imp.add_argument('--settings', help="JSON file with settings applied to every CV")
+    imp.add_argument('--template', choices=tuple(LAYOUTS), help="override settings['template_style']")
+    imp.add_argument('--cache', help="shared artifact cache directory (reused across runs and processes)")
+    imp.add_argument('--store', help="also save every imported CV to this store (SQLite path)")
+    imp.add_argument('--quiet', action='store_true', help="no progress output")
+    imp.set_defaults(func=run_import)
+
+    parse = sub.add_parser('parse', help="Extract cv_data from a directory of existing .docx/.pdf CVs")
+    parse.add_argument('--in', dest='input', required=True, help="directory of *.docx / *.pdf CVs")
+    parse.add_argument('--out', dest='output', required=True, help="directory to write the JSON backups to")
+    parse.add_argument('--jobs', type=int, default=0, help="worker processes (default: CPU count)")
+    parse.add_argument('--budget', type=float, default=5.0, help="seconds of text extraction per file")
+    parse.add_argument('--quiet', action='store_true', help="no progress output")
+    parse.set_defaults(func=run_parse)
+
+    bench = sub.add_parser('bench', help="Benchmark rendering across templates, formats and CV sizes")
+    bench.add_argument('--out', default='bench.json', help="where to write the JSON report")
+    bench.add_argument('--compare', help="baseline report to check for regressions")
+    bench.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown vs. baseline (0.25 = 25%%)")
+    bench.add_argument('--min-delta-ms', type=float, default=1.0, help="ignore slowdowns smaller than this many ms")
+    bench.add_argument('--repeat', type=int, default=3, help="timed runs per case")
+    bench.add_argument('--templates', help="comma separated subset of templates")
+    bench.add_argument('--profiles', help="comma separated subset of: small, medium, large, xlarge")
+    bench.add_argument('--formats', help="comma separated subset of: pdf, docx, html, package")
+    bench.add_argument('--photo', choices=('both', 'with', 'without'), default='both', help="payloads with/without a base64 photo")
+    bench.add_argument('--no-startup', action='store_true', help="skip the cold 'import cvbuilder.cli' case")
+    bench.add_argument('--quiet', action='store_true', help="no per-case output")
+    bench.set_defaults(func=run_bench_command)
+
+    rank = sub.add_parser('bench-rank', help="Benchmark top-k CV ranking latency against corpus size")
+    rank.add_argument('--sizes', default='1000,5000,20000', help="comma separated corpus sizes")
+    rank.add_argument('--queries', type=int, default=20, help="job postings queried per size")
+    rank.add_argument('--top', type=int, default=10, help="k of the top-k query")
+    rank.add_argument('--out', help="optional JSON report")
+    rank.set_defaults(func=run_rank_bench_command)
+
+    serial = sub.add_parser('bench-serialize', help="Benchmark backup size and encode/decode time per format")
+    serial.add_argument('--profiles', help="comma separated subset of: small, medium, large, xlarge")
+    serial.add_argument('--repeat', type=int, default=20, help="timed runs per case")
+    serial.add_argument('--out', help="optional JSON report")
+    serial.set_defaults(func=run_serialize_bench_command)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,287 @@
+"""Deferred export jobs.
+
+An :class:`ExportJob` holds a snapshot of ``cv_data`` + ``settings`` and only
+renders when it is called, which is what ``st.download_button`` does with a
+callable ``data`` argument once the user actually clicks. Until then the job
+stays ``pending`` and costs nothing beyond the snapshot.
+
+On a shared server the renders themselves go through an :class:`ExportQueue`
+in front of the process pool. The queue keeps at most one job per pool worker
+in flight and serves single-format downloads before full packages. It caps
+the jobs one session has running, rejects new work once too much is waiting
+(:class:`QueueFull`), and drops queued jobs of sessions that have
+disconnected. Script and download threads only wait on a future, so a burst
+of exports cannot tie up the threads that run UI reruns. :func:`process_pool`
+builds a pool for it that is safe to start from inside the server.
+"""
+import copy
+import heapq
+import itertools
+import multiprocessing
+import sys
+import threading
+import time
+import types
+from collections import Counter, deque
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+
+from cvbuilder.cache import render_key
+from cvbuilder.render import RENDERERS
+
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ExportJob:
+    def __init__(self, kind, data, settings, render, cache=None):
+        self.kind = kind
+        self.data = copy.deepcopy(data)
+        self.settings = copy.deepcopy(settings)
+        self.render = render
+        self.cache = cache
+        self.status = PENDING
+        self.error = None
+        self._result = None
+        self._lock = threading.Lock()
+
+    def matches(self, data, settings):
+        return self.data == data and self.settings == settings
+
+    @property
+    def key(self):
+        return render_key(self.kind, self.data, self.settings)
+
+    def __call__(self, render=None):
+        """Render (once) and return the bytes. ``render`` overrides the job's renderer for this call."""
+        render = render or self.render
+        with self._lock:
+            if self._result is not None:
+                return self._result
+            self.status = RUNNING
+            try:
+                if self.cache is not None:
+                    result = self.cache.get_or_render(self.kind, self.data, self.settings, render)
+                else:
+                    result = render(self.data, self.settings)
+                    if hasattr(result, 'getvalue'):
+                        result = result.getvalue()
+            except Exception as e:
+                self.status = FAILED
+                self.error = e
+                raise
+            self._result = result
+            self.status = READY
+            self.error = None
+            return result
+
+
+def get_export_job(jobs, kind, data, settings, render, cache=None):
+    """Return the job for ``kind`` from ``jobs``, replacing it if the CV changed since it was created."""
+    job = jobs.get(kind)
+    if job is None or not job.matches(data, settings):
+        job = ExportJob(kind, data, settings, render, cache)
+        jobs[kind] = job
+    return job
+
+
+# --- EXPORT QUEUE (di depan process pool, dibagi ke semua session di worker ini) ---
+INTERACTIVE = 0
+BATCH = 1
+
+
+class QueueFull(RuntimeError):
+    """Raised by :meth:`ExportQueue.submit` when too many exports are already waiting."""
+
+
+class _Ticket:
+    __slots__ = ('session', 'fn', 'args', 'priority', 'future', 'queued_at', 'started_at')
+
+    def __init__(self, session, fn, args, priority):
+        self.session = session
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+
+
+class ExportQueue:
+    """Priority queue of render jobs in front of ``executor`` (a process pool with ``workers`` processes).
+
+    Jobs are handed to the pool only when a worker is free, so the order is
+    decided here: :data:`INTERACTIVE` before :data:`BATCH`, then first come
+    first served. A session never has more than ``per_session`` jobs running.
+    Its other jobs wait without holding back anyone else's. ``submit`` raises
+    :class:`QueueFull` once ``max_pending`` jobs are waiting; batch jobs are
+    refused at half that depth, so packages are shed before downloads.
+    ``is_alive(session)`` is checked before a job starts: jobs of sessions
+    that have gone away are cancelled instead of rendered. ``observe(name,
+    seconds)`` (e.g. :meth:`cvbuilder.instrument.Profiler.observe`) receives
+    each job's ``export_wait`` and ``export_run`` time.
+    """
+
+    def __init__(self, executor, workers, max_pending=32, per_session=1, is_alive=None, observe=None, window=256):
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.per_session = per_session
+        self.is_alive = is_alive
+        self.observe = observe
+        self._heap = []
+        self._seq = itertools.count()
+        self._running = Counter()
+        self._queued = Counter()
+        self._counts = Counter()
+        self._waits = deque(maxlen=window)
+        self._runs = deque(maxlen=window)
+        # Reentrant: a job that is already done when it is handed over runs its callback right away.
+        self._lock = threading.RLock()
+
+    def submit(self, session, fn, *args, priority=INTERACTIVE):
+        """Queue ``fn(*args)`` for ``session``; returns a :class:`concurrent.futures.Future` of its result."""
+        ticket = _Ticket(session, fn, args, priority)
+        with self._lock:
+            limit = self.max_pending if priority == INTERACTIVE else self.max_pending // 2
+            if len(self._heap) >= limit:
+                self._counts['rejected'] += 1
+                raise QueueFull("The export queue is full, please try again in a moment.")
+            heapq.heappush(self._heap, (priority, next(self._seq), ticket))
+            self._queued[priority] += 1
+            self._counts['submitted'] += 1
+            self._dispatch()
+        return ticket.future
+
+    def cancel_session(self, session):
+        """Cancel every queued job of ``session``; returns how many. Jobs already running finish."""
+        with self._lock:
+            keep = []
+            cancelled = 0
+            for item in self._heap:
+                ticket = item[2]
+                if ticket.session == session:
+                    self._drop(ticket)
+                    cancelled += 1
+                else:
+                    keep.append(item)
+            heapq.heapify(keep)
+            self._heap = keep
+            self._dispatch()
+        return cancelled
+
+    def _drop(self, ticket):
+        self._queued[ticket.priority] -= 1
+        self._counts['cancelled'] += 1
+        ticket.future.cancel()
+
+    def _dispatch(self):
+        # Called with the lock held: start queued jobs while workers are free.
+        skipped = []
+        while self._heap and sum(self._running.values()) < self.workers:
+            item = heapq.heappop(self._heap)
+            ticket = item[2]
+            if ticket.future.cancelled() or (self.is_alive is not None and not self.is_alive(ticket.session)):
+                self._drop(ticket)
+                continue
+            if self._running[ticket.session] >= self.per_session:
+                skipped.append(item)
+                continue
+            self._queued[ticket.priority] -= 1
+            if not ticket.future.set_running_or_notify_cancel():
+                self._counts['cancelled'] += 1
+                continue
+            ticket.started_at = time.perf_counter()
+            self._record('export_wait', self._waits, ticket.started_at - ticket.queued_at)
+            try:
+                work = self.executor.submit(ticket.fn, *ticket.args)
+            except BrokenExecutor as e:
+                self._counts['failed'] += 1
+                ticket.future.set_exception(e)
+                continue
+            self._running[ticket.session] += 1
+            work.add_done_callback(lambda work, ticket=ticket: self._finished(ticket, work))
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+
+    def _finished(self, ticket, work):
+        with self._lock:
+            self._running[ticket.session] -= 1
+            if not self._running[ticket.session]:
+                del self._running[ticket.session]
+            self._record('export_run', self._runs, time.perf_counter() - ticket.started_at)
+            error = work.exception()
+            self._counts['failed' if error is not None else 'completed'] += 1
+            self._dispatch()
+        if error is not None:
+            ticket.future.set_exception(error)
+        else:
+            ticket.future.set_result(work.result())
+
+    def _record(self, name, window, seconds):
+        window.append(seconds)
+        if self.observe is not None:
+            self.observe(name, seconds)
+
+    def stats(self):
+        """Queue depth, jobs running, job counters and recent wait/run latency (p50/p95, ms)."""
+        with self._lock:
+            stats = {
+                'queued_interactive': self._queued[INTERACTIVE],
+                'queued_batch': self._queued[BATCH],
+                'running': sum(self._running.values()),
+                'sessions_running': len(self._running),
+            }
+            for name in ('submitted', 'rejected', 'cancelled', 'completed', 'failed'):
+                stats[name] = self._counts[name]
+            for name, window in (('wait', self._waits), ('run', self._runs)):
+                ordered = sorted(window)
+                for q in (50, 95):
+                    stats[f'{name}_ms_p{q}'] = round(ordered[(len(ordered) - 1) * q // 100] * 1000, 1) if ordered else None
+        return stats
+
+
+def process_pool(workers, initializer=None, initargs=(), preload=('cvbuilder.render', 'cvbuilder.resume')):
+    """A :class:`ProcessPoolExecutor` that is safe to start from a threaded server such as Streamlit.
+
+    Forking a process whose other threads may hold locks (logging, SQLite,
+    the autosaver) can leave the child deadlocked, so the workers come from a
+    forkserver with ``preload`` already imported (spawn where there is no
+    forkserver). Both re-import the parent's ``__main__`` script in every
+    worker; for a Streamlit app that would run the whole script again there.
+    The workers are therefore started right away, with ``__main__`` replaced
+    by an empty module while they start.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if context.get_start_method() == 'forkserver':
+        context.set_forkserver_preload(list(preload))
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=initializer, initargs=initargs)
+    main = sys.modules['__main__']
+    stand_in = sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        # Workers other than fork's are all started on the first submit.
+        pool.submit(int).result()
+    except BaseException:
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        # Another script run may have installed its own __main__ meanwhile; leave that one in place.
+        if sys.modules['__main__'] is stand_in:
+            sys.modules['__main__'] = main
+    return pool
+
+
+def queued(queue, fmt, session, priority=INTERACTIVE):
+    """A ``(data, settings)`` renderer for ``fmt`` that runs through ``queue`` on behalf of ``session``.
+
+    Like :func:`cvbuilder.render.pooled`, it renders in-process if the pool has broken.
+    """
+    def render_queued(data, settings):
+        try:
+            return queue.submit(session, RENDERERS[fmt], data, settings, priority=priority).result()
+        except BrokenExecutor:
+            return RENDERERS[fmt](data, settings)
+    render_queued.__name__ = f'render_{fmt}'
+    return render_queued
@@ -0,0 +1,440 @@
+"""TrueType fonts for the PDF backend.
+
+fpdf's core fonts only cover cp1252: names like "Ğ" or "ş", "→" or the
+templates' "✉" were silently dropped. :func:`pdf_font` finds a TrueType file
+per style for each :data:`~cvbuilder.templates.FONTS` entry, looking in the
+package's ``ttf/`` directory, then ``CVBUILDER_FONT_DIR`` (``os.pathsep``
+separated), then the system font directories. :func:`register` adds it to a
+document and :func:`pdf_text` keeps every character the font has a glyph for
+and drops the rest (emoji, variation selectors). ``ttf/`` ships DejaVu Sans
+(regular and bold, Bitstream Vera license), the last resort of every family,
+so Unicode text survives on hosts without system fonts. Should no TrueType
+file be found at all, a family falls back to a core font (Georgia to Times,
+Verdana to Helvetica) and cp1252, and a warning is logged.
+
+What fpdf pays on every document is paid once here:
+
+* a font file's metrics are parsed once per process and saved under the
+  temp directory (``CVBUILDER_FONT_CACHE``), keyed by path, size and mtime,
+  so other processes load them instead of parsing the file;
+* :func:`embed` writes only the glyphs a document uses, and keeps the
+  subset font, its CID-to-glyph map and widths per file and character set,
+  so re-rendering a CV (the live preview) does not subset the font again;
+* styles drawn with the same file (a family without italics) are embedded
+  once.
+"""
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import warnings
+import zlib
+from array import array
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ttf')
+SYSTEM_FONT_DIRS = (
+    '/usr/share/fonts', '/usr/local/share/fonts', '~/.fonts', '~/.local/share/fonts',
+    '/Library/Fonts', '~/Library/Fonts', '/System/Library/Fonts/Supplemental',
+    os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+)
+STYLES = ('', 'B', 'I', 'BI')
+# File name endings per style (compared without case, spaces, "-" and "_"): Liberation/DejaVu, then Windows names.
+STYLE_SUFFIXES = {
+    '': ('regular', '', 'book'),
+    'B': ('bold', 'bd', 'b'),
+    'I': ('italic', 'oblique', 'i'),
+    'BI': ('bolditalic', 'boldoblique', 'bi', 'z'),
+}
+# Files tried for each FONTS entry, best first: the font itself, then metric-compatible or look-alike free fonts
+# (DejaVuSans is bundled in ttf/).
+FONT_FILES = {
+    'helvetica': ('LiberationSans', 'Arimo', 'Arial', 'DejaVuSans'),
+    'arial': ('Arial', 'LiberationSans', 'Arimo', 'DejaVuSans'),
+    'times': ('Times New Roman', 'Times', 'LiberationSerif', 'Tinos', 'DejaVuSerif', 'DejaVuSans'),
+    'georgia': ('Georgia', 'Gelasio', 'DejaVuSerif', 'LiberationSerif', 'DejaVuSans'),
+    'verdana': ('Verdana', 'DejaVuSans', 'LiberationSans'),
+}
+CORE_FONTS = {'helvetica': 'Helvetica', 'arial': 'Arial', 'times': 'Times', 'courier': 'Courier',
+              'georgia': 'Times', 'verdana': 'Helvetica'}
+METRICS_VERSION = 1
+MAX_SUBSETS = 64
+
+PdfFont = namedtuple('PdfFont', 'family files')
+Embedded = namedtuple('Embedded', 'tag stream length cid_map widths')
+
+# fpdf's ToUnicode CMap: character codes are the Unicode code points.
+TO_UNICODE = (
+    "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+    "/CIDSystemInfo\n<</Registry (Adobe)\n/Ordering (UCS)\n/Supplement 0\n>> def\n"
+    "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+    "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+    "1 beginbfrange\n<0000> <FFFF> <0000>\nendbfrange\n"
+    "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+)
+
+
+def _normalize(name):
+    return ''.join(c for c in name.lower() if c not in ' -_')
+
+
+def font_dirs():
+    dirs = [FONT_DIR]
+    dirs += [d for d in os.environ.get('CVBUILDER_FONT_DIR', '').split(os.pathsep) if d]
+    dirs += [os.path.expanduser(d) for d in SYSTEM_FONT_DIRS]
+    return dirs
+
+
+@lru_cache(maxsize=1)
+def font_index():
+    """``{normalized file stem: path}`` of the ``.ttf`` files in :func:`font_dirs` (earlier directories win)."""
+    index = {}
+    for root in font_dirs():
+        for path, _, files in os.walk(root):
+            for name in files:
+                stem, ext = os.path.splitext(name)
+                # TrueType outlines only: fpdf cannot subset CFF (.otf) or collections (.ttc).
+                if ext.lower() == '.ttf':
+                    index.setdefault(_normalize(stem), os.path.join(path, name))
+    return index
+
+
+@lru_cache(maxsize=None)
+def pdf_font(name):
+    """The :class:`PdfFont` drawn for the ``FONTS`` pdf name ``name``: TrueType files per style, or a core font."""
+    key = name.lower()
+    index = font_index()
+    for base in FONT_FILES.get(key, (name,)):
+        base = _normalize(base)
+        files = {}
+        for style in STYLES:
+            path = next((index[base + s] for s in STYLE_SUFFIXES[style] if base + s in index), None)
+            if path:
+                files[style] = path
+        if '' in files:
+            # A missing style is drawn with the closest one the family has.
+            files.setdefault('B', files[''])
+            files.setdefault('I', files[''])
+            files.setdefault('BI', files['B'] if files['B'] != files[''] else files['I'])
+            return PdfFont(key + '-ttf', files)
+    logger.warning("No TrueType font found for %r (looked in %s); using a core PDF font, which drops characters "
+                   "outside cp1252", name, os.pathsep.join(font_dirs()))
+    return PdfFont(CORE_FONTS.get(key, 'Helvetica'), None)
+
+
+# --- METRICS ---
+def _cache_dir():
+    return os.environ.get('CVBUILDER_FONT_CACHE') or os.path.join(tempfile.gettempdir(), 'cvbuilder-fonts')
+
+
+def _parse(path):
+    import re
+    from fpdf.ttfonts import TTFontFile
+
+    ttf = TTFontFile()
+    ttf.getMetrics(path)
+    # The same dict as fpdf's add_font builds, with the widths as a compact array.
+    return {
+        'name': re.sub('[ ()]', '', ttf.fullName),
+        'type': 'TTF',
+        'desc': {
+            'Ascent': int(round(ttf.ascent)),
+            'Descent': int(round(ttf.descent)),
+            'CapHeight': int(round(ttf.capHeight)),
+            'Flags': ttf.flags,
+            'FontBBox': "[%s %s %s %s]" % tuple(int(round(v)) for v in ttf.bbox),
+            'ItalicAngle': int(ttf.italicAngle),
+            'StemV': int(round(ttf.stemV)),
+            'MissingWidth': int(round(ttf.defaultWidth)),
+        },
+        'up': round(ttf.underlinePosition),
+        'ut': round(ttf.underlineThickness),
+        'ttffile': path,
+        'originalsize': os.path.getsize(path),
+        'cw': array('I', ttf.charWidths),
+    }
+
+
+@lru_cache(maxsize=32)
+def _metrics(path, size, mtime):
+    key = hashlib.sha1(f"{METRICS_VERSION}\0{path}\0{size}\0{mtime}".encode('utf-8')).hexdigest()
+    cached = os.path.join(_cache_dir(), key + '.metrics')
+    # A JSON line with everything but the widths, then the widths array as raw bytes (no pickle: the
+    # directory is shared with other users of the machine).
+    try:
+        with open(cached, 'rb') as f:
+            head, _, widths = f.read().partition(b'\n')
+        metrics = json.loads(head)
+        metrics['cw'] = array('I')
+        metrics['cw'].frombytes(widths)
+        return metrics
+    except (OSError, ValueError):
+        pass
+    metrics = _parse(path)
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=_cache_dir(), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(json.dumps({k: v for k, v in metrics.items() if k != 'cw'}).encode('utf-8') + b'\n')
+            f.write(metrics['cw'].tobytes())
+        os.replace(tmp, cached)
+    except OSError:
+        pass  # read-only temp dir: parse again next time
+    return metrics
+
+
+def load_metrics(path):
+    """fpdf's font dict (name, desc, widths ``cw`` by code point, ...) of the TrueType file at ``path``."""
+    stat = os.stat(path)
+    return _metrics(path, stat.st_size, stat.st_mtime_ns)
+
+
+class _Glyphs(dict):
+    def __missing__(self, code):
+        # str.translate table by code point: a character stays if the font has a glyph for it.
+        keep = code in (9, 10) or (code < len(self.cw) and self.cw[code] != 0)
+        self[code] = value = code if keep else None
+        return value
+
+
+@lru_cache(maxsize=None)
+def _glyphs(path):
+    table = _Glyphs()
+    table.cw = load_metrics(path)['cw']
+    return table
+
+
+def pdf_text(value, family='Helvetica'):
+    """``value`` as text the PDF can draw in the ``FONTS`` family: characters without a glyph are dropped."""
+    font = pdf_font(family)
+    if font.files is None:
+        # Core PDF fonts are WinAnsi (cp1252): keep what maps (e.g. "•"), drop what doesn't (emoji).
+        return str(value).encode('cp1252', 'ignore').decode('latin1').strip()
+    return str(value).translate(_glyphs(font.files[''])).strip()
+
+
+def char_widths(family, style=''):
+    """``{char: width}`` (1/1000 em) of the font drawn for ``family``/``style``."""
+    font = pdf_font(family)
+    if font.files is None:
+        from fpdf import FPDF
+        pdf = FPDF()
+        pdf.set_font(font.family, style)
+        return pdf.current_font['cw']
+    # fpdf marks glyphs of zero width (combining marks) with 65535.
+    return {chr(i): 0 if w == 65535 else w for i, w in enumerate(load_metrics(font.files[style])['cw']) if w}
+
+
+# --- EMBEDDING ---
+class GlyphSubset(dict):
+    """The code points drawn in a font: fpdf appends one per character drawn, this keeps each once."""
+
+    def append(self, code):
+        self[code] = None
+
+
+def register(pdf, font):
+    """Add the TrueType files of :class:`PdfFont` ``font`` to ``pdf`` (core fonts need nothing)."""
+    if font.files is None:
+        return
+    entries = {}
+    for style, path in font.files.items():
+        key = font.family + style
+        if key in pdf.fonts:
+            continue
+        if path not in entries:
+            metrics = load_metrics(path)
+            entries[path] = {
+                'i': len(pdf.fonts) + 1, 'type': 'TTF', 'name': metrics['name'], 'desc': metrics['desc'],
+                'up': metrics['up'], 'ut': metrics['ut'], 'cw': metrics['cw'], 'ttffile': path,
+                'fontkey': key, 'subset': GlyphSubset(), 'unifilename': None,
+            }
+        # Styles drawn with the same file (a family without italics) share one embedded font.
+        pdf.fonts[key] = entries[path]
+
+
+_subsets = OrderedDict()
+_subsets_lock = threading.Lock()
+
+
+def _checksum(data):
+    # TrueType table checksum: the sum of the big-endian 32-bit words, zero-padded.
+    data += b'\0' * (-len(data) % 4)
+    return sum(struct.unpack('>%dL' % (len(data) // 4), data)) & 0xFFFFFFFF
+
+
+@lru_cache(maxsize=1)
+def _subsetter():
+    from fpdf.ttfonts import TTFontFile
+
+    class Subsetter(TTFontFile):
+        """fpdf's subsetter with the work that does not depend on the subset done once per font file.
+
+        The character map, widths and glyph locations are parsed once per file and process (fpdf parses
+        them on every subset), and the font file is assembled with :func:`_checksum`.
+        """
+        parsed = {}
+
+        def _parse_once(self, table, key, parse, restore):
+            key = (self.filename, table) + key
+            cached = self.parsed.get(key)
+            if cached is None:
+                cached = self.parsed[key] = parse()
+            restore(cached)
+
+        def getCMAP4(self, offset, glyphToChar, charToGlyph):
+            self._cmap(super().getCMAP4, offset, glyphToChar, charToGlyph)
+
+        def getCMAP12(self, offset, glyphToChar, charToGlyph):
+            self._cmap(super().getCMAP12, offset, glyphToChar, charToGlyph)
+
+        def _cmap(self, parse, offset, glyphToChar, charToGlyph):
+            def run():
+                glyphs, chars = {}, {}
+                parse(offset, glyphs, chars)
+                return glyphs, chars, self.maxUniChar
+
+            def restore(cached):
+                glyphToChar.update(cached[0])
+                charToGlyph.update(cached[1])
+                self.maxUniChar = cached[2]
+            self._parse_once('cmap', (offset,), run, restore)
+
+        def getHMTX(self, numberOfHMetrics, numGlyphs, glyphToChar, scale):
+            def run():
+                super(Subsetter, self).getHMTX(numberOfHMetrics, numGlyphs, glyphToChar, scale)
+                return self.charWidths, self.defaultWidth
+
+            def restore(cached):
+                self.charWidths = list(cached[0])
+                self.defaultWidth = cached[1]
+            self._parse_once('hmtx', (numberOfHMetrics, numGlyphs), run, restore)
+
+        def getLOCA(self, indexToLocFormat, numGlyphs):
+            def run():
+                super(Subsetter, self).getLOCA(indexToLocFormat, numGlyphs)
+                return self.glyphPos
+
+            def restore(cached):
+                self.glyphPos = cached
+            self._parse_once('loca', (indexToLocFormat, numGlyphs), run, restore)
+
+        def endTTFile(self, stm):
+            tables = sorted(self.otables.items())
+            count = len(tables)
+            search = 1 << (count.bit_length() - 1)
+            header = struct.pack('>LHHHH', 0x00010000, count, search * 16, search.bit_length() - 1, (count - search) * 16)
+            directory = []
+            body = []
+            offset = 12 + count * 16
+            for tag, data in tables:
+                if tag == 'head':
+                    head_start = offset
+                directory.append(tag.encode('latin1') + struct.pack('>LLL', _checksum(data), offset, len(data)))
+                data += b'\0' * (-len(data) % 4)
+                body.append(data)
+                offset += len(data)
+            stm = header + b''.join(directory) + b''.join(body)
+            adjustment = struct.pack('>L', (0xB1B0AFBA - _checksum(stm)) & 0xFFFFFFFF)
+            return stm[:head_start + 8] + adjustment + stm[head_start + 12:]
+
+    return Subsetter
+
+
+def _build(path, codes, cw):
+    ttf = _subsetter()()
+    with warnings.catch_warnings():
+        # fpdf warns about cmap entries it skips (e.g. DejaVu's private-use range); the subset is fine.
+        warnings.simplefilter('ignore')
+        data = ttf.makeSubset(path, sorted(codes))
+    cid_map = bytearray(256 * 256 * 2)
+    for code, glyph in ttf.codeToGlyph.items():
+        cid_map[code * 2:code * 2 + 2] = glyph.to_bytes(2, 'big')
+    # /W lists the widths of the used codes only, in runs of consecutive codes; the rest take /DW.
+    widths = []
+    run = []
+    for code in sorted(ttf.codeToGlyph):
+        width = cw[code] if code < len(cw) else 0
+        if not width:
+            continue
+        if run and code != run[0] + len(run) - 1:
+            widths.append('%d [%s]' % (run[0], ' '.join(map(str, run[1:]))))
+            run = []
+        if not run:
+            run = [code]
+        run.append(0 if width == 65535 else width)
+    if run:
+        widths.append('%d [%s]' % (run[0], ' '.join(map(str, run[1:]))))
+    # Subset fonts are named with a tag unique to the glyph set (PDF 32000 9.6.4).
+    digest = hashlib.sha1(repr(sorted(codes)).encode('ascii')).digest()
+    tag = ''.join(chr(65 + b % 26) for b in digest[:6])
+    return Embedded(tag, zlib.compress(data), len(data), zlib.compress(bytes(cid_map)), ' '.join(widths))
+
+
+def subset(path, codes, cw):
+    """The :class:`Embedded` subset of the font file at ``path`` with the glyphs of ``codes``, cached per process."""
+    key = (path, codes)
+    with _subsets_lock:
+        embedded = _subsets.get(key)
+        if embedded is not None:
+            _subsets.move_to_end(key)
+            return embedded
+    embedded = _build(path, codes, cw)
+    with _subsets_lock:
+        _subsets[key] = embedded
+        while len(_subsets) > MAX_SUBSETS:
+            _subsets.popitem(last=False)
+    return embedded
+
+
+def embed(pdf, font):
+    """Write the objects of the TrueType ``font`` (an entry of ``pdf.fonts``): Type0 font over the used glyphs."""
+    codes = frozenset(code for code in font['subset'] if 0 < code < 0x10000) or frozenset((32,))
+    embedded = subset(font['ttffile'], codes, font['cw'])
+    name = embedded.tag + '+' + font['name']
+    n = pdf.n + 1
+    font['n'] = n
+
+    pdf._newobj()
+    pdf._out('<</Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H' % name)
+    pdf._out('/DescendantFonts [%d 0 R] /ToUnicode %d 0 R>>' % (n + 1, n + 2))
+    pdf._out('endobj')
+
+    pdf._newobj()
+    pdf._out('<</Type /Font /Subtype /CIDFontType2 /BaseFont /%s' % name)
+    pdf._out('/CIDSystemInfo %d 0 R /FontDescriptor %d 0 R' % (n + 3, n + 4))
+    if font['desc'].get('MissingWidth'):
+        pdf._out('/DW %d' % font['desc']['MissingWidth'])
+    pdf._out('/W [%s]' % embedded.widths)
+    pdf._out('/CIDToGIDMap %d 0 R>>' % (n + 5))
+    pdf._out('endobj')
+
+    pdf._newobj()
+    pdf._out('<</Length %d>>' % len(TO_UNICODE))
+    pdf._putstream(TO_UNICODE)
+    pdf._out('endobj')
+
+    pdf._newobj()
+    pdf._out('<</Registry (Adobe) /Ordering (UCS) /Supplement 0>>')
+    pdf._out('endobj')
+
+    pdf._newobj()
+    desc = dict(font['desc'])
+    desc['Flags'] = (desc['Flags'] | 4) & ~32  # symbolic, not standard Latin
+    pdf._out('<</Type /FontDescriptor /FontName /%s' % name)
+    for k in ('Ascent', 'Descent', 'CapHeight', 'Flags', 'FontBBox', 'ItalicAngle', 'StemV', 'MissingWidth'):
+        pdf._out(' /%s %s' % (k, desc[k]))
+    pdf._out('/FontFile2 %d 0 R>>' % (n + 6))
+    pdf._out('endobj')
+
+    for stream, extra in ((embedded.cid_map, ''), (embedded.stream, ' /Length1 %d' % embedded.length)):
+        pdf._newobj()
+        pdf._out('<</Length %d /Filter /FlateDecode%s>>' % (len(stream), extra))
+        pdf._putstream(stream)
+        pdf._out('endobj')
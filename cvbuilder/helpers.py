@@ -0,0 +1,15 @@
+from functools import lru_cache
+
+# --- FUNGSI HELPER ---
+@lru_cache(maxsize=256)
+def hex_to_rgb(hex_color):
+    try:
+        hex_color = hex_color.lstrip('#')
+        if len(hex_color) == 6:
+            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        elif len(hex_color) == 3:
+            return tuple(int(hex_color[i:i+1]*2, 16) for i in (0, 1, 2))
+        else:
+            return (37, 99, 235)
+    except:
+        return (37, 99, 235)
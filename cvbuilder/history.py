@@ -0,0 +1,229 @@
+"""Undo/redo for ``cv_data``.
+
+Each step of an :class:`EditHistory` is the structural diff between two
+consecutive states: a short list of :class:`Op` (JSON-patch style ``add``,
+``remove`` and ``replace`` at a path such as ``('pengalaman', 2, 'posisi')``).
+Every op keeps the value it replaced, so a step can be inverted. Undo and
+redo apply one step, or its inverse, in place, in time proportional to the
+diff, with no replay from a snapshot.
+
+The history keeps its own copy of the last recorded state and diffs the live
+``cv_data`` against it. Copies share their strings (``str`` is immutable and
+``copy.deepcopy`` returns it as is), so a step that renames a position costs
+two string references, not two copies of the text. Only the last
+``max_steps`` steps (and at most ``max_ops`` ops in total) are kept, so a
+session's history stays the same size however long the editing goes on.
+Consecutive edits of the same field within ``coalesce`` seconds (typing in
+one text box) become one step.
+
+Every ``checkpoint_every`` steps the state after the step is kept as a
+checkpoint, and the state before the oldest kept step as the base. Should a
+step ever fail to apply (``cv_data`` changed under the history in a way it
+did not record), the state is rebuilt from the nearest checkpoint by
+replaying at most ``checkpoint_every`` steps, instead of from the beginning.
+
+:attr:`EditHistory.version` changes with every recorded, undone or redone
+step, and is never reused within the process, so callers can tell whether
+``cv_data`` changed without comparing it.
+"""
+import copy
+import itertools
+import time
+from collections import deque, namedtuple
+
+Op = namedtuple('Op', 'kind path old new')
+Step = namedtuple('Step', 'ops at checkpoint', defaults=(None,))
+
+ADD = 'add'
+REMOVE = 'remove'
+REPLACE = 'replace'
+_INVERSE = {ADD: REMOVE, REMOVE: ADD, REPLACE: REPLACE}
+_VERSIONS = itertools.count(1)
+# What apply() raises when a path no longer exists or has the wrong type.
+_PATCH_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+
+def diff(old, new, path=()):
+    """Ops that turn ``old`` into ``new``. Values in the ops are copies, safe to keep."""
+    ops = []
+    _diff(old, new, path, ops)
+    return ops
+
+
+def _diff(old, new, path, ops):
+    if old is new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            if key not in new:
+                ops.append(Op(REMOVE, path + (key,), copy.deepcopy(value), None))
+            else:
+                _diff(value, new[key], path + (key,), ops)
+        for key, value in new.items():
+            if key not in old:
+                ops.append(Op(ADD, path + (key,), None, copy.deepcopy(value)))
+    elif isinstance(old, list) and isinstance(new, list):
+        # Trim the common head and tail: an insert or delete anywhere is one op, not a shift of everything after it.
+        start = 0
+        end_old, end_new = len(old), len(new)
+        while start < end_old and start < end_new and old[start] == new[start]:
+            start += 1
+        while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        if end_old - start == end_new - start:
+            for i in range(start, end_old):
+                _diff(old[i], new[i], path + (i,), ops)
+        else:
+            for i in range(end_old - 1, start - 1, -1):
+                ops.append(Op(REMOVE, path + (i,), copy.deepcopy(old[i]), None))
+            for i in range(start, end_new):
+                ops.append(Op(ADD, path + (i,), None, copy.deepcopy(new[i])))
+    elif type(old) is not type(new) or old != new:
+        ops.append(Op(REPLACE, path, copy.deepcopy(old), copy.deepcopy(new)))
+
+
+def invert(ops):
+    return [Op(_INVERSE[op.kind], op.path, op.new, op.old) for op in reversed(ops)]
+
+
+def apply(doc, ops):
+    """Apply ``ops`` to ``doc`` in place. Values are copied in, so the ops can be applied again later."""
+    for kind, path, old, new in ops:
+        if not path:
+            raise ValueError("cannot replace the document root")
+        parent = doc
+        for key in path[:-1]:
+            parent = parent[key]
+        key = path[-1]
+        if kind == ADD:
+            value = copy.deepcopy(new)
+            if isinstance(parent, list):
+                parent.insert(key, value)
+            else:
+                parent[key] = value
+        elif kind == REMOVE:
+            if isinstance(parent, list):
+                parent.pop(key)
+            else:
+                del parent[key]
+        else:
+            parent[key] = copy.deepcopy(new)
+
+
+class EditHistory:
+    def __init__(self, data, max_steps=100, max_ops=5000, coalesce=2.0, checkpoint_every=25):
+        self.max_steps = max_steps
+        self.max_ops = max_ops
+        self.coalesce = coalesce
+        self.checkpoint_every = checkpoint_every
+        self._state = copy.deepcopy(data)
+        self._base = copy.deepcopy(data)
+        self._undo = deque()
+        self._redo = []
+        self._ops = 0
+        self.version = next(_VERSIONS)
+
+    def __len__(self):
+        return len(self._undo)
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def record(self, data):
+        """Record the edits made to ``data`` since the last call as one step. Returns whether anything changed."""
+        ops = diff(self._state, data)
+        if not ops:
+            return False
+        apply(self._state, ops)
+        self._redo.clear()
+        self.version = next(_VERSIONS)
+        now = time.monotonic()
+        last = self._undo[-1] if self._undo else None
+        if (last is not None and len(ops) == 1 and len(last.ops) == 1 and ops[0].kind == REPLACE
+                and last.ops[0].kind == REPLACE and ops[0].path == last.ops[0].path and now - last.at <= self.coalesce):
+            # A checkpoint the merged step had is stale now; the next step takes a fresh one.
+            self._undo[-1] = Step([Op(REPLACE, ops[0].path, last.ops[0].old, ops[0].new)], now)
+            return True
+        self._undo.append(Step(ops, now))
+        self._ops += len(ops)
+        self._checkpoint()
+        while len(self._undo) > 1 and (len(self._undo) > self.max_steps or self._ops > self.max_ops):
+            oldest = self._undo.popleft()
+            self._ops -= len(oldest.ops)
+            if oldest.checkpoint is not None:
+                self._base = oldest.checkpoint
+            else:
+                apply(self._base, oldest.ops)
+        return True
+
+    def _checkpoint(self):
+        # Called once the last step has been applied to _state.
+        step = self._undo[-1]
+        if step.checkpoint is None and self._since_checkpoint() >= self.checkpoint_every:
+            self._undo[-1] = step._replace(checkpoint=copy.deepcopy(self._state))
+
+    def _since_checkpoint(self):
+        for count, step in enumerate(reversed(self._undo)):
+            if step.checkpoint is not None:
+                return count
+        return len(self._undo)
+
+    def _rebuild(self):
+        """The state after the kept steps, replayed from the last checkpoint (or the base).
+
+        A step that cannot be replayed is dropped, together with the steps after it.
+        """
+        steps = list(self._undo)
+        start, state = 0, self._base
+        for i, step in enumerate(steps):
+            if step.checkpoint is not None:
+                start, state = i + 1, step.checkpoint
+        state = copy.deepcopy(state)
+        for i in range(start, len(steps)):
+            try:
+                apply(state, steps[i].ops)
+            except _PATCH_ERRORS:
+                while len(self._undo) > i:
+                    self._ops -= len(self._undo.pop().ops)
+                return self._rebuild()
+        return state
+
+    def _move(self, data, ops):
+        # Apply a step (or its inverse) to both copies; if it does not fit, rebuild them from a checkpoint.
+        try:
+            apply(self._state, ops)
+            apply(data, ops)
+        except _PATCH_ERRORS:
+            self._state = self._rebuild()
+            data.clear()
+            data.update(copy.deepcopy(self._state))
+
+    def undo(self, data):
+        """Revert the last step in ``data`` (in place). Edits not yet recorded are recorded first."""
+        self.record(data)
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._ops -= len(step.ops)
+        self._move(data, invert(step.ops))
+        self._redo.append(step)
+        self.version = next(_VERSIONS)
+        return True
+
+    def redo(self, data):
+        """Re-apply the last undone step to ``data`` (in place)."""
+        if self.record(data) or not self._redo:
+            return False
+        step = self._redo.pop()
+        self._undo.append(step._replace(at=0.0))
+        self._ops += len(step.ops)
+        self._move(data, step.ops)
+        self._checkpoint()
+        self.version = next(_VERSIONS)
+        return True
@@ -0,0 +1,137 @@
+"""Opt-in timing instrumentation for script reruns and render paths.
+
+A :class:`Profiler` is shared by every session on a worker. Functions wrapped
+with :meth:`Profiler.wrap` record their duration into process-wide histograms
+(exportable as Prometheus text) and, when called from a script thread with an
+active :class:`RerunTrace`, into that rerun's breakdown. Finished reruns are
+kept in a ring buffer (exportable as JSONL) and a sample of them, plus every
+rerun slower than ``slow_ms``, goes to a rotating log file.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque, defaultdict
+from logging.handlers import RotatingFileHandler
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_local = threading.local()
+
+
+class RerunTrace:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.total = None
+
+    def add(self, name, seconds):
+        self.spans.append((name, seconds))
+
+    def breakdown(self):
+        """``{name: (calls, total_seconds)}`` for this rerun."""
+        totals = {}
+        for name, seconds in self.spans:
+            calls, total = totals.get(name, (0, 0.0))
+            totals[name] = (calls + 1, total + seconds)
+        return totals
+
+    def to_dict(self):
+        return {
+            'ts': round(self.started, 3),
+            'session': self.session_id,
+            'total_ms': round((self.total or 0) * 1000, 3),
+            'spans': {name: {'calls': calls, 'ms': round(total * 1000, 3)}
+                      for name, (calls, total) in self.breakdown().items()},
+        }
+
+
+class Profiler:
+    def __init__(self, log_path=None, sample_rate=0.1, slow_ms=1000, max_traces=500,
+                 max_bytes=5 * 1024 * 1024, backup_count=3):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.traces = deque(maxlen=max_traces)
+        self._counts = defaultdict(int)
+        self._sums = defaultdict(float)
+        self._buckets = defaultdict(lambda: [0] * len(BUCKETS))
+        self._lock = threading.Lock()
+        self._logger = None
+        if log_path:
+            self._logger = logging.getLogger(f'cvbuilder.profile.{id(self)}')
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self._logger.addHandler(handler)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._counts[name] += 1
+            self._sums[name] += seconds
+            buckets = self._buckets[name]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+
+    def wrap(self, name, fn):
+        """Return ``fn`` timed under ``name``."""
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.observe(name, elapsed)
+                trace = getattr(_local, 'trace', None)
+                if trace is not None:
+                    trace.add(name, elapsed)
+        timed.__name__ = getattr(fn, '__name__', name)
+        timed.__doc__ = getattr(fn, '__doc__', None)
+        return timed
+
+    def start_rerun(self, session_id):
+        trace = RerunTrace(session_id)
+        _local.trace = trace
+        return trace
+
+    def finish_rerun(self, trace):
+        trace.total = time.perf_counter() - trace._t0
+        if getattr(_local, 'trace', None) is trace:
+            _local.trace = None
+        self.observe('rerun', trace.total)
+        record = trace.to_dict()
+        with self._lock:
+            self.traces.append(record)
+        if self._logger is not None and (trace.total * 1000 >= self.slow_ms or random.random() < self.sample_rate):
+            self._logger.info(json.dumps(record, separators=(',', ':')))
+        return record
+
+    def prometheus_text(self):
+        with self._lock:
+            names = sorted(self._counts)
+            lines = [
+                '# HELP cvbuilder_span_seconds Time spent in instrumented CV Builder code paths.',
+                '# TYPE cvbuilder_span_seconds histogram',
+            ]
+            for name in names:
+                for bound, count in zip(BUCKETS, self._buckets[name]):
+                    lines.append(f'cvbuilder_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'cvbuilder_span_seconds_bucket{{span="{name}",le="+Inf"}} {self._counts[name]}')
+                lines.append(f'cvbuilder_span_seconds_sum{{span="{name}"}} {self._sums[name]:.6f}')
+                lines.append(f'cvbuilder_span_seconds_count{{span="{name}"}} {self._counts[name]}')
+        return '\n'.join(lines) + '\n'
+
+    def jsonl(self, session=None):
+        """Recent reruns as JSONL; only ``session``'s when given."""
+        with self._lock:
+            return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in self.traces
+                           if session is None or record['session'] == session)
+
+    def summary(self):
+        """``{name: (calls, mean_ms)}`` across every observation on this worker."""
+        with self._lock:
+            return {name: (self._counts[name], self._sums[name] / self._counts[name] * 1000) for name in sorted(self._counts)}
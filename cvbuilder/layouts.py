@@ -0,0 +1,276 @@
+"""Declarative layout specs and the compiled render plans the backends execute.
+
+Each entry in ``LAYOUTS`` has a spec here describing its header, its columns
+and how every section looks. ``get_plan(settings)`` compiles the spec together
+with the font/color settings into a :class:`RenderPlan` once per combination
+(``lru_cache``); the PDF, DOCX and HTML backends then only have to bind
+``cv_data`` to the plan with :func:`bind_sections` and draw it.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from cvbuilder.templates import FONTS, LAYOUTS
+from cvbuilder.helpers import hex_to_rgb
+from cvbuilder.photo import PHOTO_SIZE
+
+SECTION_DEFAULTS = {
+    'summary': {'kind': 'text', 'title': 'PROFESSIONAL SUMMARY'},
+    'experience': {'kind': 'entries', 'title': 'WORK EXPERIENCE', 'source': 'pengalaman',
+                   'fields': ('posisi', 'perusahaan', 'periode', 'deskripsi'),
+                   'placeholders': ('Position', 'Company', 'Period', 'Description')},
+    'education': {'kind': 'entries', 'title': 'EDUCATION', 'source': 'pendidikan',
+                  'fields': ('institusi', 'gelar', 'tahun', None),
+                  'placeholders': ('Institution', 'Degree', 'Year', None),
+                  'item_title_size': 11, 'entry_gap': 2},
+    'skills': {'kind': 'list', 'title': 'SKILLS', 'source': 'keahlian', 'style': 'inline', 'limit': 15},
+    'languages': {'kind': 'list', 'title': 'LANGUAGES', 'source': 'bahasa', 'style': 'inline', 'limit': 5},
+}
+
+STYLE_DEFAULTS = {
+    'title_size': 12,
+    'title_height': 8,
+    'title_color': 'primary',
+    'item_title_size': 11,
+    'meta_size': 10,
+    'meta_color': 'accent',
+    'meta_sep': ' | ',
+    'body_size': None,
+    'line_height': 5,
+    'entry_gap': 3,
+    'gap_after': 5,
+    'placeholder': None,
+    'joiner': ', ',
+    'timeline': False,
+    'align': 'J',
+    'hyphenate': False,
+}
+
+LAYOUT_SPECS = {
+    'modern_sidebar': {
+        'header': {'kind': 'plain', 'name_size': 24, 'position_size': 14,
+                   'contacts': ('email', 'telepon', 'alamat'), 'photo': {'x': 175, 'y': 10, 'width': 25}},
+        'columns': (
+            {'x': 10, 'width': 55, 'sections': ('skills', 'languages')},
+            {'x': 75, 'width': 125, 'sections': ('summary', 'experience', 'education')},
+        ),
+        'sections': {
+            'skills': {'style': 'bullets', 'limit': 20},
+            'languages': {'style': 'bullets'},
+        },
+    },
+    'classic_vertical': {
+        'header': {'kind': 'centered', 'name_size': 22, 'uppercase': True,
+                   'contacts': ('email', 'telepon', 'alamat', 'linkedin')},
+        'columns': ({'width': 0, 'sections': ('summary', 'experience', 'education', 'skills', 'languages')},),
+        'sections': {
+            'experience': {'meta_sep': ', '},
+            'education': {'meta_sep': ', '},
+        },
+    },
+    'minimal_clean': {
+        'header': {'kind': 'plain', 'name_size': 24, 'position_size': 14,
+                   'contacts': ('email', 'telepon', 'alamat')},
+        'columns': ({'width': 0, 'sections': ('summary', 'experience', 'education', 'skills', 'languages')},),
+        'sections': {
+            'summary': {'title_color': 'text', 'gap_after': 10},
+        },
+    },
+    'executive': {
+        'header': {'kind': 'banner', 'height': 40, 'name_size': 28, 'uppercase': True,
+                   'contacts': ('email', 'telepon', 'linkedin'), 'contact_icons': True,
+                   'contact_placeholder': 'Add your contact information',
+                   'photo': {'x': 172, 'y': 4, 'width': 24}},
+        'body_top': 60,
+        'columns': (
+            {'x': 20, 'width': 85, 'sections': ('summary', 'experience')},
+            {'x': 115, 'width': 85, 'sections': ('skills', 'education', 'languages')},
+        ),
+        # Two 85 mm columns: hyphenation keeps the justified lines from opening wide gaps.
+        'style': {'title_size': 16, 'title_height': 10, 'hyphenate': True},
+        'sections': {
+            'summary': {'placeholder': 'Add your professional summary here.'},
+            'experience': {'item_title_size': 12, 'body_size': 9, 'line_height': 4, 'entry_gap': 2},
+            'skills': {'title': 'KEY SKILLS', 'style': 'bullets', 'limit': None},
+            'languages': {'style': 'bullets'},
+        },
+    },
+    'creative': {
+        'header': {'kind': 'hero', 'height': 80, 'name_size': 36, 'position_size': 18,
+                   'contacts': ('email', 'telepon', 'alamat'), 'contact_icons': True,
+                   'photo': {'x': 160, 'y': 15, 'width': 35}},
+        'columns': ({'width': 0, 'sections': ('summary', 'experience', 'education', 'skills', 'languages')},),
+        'style': {'title_size': 14},
+        'sections': {
+            'summary': {'title': '✨ ABOUT ME', 'body_size': 11, 'gap_after': 10},
+            'experience': {'title': '📈 EXPERIENCE TIMELINE', 'item_title_size': 12, 'meta_color': 'muted',
+                           'meta_sep': ' • ', 'body_size': 10, 'entry_gap': 5, 'timeline': True},
+            'education': {'title': '🎓 EDUCATION', 'meta_color': 'muted', 'meta_sep': ' • ', 'timeline': True},
+            'skills': {'title': '🛠️ SKILLS', 'joiner': ' • ', 'limit': 12},
+            'languages': {'title': '🌐 LANGUAGES', 'joiner': ' • '},
+        },
+    },
+}
+
+CONTACT_ICONS = {'email': '✉️', 'telepon': '📱', 'alamat': '📍', 'linkedin': '🔗'}
+
+COLOR_TEXT = (0, 0, 0)
+COLOR_MUTED = (100, 100, 100)
+
+HeaderPlan = namedtuple('HeaderPlan', 'kind height name_size position_size uppercase contacts contact_icons contact_placeholder photo')
+PhotoPlan = namedtuple('PhotoPlan', 'x y width height')
+SectionPlan = namedtuple('SectionPlan', 'key kind title source fields placeholders style limit joiner timeline '
+                                        'title_size title_height title_color item_title_size meta_size meta_color '
+                                        'meta_sep body_size line_height entry_gap gap_after placeholder align hyphenate')
+ColumnPlan = namedtuple('ColumnPlan', 'x width sections')
+RenderPlan = namedtuple('RenderPlan', 'template layout_type font_pdf font_docx primary accent body_size '
+                                      'header body_top columns section_order')
+
+BoundSection = namedtuple('BoundSection', 'plan entries')
+Entry = namedtuple('Entry', 'title meta body')
+
+
+def _resolve_color(name, primary, accent):
+    if name == 'primary':
+        return primary
+    if name == 'accent':
+        return accent
+    if name == 'muted':
+        return COLOR_MUTED
+    return COLOR_TEXT
+
+
+def _photo_plan(spec):
+    if not spec:
+        return None
+    width = spec['width']
+    return PhotoPlan(spec['x'], spec['y'], width, width * PHOTO_SIZE[1] / PHOTO_SIZE[0])
+
+
+@lru_cache(maxsize=128)
+def compile_plan(template, font_family, base_color, accent_color, body_size):
+    """Compile the spec for ``template`` into a :class:`RenderPlan`. Cached per argument combination."""
+    spec = LAYOUT_SPECS.get(template, LAYOUT_SPECS['minimal_clean'])
+    primary = hex_to_rgb(base_color)
+    accent = hex_to_rgb(accent_color)
+    fonts = FONTS.get(font_family, {'pdf': font_family, 'docx': font_family})
+
+    header_spec = spec['header']
+    header = HeaderPlan(
+        kind=header_spec['kind'],
+        height=header_spec.get('height', 0),
+        name_size=header_spec['name_size'],
+        position_size=header_spec.get('position_size', 14),
+        uppercase=header_spec.get('uppercase', False),
+        contacts=tuple(header_spec.get('contacts', ())),
+        contact_icons=header_spec.get('contact_icons', False),
+        contact_placeholder=header_spec.get('contact_placeholder'),
+        photo=_photo_plan(header_spec.get('photo')),
+    )
+
+    style = dict(STYLE_DEFAULTS, **spec.get('style', {}))
+    columns = []
+    order = []
+    for column in spec['columns']:
+        sections = []
+        for key in column['sections']:
+            options = dict(style, **SECTION_DEFAULTS[key])
+            options.update(spec.get('sections', {}).get(key, {}))
+            sections.append(SectionPlan(
+                key=key,
+                kind=options['kind'],
+                title=options['title'],
+                source=options.get('source'),
+                fields=options.get('fields'),
+                placeholders=options.get('placeholders'),
+                style=options.get('style'),
+                limit=options.get('limit'),
+                joiner=options['joiner'],
+                timeline=options['timeline'],
+                title_size=options['title_size'],
+                title_height=options['title_height'],
+                title_color=_resolve_color(options['title_color'], primary, accent),
+                item_title_size=options['item_title_size'],
+                meta_size=options['meta_size'],
+                meta_color=_resolve_color(options['meta_color'], primary, accent),
+                meta_sep=options['meta_sep'],
+                body_size=options['body_size'] or body_size,
+                line_height=options['line_height'],
+                entry_gap=options['entry_gap'],
+                gap_after=options['gap_after'],
+                placeholder=options['placeholder'],
+                align=options['align'],
+                hyphenate=options['hyphenate'],
+            ))
+            order.append(key)
+        columns.append(ColumnPlan(column.get('x', 10), column['width'], tuple(sections)))
+
+    return RenderPlan(
+        template=template,
+        layout_type=LAYOUTS.get(template, {}).get('type', '1_column'),
+        font_pdf=fonts['pdf'],
+        font_docx=fonts['docx'],
+        primary=primary,
+        accent=accent,
+        body_size=body_size,
+        header=header,
+        body_top=spec.get('body_top'),
+        columns=tuple(columns),
+        section_order=tuple(order),
+    )
+
+
+def get_plan(settings):
+    return compile_plan(settings['template_style'], settings['font_family'], settings['base_color'],
+                        settings['accent_color'], settings['font_size_body'])
+
+
+def bind_section(section, data):
+    """Bind one section plan to ``cv_data``. Returns ``None`` when there is nothing to draw."""
+    if section.kind == 'text':
+        text = data['ringkasan'] or section.placeholder
+        return BoundSection(section, [Entry(None, None, text)]) if text else None
+
+    items = data.get(section.source) or []
+    if not items:
+        return None
+    if section.kind == 'list':
+        if section.limit:
+            items = items[:section.limit]
+        return BoundSection(section, [Entry(None, None, item) for item in items])
+
+    title_field, org_field, period_field, body_field = section.fields
+    title_ph, org_ph, period_ph, body_ph = section.placeholders
+    entries = []
+    for item in items:
+        meta = f"{item.get(org_field, org_ph)}{section.meta_sep}{item.get(period_field, period_ph)}"
+        body = item.get(body_field, body_ph) if body_field else None
+        entries.append(Entry(item.get(title_field, title_ph), meta, body))
+    return BoundSection(section, entries)
+
+
+def bind_sections(plan, data):
+    """Bind every column of ``plan`` to ``cv_data``: a list (per column) of bound, non-empty sections."""
+    columns = []
+    for column in plan.columns:
+        bound = [bind_section(section, data) for section in column.sections]
+        columns.append([b for b in bound if b is not None])
+    return columns
+
+
+def contact_items(plan, info):
+    items = []
+    for field in plan.header.contacts:
+        value = info.get(field)
+        if not value:
+            continue
+        if plan.header.contact_icons:
+            value = f"{CONTACT_ICONS[field]} {value}"
+        elif field == 'linkedin' and plan.header.kind == 'centered':
+            value = "LinkedIn: " + value
+        items.append(value)
+    return items
+
+
+def display_name(plan, info):
+    name = info.get('nama') or "YOUR NAME"
+    return name.upper() if plan.header.uppercase else name
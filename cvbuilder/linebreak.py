@@ -0,0 +1,209 @@
+"""Line breaking for the PDF's text blocks.
+
+:meth:`FontMetrics.wrap` splits text into the lines fpdf's ``multi_cell``
+would draw, measured on cached word widths instead of re-measuring every
+character per render. Each paragraph (the text between two newlines) is
+broken on its own and memoized: re-rendering a CV only re-breaks the
+paragraphs that changed, such as the one bullet of a long ``deskripsi`` being
+edited.
+
+Lines are justified like ``multi_cell``'s default (every line but the last
+of a paragraph carries the extra word spacing ``ws`` that fills it) or left
+aligned. With ``hyphenate`` a word that does not fit is split at a syllable
+boundary when its first part fits on the line, which keeps narrow justified
+columns from opening wide gaps. :func:`page_split` and :func:`lead` give the
+pagination the widow/orphan rule: a paragraph is never split so that fewer
+than ``ORPHANS`` lines stay at the bottom of a page or ``WIDOWS`` lines go to
+the top of the next.
+"""
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from cvbuilder.fonts import char_widths
+
+PT = 25.4 / 72
+# fpdf's cell margin with its default 1 cm page margins; multi_cell keeps it on both sides of every line.
+CELL_MARGIN = 1
+ORPHANS = 2
+WIDOWS = 2
+MIN_HYPHENATED = 6
+
+Line = namedtuple('Line', 'text ws end')
+
+_VOWELS = frozenset('aeiouyAEIOUYáéíóúàèìòùâêîôûäëïöüÁÉÍÓÚÀÈÌÒÙÄËÏÖÜ')
+# Consonant pairs that spell one sound (English and Indonesian) and are never split.
+_DIGRAPHS = frozenset(('ng', 'ny', 'kh', 'sy', 'ch', 'sh', 'th', 'ph', 'gh', 'wh', 'ck', 'qu'))
+
+
+class FontMetrics:
+    """Character widths (1/1000 em) of the PDF fonts, with string widths cached per font.
+
+    Families are ``FONTS`` pdf names, measured in the font :mod:`cvbuilder.fonts` draws them with.
+
+    Widths are kept in font units, so one cache entry serves every font size.
+    """
+
+    def __init__(self, max_words=200_000):
+        self.max_words = max_words
+        self._tables = {}
+        self._words = {}
+        self._lock = threading.Lock()
+
+    def table(self, family, style=''):
+        key = (family.lower(), style)
+        table = self._tables.get(key)
+        if table is None:
+            table = char_widths(family, style)
+            with self._lock:
+                self._tables[key] = table
+        return table
+
+    def units(self, family, style, text):
+        """Width of ``text`` in font units; multiply by size / 1000 for points."""
+        key = (family.lower(), style, text)
+        width = self._words.get(key)
+        if width is None:
+            table = self.table(family, style)
+            width = sum(table.get(c, 0) for c in text)
+            with self._lock:
+                if len(self._words) >= self.max_words:
+                    self._words.clear()
+                self._words[key] = width
+        return width
+
+    def string_width(self, family, style, size, text):
+        """Width of ``text`` in mm, as fpdf's ``get_string_width``."""
+        return self.units(family, style, text) * size / 1000 * PT
+
+    def wrap(self, family, style, size, width, text, align='J', hyphenate=False):
+        """The :class:`Line` tuple of ``text`` in a ``multi_cell`` of ``width`` mm."""
+        return _wrap(self, family.lower(), style, size, width, text, align, hyphenate)
+
+
+@lru_cache(maxsize=4096)
+def _wrap(metrics, family, style, size, width, text, align, hyphenate):
+    text = text.replace('\r', '')
+    if text.endswith('\n'):
+        text = text[:-1]
+    lines = ()
+    for paragraph in text.split('\n'):
+        lines += _break_paragraph(metrics, family, style, size, width, paragraph, align, hyphenate)
+    return lines
+
+
+@lru_cache(maxsize=16384)
+def hyphen_points(word):
+    """Positions where ``word`` may be hyphenated, last first.
+
+    A vowel/consonant rule that fits Indonesian and most English words: a
+    single consonant starts the next syllable (``ba-ta``), a cluster is split
+    after its first consonant (``kom-pu-ter``), digraphs stay together
+    (``ba-ngun``). At least three letters stay on each side.
+    """
+    if len(word) < MIN_HYPHENATED or not word.isalpha():
+        return ()
+    points = []
+    i = 0
+    n = len(word)
+    while i < n and word[i] not in _VOWELS:
+        i += 1
+    while i < n:
+        while i < n and word[i] in _VOWELS:
+            i += 1
+        start = i
+        while i < n and word[i] not in _VOWELS:
+            i += 1
+        if i >= n:
+            break
+        cluster = word[start:i].lower()
+        if len(cluster) == 1 or cluster in _DIGRAPHS:
+            point = start
+        elif cluster[:2] in _DIGRAPHS:
+            point = start + 2
+        else:
+            point = start + 1
+        if 3 <= point <= n - 3:
+            points.append(point)
+    return tuple(reversed(points))
+
+
+@lru_cache(maxsize=16384)
+def _break_paragraph(metrics, family, style, size, width, paragraph, align, hyphenate):
+    """Lines of one paragraph, breaking like fpdf's ``multi_cell`` (plus optional hyphenation)."""
+    font_size = size * PT
+    wmax = (width - 2 * CELL_MARGIN) * 1000 / font_size
+    space = metrics.units(family, style, ' ')
+    justify = align == 'J'
+
+    lines = []
+    line = []
+    used = 0
+
+    def flush(words, used):
+        # Break at the space before the next word, justifying the full line.
+        ws = (wmax - used) / 1000 * font_size / (len(words) - 1) if justify and len(words) > 1 else 0
+        lines.append(Line(' '.join(words), ws, False))
+
+    for word in paragraph.split(' '):
+        width_units = metrics.units(family, style, word)
+        if line:
+            if used + space + width_units <= wmax:
+                line.append(word)
+                used += space + width_units
+                continue
+            if hyphenate:
+                room = wmax - used - space
+                for point in hyphen_points(word.rstrip('.,;:!?)')):
+                    head = word[:point] + '-'
+                    head_units = metrics.units(family, style, head)
+                    if head_units <= room:
+                        line.append(head)
+                        used += space + head_units
+                        word = word[point:]
+                        width_units = metrics.units(family, style, word)
+                        break
+            flush(line, used)
+        # A word wider than the whole line is cut between characters.
+        while width_units > wmax:
+            table = metrics.table(family, style)
+            cut = 0
+            acc = 0
+            while cut < len(word) and acc + table.get(word[cut], 0) <= wmax:
+                acc += table.get(word[cut], 0)
+                cut += 1
+            cut = max(cut, 1)
+            lines.append(Line(word[:cut], 0, False))
+            word = word[cut:]
+            width_units = metrics.units(family, style, word)
+        line = [word]
+        used = width_units
+    lines.append(Line(' '.join(line), 0, True))
+    return tuple(lines)
+
+
+# --- WIDOW/ORPHAN ---
+def lead(lines):
+    """How many lines at the start of ``lines`` must stay on one page: the first paragraph if it cannot be split."""
+    count = 0
+    for line in lines:
+        count += 1
+        if line.end:
+            break
+    return count if count < ORPHANS + WIDOWS else ORPHANS
+
+
+def page_split(remaining, fit):
+    """How many of a paragraph's ``remaining`` lines go on a page with room for ``fit`` more.
+
+    All of them if they fit; else as many as leave at least ``WIDOWS`` for the
+    next page, as long as that is at least ``ORPHANS``; else none (the
+    paragraph starts on the next page).
+    """
+    if remaining <= fit:
+        return remaining
+    take = min(fit, remaining - WIDOWS)
+    return take if take >= ORPHANS else 0
+
+
+METRICS = FontMetrics()
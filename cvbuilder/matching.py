@@ -0,0 +1,159 @@
+"""Keyword matching of a CV against job postings.
+
+A :class:`JobIndex` tokenizes a batch of job descriptions once into a sparse
+term matrix, CSR arrays in plain NumPy (``indptr``/``indices``/``counts``),
+with BM25 IDF weights over the batch. Scoring a CV is then a few vectorized
+operations over the nonzeros of the whole batch, so ranking one CV against
+hundreds of postings takes milliseconds once the index is built.
+
+Two scores, both in ``[0, 1]``:
+
+``bm25`` (default)
+    The share of each posting's IDF-weighted keywords that the CV covers.
+    The CV's term counts are saturated BM25-style (``k1``), so repeating a
+    word helps a little but cannot make up for missing ones.
+``tfidf``
+    Cosine similarity of sublinear TF-IDF vectors over the postings' vocabulary.
+"""
+import re
+from collections import Counter, namedtuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+BREAK_RE = re.compile(r"[,;:!?()\[\]/|\n•]|\.(?!\w)")
+SINGLE_LETTER_TERMS = frozenset({'c', 'r'})
+STOPWORDS = frozenset("""
+    a about all also an and any are as at be been being both but by can do does for from had has have he her his
+    how i if in into is it its may more most must not of on or other our out over she should so some such than
+    that the their them then there these they this those to up us was we were what when where which while who
+    will with within would you your
+    ada adalah agar akan anda atau bagi bahwa dalam dan dapat dari dengan di hal harus ini itu jika juga kami
+    karena ke kita lain lebih maupun mereka oleh pada para serta sebagai secara sudah telah tersebut untuk
+    yaitu yang
+""".split())
+
+JobMatch = namedtuple('JobMatch', 'index score matched missing')
+
+
+def tokenize(text, bigrams=True):
+    """Lower-cased terms of ``text`` without stopwords, plus bigrams of adjacent kept words ("machine learning").
+
+    Bigrams never span punctuation, so "Python, SQL" gives no "python sql".
+    """
+    tokens = []
+    for phrase in BREAK_RE.split(text.lower()):
+        previous = None
+        for word in TOKEN_RE.findall(phrase):
+            if word in STOPWORDS or (len(word) == 1 and word not in SINGLE_LETTER_TERMS):
+                previous = None
+                continue
+            tokens.append(word)
+            if bigrams and previous:
+                tokens.append(f"{previous} {word}")
+            previous = word
+    return tokens
+
+
+def cv_terms(data, skill_weight=2):
+    """Term counts of a CV: target position, summary, experience titles/descriptions and skills (weighted up)."""
+    counts = Counter(tokenize(data['personal_info'].get('posisi_target') or ''))
+    counts.update(tokenize(data.get('ringkasan') or ''))
+    for exp in data.get('pengalaman') or []:
+        counts.update(tokenize(exp.get('posisi') or ''))
+        counts.update(tokenize(exp.get('deskripsi') or ''))
+    for skill in data.get('keahlian') or []:
+        for term in tokenize(skill):
+            counts[term] += skill_weight
+    return counts
+
+
+def split_postings(text):
+    """Split pasted text into postings on lines made of ``---``."""
+    return [part.strip() for part in re.split(r'^\s*-{3,}\s*$', text or '', flags=re.MULTILINE) if part.strip()]
+
+
+class JobIndex:
+    def __init__(self, descriptions, k1=1.2):
+        self.descriptions = list(descriptions)
+        self.k1 = k1
+        vocab = {}
+        indptr = [0]
+        indices = []
+        counts = []
+        for text in self.descriptions:
+            for term, count in Counter(tokenize(text)).items():
+                indices.append(vocab.setdefault(term, len(vocab)))
+                counts.append(count)
+            indptr.append(len(indices))
+
+        n = len(self.descriptions)
+        self.vocab = vocab
+        self.terms = list(vocab)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+        self.rows = np.repeat(np.arange(n), np.diff(self.indptr))
+
+        df = np.bincount(self.indices, minlength=len(vocab))
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        # Sublinear TF-IDF weight of every nonzero, and per-posting totals/norms.
+        self.weights = (1 + np.log(self.counts)) * self.idf[self.indices] if n else self.counts
+        self.totals = np.bincount(self.rows, weights=self.weights, minlength=n)
+        self.norms = np.sqrt(np.bincount(self.rows, weights=self.weights ** 2, minlength=n))
+
+    def __len__(self):
+        return len(self.descriptions)
+
+    def cv_vector(self, data):
+        """``(counts, ids)`` of the CV's terms that occur in any posting."""
+        terms = cv_terms(data)
+        ids = []
+        counts = []
+        for term, count in terms.items():
+            term_id = self.vocab.get(term)
+            if term_id is not None:
+                ids.append(term_id)
+                counts.append(count)
+        return np.asarray(counts, dtype=np.float64), np.asarray(ids, dtype=np.int64)
+
+    def score(self, data, method='bm25'):
+        """Scores of ``data`` against every posting, as an array in posting order."""
+        n = len(self.descriptions)
+        if not n:
+            return np.zeros(0)
+        counts, ids = self.cv_vector(data)
+        dense = np.zeros(len(self.vocab))
+        if method == 'bm25':
+            dense[ids] = counts / (counts + self.k1)
+            hits = np.bincount(self.rows, weights=self.weights * dense[self.indices], minlength=n)
+            return np.divide(hits, self.totals, out=np.zeros(n), where=self.totals > 0)
+        if method == 'tfidf':
+            dense[ids] = (1 + np.log(counts)) * self.idf[ids] if len(ids) else 0
+            dots = np.bincount(self.rows, weights=self.weights * dense[self.indices], minlength=n)
+            denom = self.norms * np.sqrt(np.dot(dense, dense))
+            return np.divide(dots, denom, out=np.zeros(n), where=denom > 0)
+        raise ValueError(f"Unknown scoring method: {method}")
+
+    def keywords(self, data, index, top=10):
+        """``(matched, missing)`` keywords of posting ``index``, heaviest first."""
+        return self._keywords(self.cv_vector(data)[1], index, top)
+
+    def _keywords(self, ids, index, top):
+        start, end = self.indptr[index], self.indptr[index + 1]
+        row_ids = self.indices[start:end]
+        order = np.argsort(-self.weights[start:end], kind='stable')
+        present = np.isin(row_ids[order], ids)
+        ranked = [self.terms[i] for i in row_ids[order]]
+        matched = [t for t, hit in zip(ranked, present) if hit][:top]
+        missing = [t for t, hit in zip(ranked, present) if not hit][:top]
+        return matched, missing
+
+    def rank(self, data, method='bm25', top=None):
+        """Postings best matching ``data`` first, as :class:`JobMatch` tuples (keywords only for the returned rows)."""
+        scores = self.score(data, method)
+        order = np.argsort(-scores, kind='stable')
+        if top is not None:
+            order = order[:top]
+        ids = self.cv_vector(data)[1]
+        return [JobMatch(int(i), float(scores[i]), *self._keywords(ids, int(i), 10)) for i in order]
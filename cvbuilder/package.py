@@ -0,0 +1,61 @@
+"""The "Create Package" ZIP: PDF + DOCX + JSON backup + cover letter template.
+
+The PDF and DOCX are rendered concurrently and every entry is written to the
+archive as soon as it is ready, so a package takes about as long as its
+slowest artifact instead of the sum of all of them. The archive is built in
+an in-memory buffer whose storage is returned without a copy; the download
+button keeps the whole file in memory anyway.
+"""
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from cvbuilder.serialize import dumps_json
+from cvbuilder.render import render as render_format
+from cvbuilder.text import generate_cover_letter
+
+RENDERED_FORMATS = ('pdf', 'docx')
+
+
+def write_package(fileobj, data, settings, render=render_format, executor=None,
+                  compression=zipfile.ZIP_STORED, compresslevel=None):
+    """Write the package ZIP to ``fileobj``.
+
+    ``render(fmt, data, settings)`` produces each artifact; the app passes one
+    that goes through its export jobs and render cache. It is called from
+    ``executor`` (a private thread pool by default), so it must be safe to
+    run concurrently; ``render`` itself can hand the work to a process pool
+    (see :func:`cvbuilder.render.pooled`) to get past the GIL.
+    ``compression``/``compresslevel`` are passed to :class:`zipfile.ZipFile`.
+    """
+    name = data['personal_info']['nama'].replace(' ', '_')
+    now = datetime.now()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=len(RENDERED_FORMATS), thread_name_prefix='cv-package')
+    futures = {}
+    try:
+        for fmt in RENDERED_FORMATS:
+            futures[executor.submit(render, fmt, data, settings)] = f"CV_{name}.{fmt}"
+        with zipfile.ZipFile(fileobj, 'w', compression=compression, compresslevel=compresslevel) as zip_file:
+            zip_file.writestr(f"CV_Backup_{now.strftime('%Y%m%d_%H%M%S')}.json", dumps_json(data, settings))
+            zip_file.writestr(f"Cover_Letter_Template_{name}.txt", generate_cover_letter(data, now))
+            for future in as_completed(futures):
+                zip_file.writestr(futures[future], future.result())
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_package(data, settings, render=render_format, executor=None, compression=zipfile.ZIP_STORED,
+                  compresslevel=None):
+    """Build the package ZIP and return its bytes."""
+    buffer = io.BytesIO()
+    write_package(buffer, data, settings, render, executor, compression, compresslevel)
+    # The buffer is not shared, so getvalue() hands over its storage instead of copying it.
+    return buffer.getvalue()
@@ -0,0 +1,183 @@
+"""Page layout planning for PDF output.
+
+:func:`plan_pages` lays out the body of a CV before anything is drawn: it
+wraps every paragraph with :mod:`cvbuilder.linebreak` (the same line-breaking
+rule as fpdf's ``multi_cell``, on cached word widths), decides where pages break
+and returns positioned :class:`TextOp`/:class:`CircleOp` drawing operations,
+each tagged with its page. :mod:`cvbuilder.pdf` then draws them page by page
+in one pass with automatic page breaks off.
+
+Every column keeps its own cursor across pages, so in two-column layouts a
+long left column no longer drags the right one onto its last page. A section
+title is kept with its first lines and an entry's title and meta lines with
+the start of its description; paragraphs break across pages without leaving
+a widow or an orphan line.
+
+:func:`estimate_pages` returns the page count of the plan, for showing in the
+UI without rendering the PDF.
+"""
+from collections import namedtuple
+
+from cvbuilder.fonts import pdf_text
+from cvbuilder.layouts import COLOR_TEXT, bind_sections, contact_items, get_plan
+from cvbuilder.linebreak import METRICS, lead, page_split
+from cvbuilder.photo import photo_path
+
+# A4 portrait with fpdf's defaults (1 cm margins, cell margin 1 mm) and the 15 mm bottom margin the PDF uses.
+PAGE_WIDTH = 210
+PAGE_HEIGHT = 297
+MARGIN = 10
+BOTTOM_MARGIN = 15
+PAGE_BREAK = PAGE_HEIGHT - BOTTOM_MARGIN
+
+TextOp = namedtuple('TextOp', 'page x y w h text style size color ws')
+CircleOp = namedtuple('CircleOp', 'page x y r color')
+PagePlan = namedtuple('PagePlan', 'pages body_top ops')
+
+
+def header_bottom(plan, info, has_photo):
+    """Where the header drawn by :mod:`cvbuilder.pdf` ends on page 1."""
+    header = plan.header
+    contacts = contact_items(plan, info)
+    if header.kind == 'banner':
+        bottom = header.height + 11
+    elif header.kind == 'hero':
+        bottom = header.height + 10 + (15 if contacts else 5)
+    else:
+        bottom = MARGIN + 10 + (8 if info['posisi_target'] else 0) + 5
+        bottom += (6 if contacts or header.contact_placeholder else 0) + 10
+    if has_photo and header.photo:
+        bottom = max(bottom, header.photo.y + header.photo.height + 3)
+    return bottom
+
+
+class _Column:
+    """Cursor of one column: the page and y where the next block goes."""
+
+    def __init__(self, x, width, top, ops):
+        self.x = x
+        self.width = width
+        self.page = 0
+        self.y = top
+        self.ops = ops
+
+    def inner_width(self, indent=0):
+        # fpdf treats a zero width as "up to the right margin".
+        return self.width - indent if self.width else PAGE_WIDTH - MARGIN - self.x - indent
+
+    def reserve(self, height):
+        """Start a new page unless ``height`` more mm fit on this one."""
+        if self.y + height > PAGE_BREAK:
+            self.new_page()
+
+    def text(self, text, h, style, size, color, indent=0, width=None, ws=0):
+        self.reserve(h)
+        w = self.inner_width(indent) if width is None else width
+        self.ops.append(TextOp(self.page, self.x + indent, self.y, w, h, text, style, size, color, ws))
+        self.y += h
+
+    def fit(self, h):
+        """How many more ``h`` mm lines fit on this page."""
+        y = self.y
+        count = 0
+        while y + h <= PAGE_BREAK:
+            y += h
+            count += 1
+        return count
+
+    def new_page(self):
+        self.page += 1
+        self.y = MARGIN
+
+    def lines(self, lines, h, style, size, color, indent=0):
+        """Place wrapped lines, breaking pages between paragraphs or where no widow/orphan is left."""
+        w = self.inner_width(indent)
+        start = 0
+        while start < len(lines):
+            end = start
+            while not lines[end].end and end + 1 < len(lines):
+                end += 1
+            end += 1
+            while start < end:
+                take = page_split(end - start, self.fit(h))
+                if take == 0 and self.y == MARGIN:
+                    take = max(1, self.fit(h))  # taller than a whole page
+                for line in lines[start:start + take]:
+                    self.text(line.text, h, style, size, color, indent, w, line.ws)
+                start += take
+                if start < end:
+                    self.new_page()
+
+    def gap(self, height):
+        # Like fpdf's ln(): moves down without breaking; the next block breaks if needed.
+        self.y += height
+
+
+def _plan_section(col, plan, bound, family):
+    section = bound.plan
+    indent = 12 if section.timeline else 0
+
+    def body_lines(text):
+        return METRICS.wrap(family, '', section.body_size, col.inner_width(indent), pdf_text(text, family),
+                            section.align, section.hyphenate)
+
+    if section.kind == 'text':
+        lines = body_lines(bound.entries[0].body)
+    elif section.kind == 'list' and section.style != 'bullets':
+        lines = body_lines(section.joiner.join(e.body for e in bound.entries))
+    else:
+        lines = None
+    bodies = [body_lines(e.body) if e.body is not None else () for e in bound.entries] if section.kind == 'entries' else None
+
+    def entry_head(body):
+        return 6 + 5 + lead(body) * section.line_height
+
+    # The title stays on the page of the first lines (bullet, entry head) below it.
+    if lines is not None:
+        first = lead(lines) * section.line_height
+    elif bodies is not None:
+        first = entry_head(bodies[0])
+    else:
+        first = 6
+    col.reserve(section.title_height + first)
+    col.text(pdf_text(section.title, family), section.title_height, 'B', section.title_size, section.title_color)
+
+    if lines is not None:
+        col.lines(lines, section.line_height, '', section.body_size, COLOR_TEXT)
+    elif bodies is None:
+        for entry in bound.entries:
+            col.text(pdf_text(f"• {entry.body}", family), 6, '', section.body_size, COLOR_TEXT)
+    else:
+        for entry, body in zip(bound.entries, bodies):
+            col.reserve(entry_head(body))
+            if section.timeline:
+                col.ops.append(CircleOp(col.page, col.x + 5, col.y + 3, 2, plan.primary))
+            col.text(pdf_text(entry.title, family), 6, 'B', section.item_title_size, COLOR_TEXT, indent)
+            col.text(pdf_text(entry.meta, family), 5, 'I', section.meta_size, section.meta_color, indent)
+            col.lines(body, section.line_height, '', section.body_size, COLOR_TEXT, indent)
+            col.gap(section.entry_gap)
+
+    col.gap(section.gap_after)
+
+
+def plan_pages(data, settings, plan=None):
+    """Lay out the body of the PDF for ``data``: a :class:`PagePlan` of drawing operations by page."""
+    plan = plan or get_plan(settings)
+    info = data['personal_info']
+    has_photo = bool(plan.header.photo and photo_path(info))
+    body_top = plan.body_top or header_bottom(plan, info, has_photo)
+
+    ops = []
+    pages = 1
+    for column, sections in zip(plan.columns, bind_sections(plan, data)):
+        col = _Column(column.x, column.width, body_top, ops)
+        for bound in sections:
+            _plan_section(col, plan, bound, plan.font_pdf)
+        pages = max(pages, col.page + 1)
+    ops.sort(key=lambda op: op.page)
+    return PagePlan(pages, body_top, ops)
+
+
+def estimate_pages(data, settings):
+    """Page count of the PDF for ``data``, without rendering it."""
+    return plan_pages(data, settings).pages
@@ -0,0 +1,185 @@
+"""PDF backend (fpdf). Only imported when a PDF is actually requested."""
+import io
+from functools import lru_cache
+
+from fpdf import FPDF
+
+from cvbuilder.fonts import embed, pdf_font, pdf_text, register
+from cvbuilder.layouts import get_plan, contact_items, display_name
+from cvbuilder.pagination import BOTTOM_MARGIN, TextOp, plan_pages
+from cvbuilder.photo import photo_path
+
+@lru_cache(maxsize=256)
+def _color_operator(r, g, b):
+    # The PDF operator fpdf builds for a color, formatted once per process instead of on every call.
+    if r == g == b == 0:
+        return '0.000 g'
+    return '%.3f %.3f %.3f rg' % (r / 255.0, g / 255.0, b / 255.0)
+
+# --- PDF GENERATOR ENHANCED ---
+class CVPDF(FPDF):
+    footer_font = 'Helvetica'
+
+    def set_text_color(self, r, g=-1, b=-1):
+        if g == -1:
+            return super().set_text_color(r)
+        self.text_color = _color_operator(r, g, b)
+        self.color_flag = self.fill_color != self.text_color
+
+    def set_fill_color(self, r, g=-1, b=-1):
+        if g == -1:
+            return super().set_fill_color(r)
+        operator = _color_operator(r, g, b)
+        if operator == self.fill_color and self.page > 0:
+            return  # already the current fill color on this page
+        self.fill_color = operator
+        self.color_flag = self.fill_color != self.text_color
+        if self.page > 0:
+            self._out(operator)
+
+    def header(self):
+        pass
+
+    def _putfonts(self):
+        # TrueType fonts are embedded by cvbuilder.fonts (cached subsets); fpdf writes the core ones.
+        if not any(font['type'] == 'TTF' for font in self.fonts.values()):
+            return super()._putfonts()
+        fonts = self.fonts
+        self.fonts = {key: font for key, font in fonts.items() if font['type'] != 'TTF'}
+        try:
+            super()._putfonts()
+        finally:
+            # Styles sharing a font entry are kept once, so the resource dictionary lists each font once.
+            self.fonts = {font['i']: font for font in fonts.values()}
+        for font in sorted(self.fonts.values(), key=lambda font: font['i']):
+            if font['type'] == 'TTF':
+                embed(self, font)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font(self.footer_font, 'I', 8)
+        self.set_text_color(128)
+        self.cell(0, 10, f"Generated by CV Builder Pro Ultra - Page {self.page_no()}", 0, 0, 'C')
+
+    # ✅ TAMBAHKAN METHOD CIRCLE UNTUK TEMPLATE CREATIVE
+    def circle(self, x, y, r, style='D'):
+        """Draw a circle using ellipse (FPDF doesn't have native circle)"""
+        self.ellipse(x - r, y - r, 2 * r, 2 * r, style)
+
+    def spaced_cell(self, w, h, txt, ws):
+        """One line of a justified paragraph: ``cell`` with ``ws`` mm of extra word spacing, as multi_cell draws it."""
+        if ws:
+            self.ws = ws
+            self._out('%.3f Tw' % (ws * self.k))
+        self.cell(w, h, txt)
+        if ws:
+            self.ws = 0
+            self._out('0 Tw')
+
+def _draw_photo(pdf, plan, info):
+    # Returns the bottom edge of the drawn photo (0 if none) so the body can start below it.
+    photo = plan.header.photo
+    path = photo_path(info) if photo else None
+    if not path:
+        return 0
+    pdf.image(path, photo.x, photo.y, photo.width, photo.height)
+    return photo.y + photo.height
+
+def _draw_header(pdf, plan, info):
+    header = plan.header
+    font = pdf_font(plan.font_pdf).family
+    name = display_name(plan, info)
+    contacts = contact_items(plan, info)
+
+    if header.kind in ('banner', 'hero'):
+        pdf.set_fill_color(*plan.primary)
+        pdf.rect(0, 0, 210, header.height, 'F')
+        pdf.set_text_color(255, 255, 255)
+    photo_bottom = _draw_photo(pdf, plan, info)
+
+    if header.kind == 'banner':
+        pdf.set_font(font, 'B', header.name_size)
+        pdf.set_xy(20, 12)
+        pdf.cell(0, 10, pdf_text(name, plan.font_pdf), ln=True)
+        if info['posisi_target']:
+            pdf.set_font(font, 'I', header.position_size)
+            pdf.set_text_color(255, 255, 200)
+            pdf.set_x(20)
+            pdf.cell(0, 8, pdf_text(info['posisi_target'], plan.font_pdf), ln=True)
+        pdf.set_text_color(50, 50, 50)
+        pdf.set_font(font, '', 10)
+        pdf.set_xy(20, header.height + 5)
+        pdf.cell(0, 6, pdf_text(" | ".join(contacts) if contacts else header.contact_placeholder or "", plan.font_pdf), ln=True)
+
+    elif header.kind == 'hero':
+        pdf.set_font(font, 'B', header.name_size)
+        pdf.set_xy(20, 30)
+        pdf.cell(0, 15, pdf_text(name, plan.font_pdf), ln=True)
+        if info['posisi_target']:
+            pdf.set_font(font, 'I', header.position_size)
+            pdf.set_text_color(255, 255, 200)
+            pdf.set_x(20)
+            pdf.cell(0, 10, pdf_text(info['posisi_target'], plan.font_pdf), ln=True)
+        pdf.set_xy(20, header.height + 10)
+        pdf.set_font(font, '', 10)
+        pdf.set_text_color(255, 255, 255)
+        for i, contact in enumerate(contacts):
+            pdf.cell(55, 8, pdf_text(contact, plan.font_pdf), border=1, fill=True, ln=False)
+            if i < len(contacts) - 1:
+                pdf.cell(5)
+        pdf.ln(15 if contacts else 5)
+
+    else:
+        align = 'C' if header.kind == 'centered' else ''
+        pdf.set_font(font, 'B', header.name_size)
+        pdf.set_text_color(*plan.primary)
+        pdf.cell(0, 10, pdf_text(name, plan.font_pdf), ln=True, align=align)
+        if info['posisi_target']:
+            pdf.set_font(font, 'B', header.position_size)
+            pdf.set_text_color(*plan.accent)
+            pdf.cell(0, 8, pdf_text(info['posisi_target'], plan.font_pdf), ln=True, align=align)
+        pdf.ln(5)
+        pdf.set_font(font, '', 10)
+        pdf.set_text_color(100, 100, 100)
+        if contacts or header.contact_placeholder:
+            pdf.cell(0, 6, pdf_text(" | ".join(contacts) if contacts else header.contact_placeholder, plan.font_pdf), ln=True, align=align)
+        pdf.ln(10)
+
+    if pdf.get_y() < photo_bottom + 3:
+        pdf.set_y(photo_bottom + 3)
+
+def _draw_ops(pdf, plan, ops):
+    font = pdf_font(plan.font_pdf).family
+    for op in ops:
+        while pdf.page < op.page + 1:
+            pdf.add_page()
+        if isinstance(op, TextOp):
+            pdf.set_font(font, op.style, op.size)
+            pdf.set_text_color(*op.color)
+            pdf.set_xy(op.x, op.y)
+            pdf.spaced_cell(op.w, op.h, op.text, op.ws)
+        else:
+            pdf.set_fill_color(*op.color)
+            pdf.circle(op.x, op.y, op.r, style='F')
+
+def generate_pdf_enhanced(data, settings):
+    plan = get_plan(settings)
+    # Page breaks are decided by the planner; nothing is drawn past the bottom margin.
+    pages = plan_pages(data, settings, plan)
+
+    pdf = CVPDF()
+    font = pdf_font(plan.font_pdf)
+    register(pdf, font)
+    pdf.footer_font = font.family
+    pdf.set_auto_page_break(auto=False, margin=BOTTOM_MARGIN)
+    pdf.add_page()
+
+    _draw_header(pdf, plan, data['personal_info'])
+    _draw_ops(pdf, plan, pages.ops)
+
+    pdf_bytes = pdf.output(dest='S')
+    if isinstance(pdf_bytes, str):
+        pdf_bytes = pdf_bytes.encode('latin1')
+    buffer = io.BytesIO(bytes(pdf_bytes))
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,198 @@
+"""Profile photo ingestion.
+
+An uploaded photo is decoded once, turned upright from its EXIF orientation,
+cropped to the 3:4 frame the templates draw, downscaled to ``PHOTO_SIZE`` and
+recompressed as a JPEG no larger than ``BYTE_BUDGET`` (EXIF and other metadata
+are not carried over). The result is stored by content hash in a directory
+shared by every process on the machine, so render pool workers see photos
+ingested after they started; ``cv_data['personal_info']['foto']`` only holds
+the short ``photo:<hash>`` reference.
+
+Older data (JSON backups, batch inputs) keeps the full photo as a base64
+string in ``foto``; :meth:`PhotoStore.resolve` ingests those on first use.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+PHOTO_SIZE = (300, 400)
+BYTE_BUDGET = 48 * 1024
+QUALITIES = (85, 75, 65, 55, 45, 35)
+REF_PREFIX = 'photo:'
+REF_PATTERN = re.compile(r'photo:[0-9a-f]{32}')
+DATA_URI = re.compile(r'data:image/[\w.+-]+;base64,')
+BASE64 = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
+
+def is_ref(value):
+    """Whether ``value`` is a stored photo reference (``photo:`` and 32 hex digits)."""
+    return isinstance(value, str) and REF_PATTERN.fullmatch(value) is not None
+
+
+def valid_foto(value):
+    """Whether ``value`` has the shape of a ``foto`` value: a reference, or base64 image data (a data URI too)."""
+    if is_ref(value):
+        return True
+    if not isinstance(value, str) or value.startswith(REF_PREFIX):
+        return False
+    prefix = DATA_URI.match(value)
+    return BASE64.fullmatch(value, prefix.end() if prefix else 0) is not None
+
+
+def process_photo(raw, size=PHOTO_SIZE, budget=BYTE_BUDGET):
+    """Return ``raw`` image bytes as a ``size`` JPEG of at most ``budget`` bytes (best effort)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(raw)) as source:
+        if source.format == 'JPEG' and source.size == size and len(raw) <= budget and 'exif' not in source.info:
+            return raw  # already processed (e.g. an inlined export being loaded again)
+        # JPEGs can be decoded straight at a fraction of their size (DCT scaling).
+        source.draft('RGB', (size[0] * 2, size[1] * 2))
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image = ImageOps.fit(image, size, Image.LANCZOS)
+
+    for quality in QUALITIES:
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        if buffer.tell() <= budget:
+            break
+    return buffer.getvalue()
+
+
+class PhotoStore:
+    def __init__(self, root=None, max_memory=32):
+        self.root = root or os.environ.get('CVBUILDER_PHOTO_DIR') or os.path.join(tempfile.gettempdir(), 'cvbuilder-photos')
+        self.max_memory = max_memory
+        self._memory = OrderedDict()
+        self._sources = {}
+        self._legacy = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _file(self, ref):
+        if not is_ref(ref):
+            raise ValueError(f"not a photo reference: {ref!r}")
+        path = os.path.join(self.root, ref[len(REF_PREFIX):] + '.jpg')
+        # The name is 32 hex digits; still, never hand out a path outside the store (e.g. a symlinked file).
+        root = os.path.realpath(self.root)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            raise ValueError(f"photo outside the store: {ref!r}")
+        return path
+
+    def ingest(self, raw):
+        """Process ``raw`` image bytes and return the reference of the stored result."""
+        source = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            ref = self._sources.get(source)
+        if ref is not None and self.path(ref):
+            return ref
+
+        try:
+            processed = process_photo(raw)
+        except Exception as e:
+            raise ValueError(f"Unsupported image: {e}") from e
+        ref = REF_PREFIX + hashlib.sha256(processed).hexdigest()[:32]
+        path = self._file(ref)
+        if not os.path.exists(path):
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(processed)
+            os.replace(tmp, path)
+        with self._lock:
+            self._sources[source] = ref
+            self._remember(ref, processed)
+        return ref
+
+    def _remember(self, ref, data):
+        self._memory[ref] = data
+        self._memory.move_to_end(ref)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def path(self, ref):
+        """File path of a stored photo, or ``None``."""
+        if not is_ref(ref):
+            return None
+        try:
+            path = self._file(ref)
+        except ValueError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def read(self, ref):
+        """Bytes of a stored photo, or ``None``."""
+        with self._lock:
+            data = self._memory.get(ref)
+            if data is not None:
+                self._memory.move_to_end(ref)
+                return data
+        path = self.path(ref)
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self._lock:
+            self._remember(ref, data)
+        return data
+
+    def resolve(self, foto):
+        """Reference for a ``foto`` value: a stored reference, or a legacy base64 photo (ingested). ``None`` if unusable."""
+        if not foto or not isinstance(foto, str):
+            return None
+        if foto.startswith(REF_PREFIX):
+            # Anything else after the prefix (e.g. "photo:../../etc/x") is not ours to open.
+            return foto if self.path(foto) else None
+        with self._lock:
+            ref = self._legacy.get(foto)
+        if ref is not None and self.path(ref):
+            return ref
+        prefix = DATA_URI.match(foto)
+        try:
+            ref = self.ingest(base64.b64decode(foto[prefix.end():] if prefix else foto, validate=True))
+        except (binascii.Error, ValueError):
+            return None
+        with self._lock:
+            self._legacy[foto] = ref
+            while len(self._legacy) > 8:
+                self._legacy.popitem(last=False)
+        return ref
+
+
+PHOTOS = PhotoStore()
+
+
+def photo_path(info):
+    """Path of the processed photo for ``personal_info``, or ``None``."""
+    return PHOTOS.path(PHOTOS.resolve(info.get('foto')))
+
+
+def photo_bytes(info):
+    ref = PHOTOS.resolve(info.get('foto'))
+    return PHOTOS.read(ref) if ref else None
+
+
+def inline_photo(data):
+    """Copy of ``cv_data`` with the photo as the processed JPEG in base64, for portable exports.
+
+    Stored references are inlined and legacy full-size photos are replaced by
+    their processed version; data without a usable photo is returned as is.
+    """
+    ref = PHOTOS.resolve(data['personal_info'].get('foto'))
+    processed = PHOTOS.read(ref) if ref else None
+    if processed is None:
+        return data
+    info = dict(data['personal_info'], foto=base64.b64encode(processed).decode())
+    return dict(data, personal_info=info)
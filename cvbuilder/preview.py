@@ -0,0 +1,245 @@
+"""HTML live preview used by the Preview tab.
+
+The document is assembled from per-section fragments. The ``<style>`` block is
+memoized per theme/color combination, and the header, summary, skills and
+languages fragments are memoized on their own values. Experience and education
+are memoized per entry (keyed by the entry's fields), so editing one job only
+rebuilds that job's fragment; the sections are returned as part lists so the
+document is joined once.
+
+Section order comes from the compiled layout plan (:mod:`cvbuilder.layouts`),
+so the preview lists sections in the same order the PDF/DOCX will.
+"""
+import base64
+from functools import lru_cache
+
+from cvbuilder.analysis import analyze
+from cvbuilder.layouts import get_plan
+from cvbuilder.photo import PHOTOS
+
+THEME_PALETTES = {
+    'dark': {'border_color': '#444', 'text_color': '#fff', 'bg_color': '#1e1e1e', 'skill_bg': '#333', 'date_color': '#aaa'},
+    'light': {'border_color': '#eee', 'text_color': '#333', 'bg_color': 'white', 'skill_bg': '#f0f0f0', 'date_color': '#666'},
+}
+
+# --- HTML FRAGMENTS ---
+@lru_cache(maxsize=64)
+def preview_css(theme, base_color, accent_color):
+    palette = THEME_PALETTES['dark' if theme == 'dark' else 'light']
+    border_color = palette['border_color']
+    text_color = palette['text_color']
+    bg_color = palette['bg_color']
+    skill_bg = palette['skill_bg']
+    date_color = palette['date_color']
+    return f"""
+    <style>
+        .cv-container {{
+            max-width: 800px;
+            margin: 0 auto;
+            background: {bg_color};
+            color: {text_color};
+            box-shadow: 0 5px 25px rgba(0,0,0,0.1);
+            border-radius: 10px;
+            overflow: hidden;
+        }}
+        .cv-header {{
+            background: linear-gradient(135deg, {base_color}, {accent_color});
+            padding: 40px;
+            color: white;
+        }}
+        .ats-score {{
+            position: absolute;
+            top: 20px;
+            right: 20px;
+            background: rgba(255,255,255,0.2);
+            padding: 5px 15px;
+            border-radius: 20px;
+            font-size: 12px;
+        }}
+        .photo {{
+            float: right;
+            width: 120px;
+            height: 160px;
+            object-fit: cover;
+            border-radius: 8px;
+            border: 3px solid rgba(255,255,255,0.6);
+            margin-top: 20px;
+        }}
+        .name {{
+            font-size: 36px;
+            font-weight: bold;
+            margin-bottom: 5px;
+        }}
+        .position {{
+            font-size: 20px;
+            opacity: 0.9;
+            margin-bottom: 20px;
+        }}
+        .contact-bar {{
+            display: flex;
+            gap: 20px;
+            flex-wrap: wrap;
+            font-size: 14px;
+        }}
+        .section {{
+            padding: 25px 40px;
+            border-bottom: 1px solid {border_color};
+        }}
+        .section-title {{
+            color: {base_color};
+            font-size: 18px;
+            font-weight: bold;
+            margin-bottom: 15px;
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }}
+        .skill-tag {{
+            display: inline-block;
+            background: {skill_bg};
+            padding: 5px 15px;
+            border-radius: 20px;
+            margin: 5px;
+            font-size: 14px;
+            border-left: 4px solid {accent_color};
+        }}
+        .timeline-item {{
+            position: relative;
+            padding-left: 30px;
+            margin-bottom: 25px;
+        }}
+        .timeline-item:before {{
+            content: '';
+            position: absolute;
+            left: 0;
+            top: 5px;
+            width: 12px;
+            height: 12px;
+            background: {accent_color};
+            border-radius: 50%;
+        }}
+        .job-title {{
+            font-weight: bold;
+            font-size: 16px;
+            margin-bottom: 5px;
+        }}
+        .company {{
+            color: {accent_color};
+            font-style: italic;
+            margin-bottom: 5px;
+        }}
+        .date {{
+            float: right;
+            color: {date_color};
+            font-size: 14px;
+        }}
+    </style>
+"""
+
+@lru_cache(maxsize=8)
+def photo_uri(ref):
+    data = PHOTOS.read(ref)
+    return f"data:image/jpeg;base64,{base64.b64encode(data).decode()}" if data else None
+
+@lru_cache(maxsize=256)
+def header_fragment(ats_score, nama, posisi_target, email, telepon, alamat, photo_src=None):
+    html_parts = [f"""    
+    <div class="cv-container">
+        <div class="cv-header">
+            {f'<img class="photo" src="{photo_src}">' if photo_src else ''}
+            <div class="ats-score">ATS Score: {ats_score}%</div>
+            <div class="name">{nama or 'Your Name'}</div>
+            <div class="position">{posisi_target or 'Professional'}</div>
+            <div class="contact-bar">
+    """]
+    if email:
+        html_parts.append(f'<div>📧 {email}</div>')
+    if telepon:
+        html_parts.append(f'<div>📱 {telepon}</div>')
+    if alamat:
+        html_parts.append(f'<div>📍 {alamat}</div>')
+    html_parts.append('</div></div>')
+    return ''.join(html_parts)
+
+@lru_cache(maxsize=256)
+def summary_fragment(ringkasan):
+    return ('<div class="section">'
+            '<div class="section-title">📝 Professional Summary</div>'
+            f'<p>{ringkasan or "No summary provided"}</p>'
+            '</div>')
+
+@lru_cache(maxsize=512)
+def experience_fragment(periode, posisi, perusahaan, deskripsi):
+    return f'''
+            <div class="timeline-item">
+                <span class="date">{periode}</span>
+                <div class="job-title">{posisi}</div>
+                <div class="company">{perusahaan}</div>
+                <p>{deskripsi}</p>
+            </div>
+            '''
+
+def experience_parts(items):
+    html_parts = ['<div class="section">', '<div class="section-title">💼 Work Experience</div>']
+    html_parts.extend(experience_fragment(exp.get('periode', 'Period'), exp.get('posisi', 'Position'),
+                                          exp.get('perusahaan', 'Company'), exp.get('deskripsi', 'Description'))
+                      for exp in items)
+    html_parts.append('</div>')
+    return html_parts
+
+@lru_cache(maxsize=512)
+def education_fragment(tahun, institusi, gelar):
+    return f'''
+            <div class="timeline-item">
+                <span class="date">{tahun}</span>
+                <div class="job-title">{institusi}</div>
+                <p>{gelar}</p>
+            </div>
+            '''
+
+def education_parts(items):
+    html_parts = ['<div class="section">', '<div class="section-title">🎓 Education</div>']
+    html_parts.extend(education_fragment(edu.get('tahun', 'Year'), edu.get('institusi', 'Institution'),
+                                         edu.get('gelar', 'Degree'))
+                      for edu in items)
+    html_parts.append('</div>')
+    return html_parts
+
+@lru_cache(maxsize=256)
+def skills_fragment(skills):
+    return ('<div class="section">'
+            '<div class="section-title">🛠️ Skills</div>'
+            + ''.join(f'<span class="skill-tag">{skill}</span>' for skill in skills)
+            + '</div>')
+
+@lru_cache(maxsize=256)
+def languages_fragment(languages):
+    return ('<div class="section">'
+            '<div class="section-title">🌐 Languages</div>'
+            f'<p>{", ".join(languages)}</p>'
+            '</div>')
+
+# --- HTML PREVIEW ---
+def get_html_preview_enhanced(data, settings):
+    info = data['personal_info']
+    plan = get_plan(settings)
+    photo_ref = PHOTOS.resolve(info.get('foto')) if plan.header.photo else None
+    html_parts = [
+        preview_css(settings['theme'], settings['base_color'], settings['accent_color']),
+        header_fragment(analyze(data).score, info['nama'], info['posisi_target'],
+                        info['email'], info['telepon'], info['alamat'], photo_uri(photo_ref) if photo_ref else None),
+    ]
+    # Sections follow the template's layout order; their look stays the preview's own.
+    for key in plan.section_order:
+        if key == 'summary':
+            html_parts.append(summary_fragment(data['ringkasan']))
+        elif key == 'experience' and data['pengalaman']:
+            html_parts.extend(experience_parts(data['pengalaman']))
+        elif key == 'education' and data['pendidikan']:
+            html_parts.extend(education_parts(data['pendidikan']))
+        elif key == 'skills' and data['keahlian']:
+            html_parts.append(skills_fragment(tuple(data['keahlian'][:20])))
+        elif key == 'languages' and data['bahasa']:
+            html_parts.append(languages_fragment(tuple(data['bahasa'][:5])))
+    html_parts.append('</div>')
+    return ''.join(html_parts)
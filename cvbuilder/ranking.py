@@ -0,0 +1,232 @@
+"""Ranking stored CVs against one job posting.
+
+:class:`CVIndex` is an inverted index from terms to the CVs that contain them.
+Terms come from :func:`cvbuilder.matching.cv_terms`: target position,
+experience titles and descriptions, summary and skills. Updates are
+incremental. :meth:`CVIndex.add` appends one CV's postings and replaces
+anything indexed for it before. As a store listener
+(:meth:`cvbuilder.store.SQLiteStore.add_listener`), the index follows every
+autosave, import and delete.
+
+Postings are kept as compact ``array`` buffers (document number, term count)
+in ascending document order and read as NumPy views at query time. Replaced
+or deleted CVs are tombstoned and compacted away in bulk.
+
+:meth:`CVIndex.top` scores with BM25 term-at-a-time, highest-impact term first,
+with MaxScore pruning. Once the remaining terms could not lift a CV outside the
+current candidates above the k-th best score, only those candidates are
+scored further, and they are dropped as soon as they fall out of reach. Long
+(common) posting lists are searched for the candidates with a binary search
+instead of being scanned. Scores are kept only for the CVs the posting lists
+read contain, so a query never walks the whole corpus. The result is exact.
+"""
+import math
+import threading
+from array import array
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from cvbuilder.matching import cv_terms, tokenize
+
+CVMatch = namedtuple('CVMatch', 'cv_id score')
+# Candidates are looked up in a posting list, instead of scanning it, once it is LOOKUP_SHARE times longer.
+LOOKUP_SHARE = 16
+# A pruning check (a partition of the candidates) runs after reading CHECK_COST postings per candidate.
+CHECK_COST = 2
+
+
+class CVIndex:
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._max_tf = {}
+        self._numbers = {}
+        self._cv_ids = []
+        self._lengths = array('f')
+        self._alive = bytearray()
+        self._dead = 0
+        self._total_length = 0.0
+        self._min_length = None
+        self._scratch = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __contains__(self, cv_id):
+        return cv_id in self._numbers
+
+    def add(self, cv_id, data):
+        """Index ``data`` under ``cv_id``, replacing what was indexed for it before."""
+        counts = cv_terms(data)
+        length = float(sum(counts.values()))
+        with self._lock:
+            self._remove(cv_id)
+            number = len(self._cv_ids)
+            self._cv_ids.append(cv_id)
+            self._lengths.append(length)
+            self._alive.append(1)
+            self._numbers[cv_id] = number
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('i'), array('f'))
+                postings[0].append(number)
+                postings[1].append(tf)
+                if tf > self._max_tf.get(term, 0):
+                    self._max_tf[term] = tf
+            self._total_length += length
+            if self._min_length is None or length < self._min_length:
+                self._min_length = length
+
+    def add_records(self, records):
+        for record in records:
+            self.add(record.cv_id, record.data)
+
+    def remove(self, cv_id):
+        with self._lock:
+            self._remove(cv_id)
+
+    def _remove(self, cv_id):
+        # _max_tf and _min_length are left as they are: a stale bound is still a valid (looser) bound.
+        number = self._numbers.pop(cv_id, None)
+        if number is None:
+            return
+        self._alive[number] = 0
+        self._cv_ids[number] = None
+        self._total_length -= self._lengths[number]
+        self._dead += 1
+        if self._dead > max(1024, len(self._numbers) // 4):
+            self._compact()
+
+    def _compact(self):
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        renumber = (np.cumsum(alive) - 1).astype(np.int32)
+        for term in list(self._postings):
+            docs, tfs = self._postings[term]
+            doc_view = np.frombuffer(docs, dtype=np.int32)
+            keep = alive[doc_view]
+            if not keep.any():
+                del self._postings[term]
+                del self._max_tf[term]
+                continue
+            new_docs, new_tfs = array('i'), array('f')
+            new_docs.frombytes(renumber[doc_view[keep]].tobytes())
+            new_tfs.frombytes(np.frombuffer(tfs, dtype=np.float32)[keep].tobytes())
+            del doc_view
+            self._postings[term] = (new_docs, new_tfs)
+        lengths = array('f')
+        lengths.frombytes(np.frombuffer(self._lengths, dtype=np.float32)[alive].tobytes())
+        self._lengths = lengths
+        self._cv_ids = [cv_id for cv_id in self._cv_ids if cv_id is not None]
+        self._numbers = {cv_id: number for number, cv_id in enumerate(self._cv_ids)}
+        self._alive = bytearray(b'\x01') * len(self._cv_ids)
+        self._dead = 0
+
+    # --- store listener ---
+    def saved(self, rows):
+        import json
+        for row in rows:
+            self.add(row[0], json.loads(row[3]))
+
+    def deleted(self, cv_id):
+        self.remove(cv_id)
+
+    # --- queries ---
+    def top(self, text, k=10, prune=True):
+        """The ``k`` CVs best matching the job posting ``text``, best first. ``prune=False`` scores every posting."""
+        with self._lock:
+            n = len(self._numbers)
+            if not n or k <= 0:
+                return []
+            k1, b = self.k1, self.b
+            avgdl = self._total_length / n
+            alive = np.frombuffer(self._alive, dtype=np.uint8) if self._dead else None
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+            min_norm = 1 - b + b * self._min_length / avgdl
+
+            terms = []
+            for term, qtf in Counter(tokenize(text)).items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs = np.frombuffer(postings[0], dtype=np.int32)
+                tfs = np.frombuffer(postings[1], dtype=np.float32)
+                if alive is not None:
+                    live = alive[docs].view(bool)
+                    docs, tfs = docs[live], tfs[live]
+                if not len(docs):
+                    continue
+                weight = math.log1p((n - len(docs) + 0.5) / (len(docs) + 0.5)) * (1 + math.log(qtf))
+                max_tf = self._max_tf[term]
+                bound = weight * max_tf * (k1 + 1) / (max_tf + k1 * min_norm)
+                terms.append((bound, weight, docs, tfs))
+            terms.sort(key=lambda t: t[0], reverse=True)
+            remaining = [0.0] * (len(terms) + 1)
+            for i in range(len(terms) - 1, -1, -1):
+                remaining[i] = remaining[i + 1] + terms[i][0]
+
+            base, per_length = k1 * (1 - b), k1 * b / avgdl
+
+            def impact(weight, docs, tfs):
+                denom = lengths[docs] * per_length
+                denom += base
+                denom += tfs
+                return tfs * (weight * (k1 + 1)) / denom
+
+            # Scores accumulate in a scratch buffer that is reused across queries; only the documents in the
+            # posting lists read are touched (and reset afterwards), so a query costs the postings it reads,
+            # not the size of the corpus. Every impact is positive, so a zero score means "not seen yet".
+            # Once the terms left could not lift an unseen CV to the k-th best score, the candidates are
+            # fixed to the CVs still within reach, and they shrink as more terms are added; a posting list
+            # much longer than the candidates is then searched for them instead of being scanned. A
+            # check runs once CHECK_COST postings per candidate have been read since the last one (or as
+            # soon as the last threshold already allows fixing the candidates), so checks stay a fraction
+            # of the reading.
+            if self._scratch is None or len(self._scratch) < len(self._cv_ids):
+                self._scratch = np.zeros(max(len(self._cv_ids), 0 if self._scratch is None else 2 * len(self._scratch)))
+            scratch = self._scratch
+            found = []
+            candidates = None
+            try:
+                read = next_check = 0
+                threshold = 0.0
+                for i, (_, weight, docs, tfs) in enumerate(terms):
+                    if candidates is not None and len(candidates) * LOOKUP_SHARE <= len(docs):
+                        pos = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                        hit = docs[pos] == candidates
+                        scratch[candidates[hit]] += impact(weight, candidates[hit], tfs[pos[hit]])
+                        read += len(candidates)
+                    else:
+                        before = scratch[docs]
+                        scratch[docs] = before + impact(weight, docs, tfs)
+                        found.append(docs[before == 0])
+                        read += len(docs)
+                    if prune and i + 1 < len(terms) and (read >= next_check or (
+                            candidates is None and remaining[i + 1] < threshold)):
+                        if candidates is None:
+                            found = [np.concatenate(found)]
+                            pool = found[0]
+                        else:
+                            pool = candidates
+                        next_check = read + CHECK_COST * len(pool)
+                        if len(pool) > k:
+                            scores = scratch[pool]
+                            threshold = max(threshold, np.partition(scores, len(pool) - k)[len(pool) - k])
+                            if remaining[i + 1] < threshold:
+                                candidates = pool[scores + remaining[i + 1] >= threshold]
+                if candidates is None:
+                    candidates = np.concatenate(found) if found else np.zeros(0, dtype=np.int32)
+                scores = scratch[candidates]
+            finally:
+                for docs in found:
+                    scratch[docs] = 0
+
+            if len(scores) > k:
+                chosen = np.argpartition(-scores, k)[:k]
+            else:
+                chosen = np.arange(len(scores))
+            chosen = chosen[np.lexsort((candidates[chosen], -scores[chosen]))]
+            return [CVMatch(self._cv_ids[candidates[c]], float(scores[c])) for c in chosen if scores[c] > 0]
@@ -0,0 +1,68 @@
+"""Output format registry.
+
+Every renderer takes ``(data, settings)`` and returns the finished file as
+``bytes``. Backends are imported inside the renderer, so importing this
+module (or the CLI) never pulls in fpdf or python-docx; a batch run that only
+asks for ``json``/``txt`` never loads them at all.
+"""
+from concurrent.futures import BrokenExecutor
+
+
+def render_pdf(data, settings):
+    from cvbuilder.pdf import generate_pdf_enhanced
+    return generate_pdf_enhanced(data, settings).getvalue()
+
+
+def render_docx(data, settings):
+    from cvbuilder.word import generate_word_doc
+    return generate_word_doc(data, settings).getvalue()
+
+
+def render_html(data, settings):
+    from cvbuilder.preview import get_html_preview_enhanced
+    return get_html_preview_enhanced(data, settings).encode('utf-8')
+
+
+def render_txt(data, settings):
+    from cvbuilder.text import generate_plain_text
+    return generate_plain_text(data).encode('utf-8')
+
+
+def render_json(data, settings):
+    from cvbuilder.serialize import dumps_json
+    return dumps_json(data, settings)
+
+
+def render_cvb(data, settings):
+    from cvbuilder.serialize import dumps_binary
+    return dumps_binary(data, settings)
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'docx': render_docx,
+    'html': render_html,
+    'txt': render_txt,
+    'json': render_json,
+    'cvb': render_cvb,
+}
+
+
+def render(fmt, data, settings):
+    return RENDERERS[fmt](data, settings)
+
+
+def pooled(executor, fmt):
+    """A ``(data, settings)`` renderer for ``fmt`` that runs in ``executor``.
+
+    Used with a process pool so the PDF and DOCX of a package really render in
+    parallel; the calling thread only waits. If the pool has broken (a worker
+    died) it renders in-process instead.
+    """
+    def render_in_pool(data, settings):
+        try:
+            return executor.submit(RENDERERS[fmt], data, settings).result()
+        except BrokenExecutor:
+            return RENDERERS[fmt](data, settings)
+    render_in_pool.__name__ = f'render_{fmt}'
+    return render_in_pool
@@ -0,0 +1,495 @@
+"""Structured import of an existing CV (.docx or text-layer .pdf) into ``cv_data``.
+
+:func:`parse_resume` extracts the text lines of the file, splits them into
+sections at known headings (English and Indonesian: "Work Experience",
+"Pendidikan", "Skills", ...) and reads each section with its own heuristics:
+
+* the lines above the first heading are the header: name, target position
+  and the contact line (email, phone, LinkedIn/GitHub/website, location);
+* experience and education entries are found by their date ranges
+  (``Jan 2020 - Present``, ``2016 - 2019``, ``03/2018 – sekarang``); the short
+  lines just above a date and the rest of the date line are the entry's title
+  and organization, the lines below it its description;
+* skills and languages are bullet or comma lists.
+
+Text comes from python-docx's XML for .docx files, and from PyMuPDF for PDFs
+when it is installed; otherwise a small built-in reader handles simple text
+layers (such as the PDFs this app exports). Scanned PDFs have no text layer
+and parse to an empty CV.
+
+Parsing stops at ``budget`` seconds and returns what it has so far, marked
+``partial``. The extractors check the clock as they go (not only between
+lines), so the budget holds inside a pool worker too, where the caller
+cannot interrupt the call. Complete results are memoized by the SHA-256 of
+the file, so uploading the same file again (or reruns while it stays in the
+uploader) is free.
+"""
+import copy
+import hashlib
+import io
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict, namedtuple
+
+from cvbuilder.templates import empty_cv_data
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+DEFAULT_BUDGET = 5.0
+CACHE_SIZE = 64
+# Longer lines are cut: no CV line is this long, and the regexes below must stay cheap.
+MAX_LINE_LENGTH = 1000
+MAX_STREAM_BYTES = 16 * 1024 * 1024
+
+ParsedResume = namedtuple('ParsedResume', 'data kind partial elapsed_ms')
+Line = namedtuple('Line', 'text bullet')
+
+
+class ResumeError(ValueError):
+    pass
+
+
+SECTION_HEADINGS = {
+    'summary': ('professional summary', 'summary', 'profile', 'professional profile', 'about me', 'objective',
+                'career objective', 'ringkasan', 'profil', 'tentang saya'),
+    'experience': ('work experience', 'experience', 'professional experience', 'employment history', 'work history',
+                   'experience timeline', 'employment', 'pengalaman', 'pengalaman kerja', 'riwayat pekerjaan'),
+    'education': ('education', 'academic background', 'education history', 'pendidikan', 'riwayat pendidikan'),
+    'skills': ('skills', 'key skills', 'technical skills', 'core competencies', 'skills expertise', 'expertise',
+               'keahlian', 'keterampilan', 'kemampuan'),
+    'languages': ('languages', 'language skills', 'bahasa', 'kemampuan bahasa'),
+    'contact': ('contact', 'contact information', 'contact details', 'personal information', 'personal details',
+                'kontak', 'informasi kontak', 'data diri', 'data pribadi'),
+    'other': ('certifications', 'certificates', 'projects', 'hobbies', 'interests', 'references', 'awards',
+              'achievements', 'publications', 'volunteering', 'sertifikasi', 'proyek', 'hobi', 'referensi', 'penghargaan'),
+}
+_HEADINGS = {title: section for section, titles in SECTION_HEADINGS.items() for title in titles}
+
+LABELS = {
+    'name': 'nama', 'nama': 'nama', 'email': 'email', 'e-mail': 'email', 'phone': 'telepon', 'telepon': 'telepon',
+    'mobile': 'telepon', 'hp': 'telepon', 'location': 'alamat', 'address': 'alamat', 'alamat': 'alamat',
+    'linkedin': 'linkedin', 'github': 'github', 'website': 'website', 'portfolio': 'website',
+}
+LABEL_LINE = re.compile(r'^\s*([A-Za-z-]+)\s*:\s*(.*)$')
+
+MONTH = r'(?:jan|feb|mar|apr|may|mei|jun|jul|aug|agu|agt|sep|oct|okt|nov|dec|des)[a-z]*\.?'
+DATE = rf'(?:{MONTH}\s+(?:19|20)\d{{2}}|\d{{1,2}}/(?:19|20)\d{{2}}|(?:19|20)\d{{2}})'
+NOW = r'(?:present|now|current|today|sekarang|saat ini|kini)'
+DATE_RANGE = re.compile(rf'\(?\b{DATE}\s*(?:-|–|—|to|s/d|sampai|hingga)\s*(?:{DATE}|{NOW})\b\)?', re.I)
+YEAR = re.compile(r'\(?\b(?:19|20)\d{2}\b\)?')
+
+EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+URL = re.compile(r'(?:https?://|www\.)[^\s|,]+|\b[\w-]+(?:\.[\w-]+)*\.(?:com|io|dev|me|id|net|org)(?:/[^\s|,]*)?', re.I)
+PHONE = re.compile(r'\+?\(?\d[\d\s().-]{6,}\d')
+BULLET = re.compile(r'^\s*(?:[•●▪◦·‣⁃*]|-(?=\s)|–(?=\s))\s*')
+RULE = re.compile(r'^[-=_~*.\s]{3,}$')
+FOOTER = re.compile(r'\bpage \d+(?: of \d+)?$|^\d+$|^generated by ', re.I)
+FIELD_SEPARATORS = re.compile(r'\s*(?:\||•|·|\s[—–-]\s|\bat\b|\bfrom\b|\bdi\b|@\s)\s*')
+# Contact details are set apart by bars, bullets, wide gaps or icons (any run of symbols).
+CONTACT_SEPARATORS = re.compile(r"\s*(?:[|•·]|\s{2,}|[^\w\s@+().,/:'&-]+)\s*")
+LIST_SEPARATORS = re.compile(r'\s*[,;•|·]\s*')
+DEGREE_WORDS = re.compile(r'\b(?:bachelor|master|sarjana|magister|doktor|doctor|diploma|ph\.?d|mba|b\.?sc|m\.?sc|'
+                          r'b\.?a|m\.?a|b\.?eng|m\.?eng|b\.?s|m\.?s|s[123]|d[1-4]|associate|degree|high school)\b', re.I)
+INSTITUTION_WORDS = re.compile(r'universit|institut|college|school|politekni|polytechnic|academy|akademi|sekolah|\bsm[ak]\b', re.I)
+NAME_PREFIX = re.compile(r'^(?:cv|resume|curriculum vitae)\s*[-:|]\s*', re.I)
+# Emoji and icon noise: variation selectors, zero-width joiners, skin tone modifiers (plus symbols, see _plain).
+EMOJI_MARKS = re.compile('[\ufe00-\ufe0f\u200b-\u200d\u2060\U0001f3fb-\U0001f3ff\U000e0100-\U000e01ef]')
+SYMBOL_CATEGORIES = frozenset(('So', 'Sk', 'Cf', 'Co', 'Cs'))
+
+# --- CACHE (per hash isi file) ---
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def resume_key(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+
+def cached_resume(key):
+    """The memoized :class:`ParsedResume` for ``key`` (a copy the caller may edit), or ``None``."""
+    with _cache_lock:
+        parsed = _cache.get(key)
+        if parsed is None:
+            return None
+        _cache.move_to_end(key)
+    return parsed._replace(data=copy.deepcopy(parsed.data))
+
+
+def remember_resume(key, parsed):
+    """Memoize ``parsed`` under ``key``. Partial results are not kept: a retry may get further."""
+    if parsed.partial:
+        return
+    with _cache_lock:
+        _cache[key] = parsed._replace(data=copy.deepcopy(parsed.data))
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+# --- EKSTRAKSI TEKS ---
+def detect_kind(raw, filename=None):
+    if raw[:5] == b'%PDF-':
+        return 'pdf'
+    if raw[:4] == b'PK\x03\x04':
+        return 'docx'
+    raise ResumeError(f"{filename or 'file'}: content is neither a .docx nor a .pdf document")
+
+
+def _over(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+
+def _docx_lines(raw, deadline=None):
+    from docx import Document
+    from docx.oxml.ns import qn
+
+    try:
+        document = Document(io.BytesIO(raw))
+    except Exception as e:
+        raise ResumeError(f"unreadable .docx file ({e})") from e
+    text_tag, tab_tag, br_tag, cr_tag = qn('w:t'), qn('w:tab'), qn('w:br'), qn('w:cr')
+    # Every paragraph in document order, table cells included (row by row, so a sidebar column comes first).
+    for paragraph in document.element.body.iter(qn('w:p')):
+        parts = []
+        for node in paragraph.iter(text_tag, tab_tag, br_tag, cr_tag):
+            if _over(deadline):
+                break
+            if node.tag == text_tag:
+                parts.append(node.text or '')
+            elif node.tag == tab_tag:
+                parts.append(' ')
+            else:
+                parts.append('\n')
+        yield from ''.join(parts).split('\n')
+        if _over(deadline):
+            return
+
+
+def _pdf_lines(raw, deadline=None):
+    if pymupdf is not None:
+        try:
+            document = pymupdf.open(stream=raw, filetype='pdf')
+        except Exception as e:
+            raise ResumeError(f"unreadable .pdf file ({e})") from e
+        with document:
+            for page in document:
+                if _over(deadline):
+                    return
+                yield from page.get_text().split('\n')
+        return
+    yield from _pdf_text_layer(raw, deadline)
+
+
+_STREAM = re.compile(rb'<<(.*?)>>\s*stream\r?\n', re.S)
+_TEXT_TOKEN = re.compile(rb'\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>|\[|\]|/[^\s/\[\]()<>]+|[A-Za-z\'"*]+|-?[\d.]+', re.S)
+_OBJECT = re.compile(rb'(\d+) 0 obj\s*<<(.*?)>>', re.S)
+_FONT_RESOURCE = re.compile(rb'/([^\s/\[\]()<>]+) (\d+) 0 R')
+_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+
+def _pdf_string(token, encoding='cp1252'):
+    if token[:1] == b'<':
+        return bytes.fromhex(re.sub(rb'\s', b'', token[1:-1]).decode('ascii')).decode(encoding, 'replace')
+    out = bytearray()
+    body, i = token[1:-1], 0
+    while i < len(body):
+        char = body[i:i + 1]
+        if char == b'\\' and i + 1 < len(body):
+            nxt = body[i + 1:i + 2]
+            octal = re.match(rb'[0-7]{1,3}', body[i + 1:i + 4])
+            if octal:
+                out.append(int(octal.group(), 8) & 0xFF)
+                i += 1 + len(octal.group())
+                continue
+            out += _ESCAPES.get(nxt, nxt)
+            i += 2
+            continue
+        out += char
+        i += 1
+    return out.decode(encoding, 'replace')
+
+
+def _streams(raw):
+    """``(dictionary, data)`` of every stream object; ``bytes.find`` spots the end, fast even in huge streams."""
+    pos = 0
+    while True:
+        start = _STREAM.search(raw, pos)
+        end = raw.find(b'endstream', start.end()) if start else -1
+        if end < 0:
+            return
+        body = raw[start.end():end]
+        body = body[:-2] if body.endswith(b'\r\n') else body[:-1] if body.endswith(b'\n') else body
+        yield start.group(1), body
+        pos = end + len(b'endstream')
+
+
+def _two_byte_fonts(raw):
+    """Resource names of the Type0 fonts of a PDF (fpdf's TrueType fonts: Identity-H, codes are UTF-16BE)."""
+    type0 = {n for n, body in _OBJECT.findall(raw) if b'/Type0' in body}
+    return {b'/' + name for name, n in _FONT_RESOURCE.findall(raw) if n in type0}
+
+
+def _pdf_text_layer(raw, deadline=None):
+    """Text lines of a simple PDF: single-byte or Identity-H fonts, uncompressed or Flate content streams."""
+    two_byte = _two_byte_fonts(raw)
+    for header, body in _streams(raw):
+        if _over(deadline):
+            return
+        if b'/Image' in header or b'/Length1' in header or b'/FontFile' in header:
+            continue
+        if b'/FlateDecode' in header:
+            try:
+                body = zlib.decompressobj().decompress(body, MAX_STREAM_BYTES)
+            except zlib.error:
+                continue
+        elif b'/Filter' in header:
+            continue
+        if b'BT' not in body:
+            continue
+        line = []
+        name = None
+        encoding = 'cp1252'
+        for match in _TEXT_TOKEN.finditer(body):
+            if _over(deadline):
+                break
+            token = match.group()
+            if token[:1] in (b'(', b'<'):
+                line.append(_pdf_string(token, encoding))
+            elif token[:1] == b'/':
+                name = token
+            elif token == b'Tf':
+                encoding = 'utf-16-be' if name in two_byte else 'cp1252'
+            elif token in (b'Td', b'TD', b'Tm', b'T*', b"'", b'"', b'ET') and line:
+                yield ''.join(line)
+                line = []
+        if line:
+            yield ''.join(line)
+
+
+def extract_lines(raw, kind, deadline=None):
+    """Raw text lines of a ``'docx'`` or ``'pdf'`` file, in reading order (a generator).
+
+    Past ``deadline`` (a :func:`time.perf_counter` value) it stops, even in the middle of a line.
+    """
+    return _docx_lines(raw, deadline) if kind == 'docx' else _pdf_lines(raw, deadline)
+
+
+# --- HEURISTIK ---
+def _plain(text):
+    """``text`` without emoji, icons and other symbol characters."""
+    text = EMOJI_MARKS.sub('', text)
+    return ''.join(c for c in text if unicodedata.category(c) not in SYMBOL_CATEGORIES) if not text.isascii() else text
+
+
+def _has_letters(text):
+    return any(c.isalpha() for c in text)
+
+
+def _clean(lines):
+    for text in lines:
+        text = ' '.join(text[:MAX_LINE_LENGTH].replace('\xa0', ' ').split())
+        # Icon-only lines (the emoji of a heading that the PDF put on a line of its own) are noise too.
+        if not text or RULE.match(text) or FOOTER.search(text) or not any(c.isalnum() for c in _plain(text)):
+            continue
+        bullet = BULLET.match(text)
+        yield Line(text[bullet.end():] if bullet else text, bool(bullet))
+
+
+def heading_section(text):
+    """The section a heading line starts (``'experience'``, ...), or ``None`` if it is not a heading."""
+    text = _plain(text)
+    if len(text) > 40:
+        return None
+    key = ' '.join(re.sub(r'[^\w\s]|\d|_', ' ', text).split()).lower()
+    return _HEADINGS.get(key)
+
+
+def _join_wrapped(lines):
+    """Lines of a text block with wrapped lines rejoined; a bullet or a finished sentence starts a new line."""
+    out = []
+    for line in lines:
+        if out and not line.bullet and line.text[:1].islower() and not out[-1].endswith(('.', '!', '?', ':')):
+            out[-1] += ' ' + line.text
+        else:
+            out.append(line.text)
+    return out
+
+
+def _fields(text):
+    parts = (_plain(part).strip(' ,()') for part in FIELD_SEPARATORS.split(text))
+    return [part for part in parts if _has_letters(part) or DATE_RANGE.search(part) or YEAR.search(part)]
+
+
+def _is_title(line):
+    return not line.bullet and len(line.text) <= 80 and not line.text.endswith(('.', ';', ':'))
+
+
+def _entries(lines, period):
+    """``(fields, period, description lines)`` for every dated entry in a section."""
+    dated = [i for i, line in enumerate(lines) if period.search(line.text)]
+    if not dated:
+        return [(_fields(lines[0].text), '', lines[1:])] if lines else []
+    heads = []
+    floor = 0
+    for i in dated:
+        match = period.search(lines[i].text)
+        rest = _fields(lines[i].text[:match.start()] + ' | ' + lines[i].text[match.end():])
+        # A date line that already names the role and the organization takes nothing from above.
+        start = i
+        while start > floor and i - start < 2 - min(len(rest), 2) and _is_title(lines[start - 1]):
+            start -= 1
+        fields = [field for line in lines[start:i] for field in _fields(line.text)] + rest
+        if len(fields) == 1 and ', ' in fields[0]:
+            fields = fields[0].split(', ', 1)  # "Software Engineer, Acme Corp"
+        heads.append((start, i, fields, match.group().strip('() ')))
+        floor = i + 1
+    entries = []
+    for n, (start, i, fields, found) in enumerate(heads):
+        end = heads[n + 1][0] if n + 1 < len(heads) else len(lines)
+        entries.append((fields, found, lines[i + 1:end]))
+    return entries
+
+
+def _experience(lines):
+    result = []
+    for fields, found, body in _entries(lines, DATE_RANGE):
+        if not any(_has_letters(text) for text in fields + [line.text for line in body]):
+            continue
+        fields = fields + ['', '', '']
+        result.append({'posisi': fields[0], 'perusahaan': fields[1], 'periode': found,
+                       'deskripsi': '\n'.join(_join_wrapped(body)), 'lokasi': fields[2]})
+    return result
+
+
+def _education(lines):
+    result = []
+    for fields, found, body in _entries(lines, re.compile(f'{DATE_RANGE.pattern}|{YEAR.pattern}', re.I)):
+        if not any(_has_letters(text) for text in fields + [line.text for line in body]):
+            continue
+        degree = next((field for field in fields if DEGREE_WORDS.search(field)), None)
+        school = next((field for field in fields if field != degree and INSTITUTION_WORDS.search(field)), None)
+        rest = [field for field in fields if field not in (degree, school)]
+        if school is None and rest:
+            school = rest.pop(0)
+        if degree is None and rest:
+            degree = rest.pop(0)
+        result.append({'institusi': school or '', 'gelar': degree or '', 'tahun': found,
+                       'deskripsi': '\n'.join(_join_wrapped(body))})
+    return result
+
+
+def _items(lines):
+    items = []
+    for line in lines:
+        for item in LIST_SEPARATORS.split(line.text):
+            item = item.strip(' .')
+            if item and len(item) <= 60 and item not in items:
+                items.append(item)
+    return items
+
+
+def _header(lines, text, info):
+    email = EMAIL.search(text)
+    if email:
+        info['email'] = email.group()
+    # Emails removed first, or their domain would read as a website.
+    for match in URL.finditer(EMAIL.sub(' ', text)):
+        url = match.group().rstrip('.')
+        field = 'linkedin' if 'linkedin.' in url.lower() else 'github' if 'github.' in url.lower() else 'website'
+        info[field] = info[field] or url
+
+    rest = []
+    seen_contact = False
+    for line in lines:
+        label = LABEL_LINE.match(line.text)
+        if label and label.group(1).lower() in LABELS and not URL.match(line.text):
+            field = LABELS[label.group(1).lower()]
+            if label.group(2):
+                info[field] = label.group(2)
+            continue
+        pieces = [piece for piece in CONTACT_SEPARATORS.split(line.text) if piece]
+        contact = False
+        for piece in pieces:
+            if EMAIL.search(piece) or URL.fullmatch(piece):
+                contact = True
+            elif PHONE.fullmatch(piece) and sum(c.isdigit() for c in piece) >= 8 and not DATE_RANGE.search(piece):
+                info['telepon'] = info['telepon'] or piece
+                contact = True
+            elif seen_contact or contact or len(pieces) > 1:
+                # The free-text piece among (or right after) the contact details is the location.
+                info['alamat'] = info['alamat'] or piece
+                contact = True
+        seen_contact = seen_contact or contact
+        if not contact:
+            rest.append(line.text)
+
+    for text in rest:
+        text = NAME_PREFIX.sub('', text)
+        words = text.split()
+        if sum(c.isdigit() for c in text) > 2 or len(words) > 8:
+            continue
+        if not info['nama'] and len(words) <= 5:
+            info['nama'] = text.title() if text.isupper() else text
+        elif not info['posisi_target'] and info['nama'] and text.lower() != info['nama'].lower():
+            info['posisi_target'] = text
+    return info
+
+
+def parse_lines(lines):
+    """``cv_data`` from the text lines of a CV."""
+    data = empty_cv_data()
+    sections = {'header': []}
+    current = 'header'
+    for line in _clean(lines):
+        section = None if line.bullet else heading_section(line.text)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    header = sections['header'] + sections.get('contact', [])
+    _header(header, '\n'.join(line.text for line in header), data['personal_info'])
+    data['ringkasan'] = ' '.join(_join_wrapped(sections.get('summary', [])))
+    data['pengalaman'] = _experience(sections.get('experience', []))
+    data['pendidikan'] = _education(sections.get('education', []))
+    data['keahlian'] = _items(sections.get('skills', []))
+    data['bahasa'] = _items(sections.get('languages', []))
+    return data
+
+
+def parse_resume(raw, filename=None, budget=DEFAULT_BUDGET):
+    """:class:`ParsedResume` for the bytes of a .docx or .pdf CV; raises :class:`ResumeError` if unreadable.
+
+    Text extraction stops after ``budget`` seconds, within a line if need be;
+    the text read by then is parsed and the result is marked ``partial``.
+    """
+    key = resume_key(raw)
+    parsed = cached_resume(key)
+    if parsed is not None:
+        return parsed
+    started = time.perf_counter()
+    deadline = started + budget
+    kind = detect_kind(raw, filename)
+    lines = list(extract_lines(raw, kind, deadline))
+    partial = _over(deadline)
+    parsed = ParsedResume(parse_lines(lines), kind, partial, (time.perf_counter() - started) * 1000)
+    remember_resume(key, parsed)
+    return parsed
+
+
+def merge_resume(data, parsed):
+    """``data`` with every field the parser found replaced by the parsed value (the photo is kept)."""
+    merged = copy.deepcopy(data)
+    for field, value in parsed['personal_info'].items():
+        if value:
+            merged['personal_info'][field] = value
+    for key in ('ringkasan', 'pengalaman', 'pendidikan', 'keahlian', 'bahasa'):
+        if parsed[key]:
+            merged[key] = copy.deepcopy(parsed[key])
+    return merged
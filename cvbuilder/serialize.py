@@ -0,0 +1,271 @@
+"""Versioned import/export of ``cv_data`` + ``settings``.
+
+Two encodings of the same payload, ``{"schema": SCHEMA_VERSION, "cv_data":
+..., "settings": ...}``:
+
+* JSON (:func:`dumps_json`/:func:`loads_json`): the portable backup, with the
+  photo inlined as base64. Encoded and decoded with ``orjson`` when it is
+  installed, the standard library otherwise.
+* CVB (:func:`dumps_binary`/:func:`loads_binary`): a small framed binary
+  format for the session store and batch pipelines. It holds the compact
+  JSON body (optionally zlib-compressed) and the processed photo as raw
+  JPEG bytes instead of base64.
+
+:func:`loads` accepts either. Every load is migrated to the current schema
+(:data:`MIGRATIONS`; older backups are a bare ``cv_data`` dict or a
+``{"cv_data", "settings"}`` pair without a version) and validated.
+Values of the wrong type (or a ``foto`` that is neither a ``photo:``
+reference nor base64 image data) raise :class:`SchemaError` listing every
+offending path; keys the schema does not know are dropped and missing entry
+fields are filled in.
+"""
+import json
+import re
+import struct
+import zlib
+
+from cvbuilder.templates import FONTS, LAYOUTS, SETTING_RANGES, empty_cv_data, normalize_cv_data
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SCHEMA_VERSION = 2
+CVB_MAGIC = b'CVB\x01'
+# magic, schema version, flags, body length, photo length
+CVB_HEADER = struct.Struct('>4sBBII')
+FLAG_ZLIB = 1
+
+ENTRY_FIELDS = {
+    'pengalaman': ('posisi', 'perusahaan', 'periode', 'deskripsi', 'lokasi'),
+    'pendidikan': ('institusi', 'gelar', 'tahun', 'deskripsi'),
+}
+STRING_LISTS = ('keahlian', 'bahasa', 'hobi')
+FREE_LISTS = ('sertifikasi', 'proyek')
+HEX_COLOR = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+SETTING_TYPES = {
+    'template_style': str, 'font_family': str, 'base_color': str, 'accent_color': str,
+    'font_size_body': (int, float), 'font_size_header': (int, float), 'section_spacing': (int, float),
+    'show_icons': bool, 'theme': str, 'ats_friendly': bool,
+}
+
+
+class SchemaError(ValueError):
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__("Invalid CV file: " + "; ".join(problems))
+
+
+# --- JSON backend ---
+def _json_dumps(obj, indent=False):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _json_loads(raw):
+    try:
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError as e:
+        raise SchemaError([f"not valid JSON ({e})"]) from e
+
+
+# --- MIGRATIONS (versi lama -> versi berikutnya) ---
+def _migrate_v1(payload):
+    """Unversioned backups: a bare ``cv_data`` or ``{"cv_data", "settings"}``; loose types from hand-edited files."""
+    if 'cv_data' in payload:
+        data, settings = payload['cv_data'], payload.get('settings') or {}
+    else:
+        data, settings = payload, {}
+    if isinstance(data, dict):
+        data = dict(data)
+        info = data.get('personal_info')
+        if isinstance(info, dict):
+            data['personal_info'] = {k: str(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v
+                                     for k, v in info.items()}
+        for key in STRING_LISTS:
+            if isinstance(data.get(key), str):
+                data[key] = [item.strip() for item in data[key].split(',') if item.strip()]
+        for key, fields in ENTRY_FIELDS.items():
+            if isinstance(data.get(key), list):
+                data[key] = [{**{field: '' for field in fields}, **{k: v for k, v in entry.items() if v is not None}}
+                             if isinstance(entry, dict) else entry for entry in data[key]]
+    return {'schema': 2, 'cv_data': data, 'settings': settings}
+
+
+MIGRATIONS = {1: _migrate_v1}
+
+
+def migrate(payload):
+    """``payload`` (any known schema version) brought up to :data:`SCHEMA_VERSION`."""
+    if not isinstance(payload, dict):
+        raise SchemaError(["expected a JSON object"])
+    version = payload.get('schema', 1)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise SchemaError([f"schema version {version!r} is newer than this app supports ({SCHEMA_VERSION})"])
+    while version < SCHEMA_VERSION:
+        payload = MIGRATIONS[version](payload)
+        version = payload['schema']
+    return payload
+
+
+# --- VALIDATION ---
+def _all_entries(entries):
+    # Fast path for the common (valid) case; paths of the problems are only worked out when this fails.
+    return all(type(entry) is dict and all(value is None or type(value) is str for value in entry.values())
+               for entry in entries)
+
+
+def validate(data, settings):
+    """Return ``(cv_data, settings)`` normalized to the schema; raise :class:`SchemaError` on wrong types.
+
+    ``settings`` keeps only the keys that were given; callers merge it over their own defaults.
+    """
+    problems = []
+
+    def check(ok, path, expected):
+        if not ok:
+            problems.append(f"{path}: expected {expected}")
+        return ok
+
+    if not check(isinstance(data, dict), 'cv_data', 'an object'):
+        raise SchemaError(problems)
+    if not isinstance(settings, dict):
+        raise SchemaError(['settings: expected an object'])
+
+    info = data.get('personal_info') or {}
+    if check(isinstance(info, dict), 'personal_info', 'an object'):
+        for key, value in info.items():
+            check(value is None or isinstance(value, str), f'personal_info.{key}', 'a string')
+        if isinstance(info.get('foto'), str) and info['foto']:
+            from cvbuilder.photo import valid_foto
+            check(valid_foto(info['foto']), 'personal_info.foto', 'a photo: reference or base64 image data')
+    check(isinstance(data.get('ringkasan') or '', str), 'ringkasan', 'a string')
+    for key, fields in ENTRY_FIELDS.items():
+        entries = data.get(key) or []
+        if check(isinstance(entries, list), key, 'a list') and not _all_entries(entries):
+            for i, entry in enumerate(entries):
+                if check(isinstance(entry, dict), f'{key}[{i}]', 'an object'):
+                    for field, value in entry.items():
+                        check(value is None or isinstance(value, str), f'{key}[{i}].{field}', 'a string')
+    for key in STRING_LISTS:
+        items = data.get(key) or []
+        if check(isinstance(items, list), key, 'a list') and not all(type(item) is str for item in items):
+            for i, item in enumerate(items):
+                check(isinstance(item, str), f'{key}[{i}]', 'a string')
+    for key in FREE_LISTS:
+        check(isinstance(data.get(key) or [], list), key, 'a list')
+
+    for key, value in settings.items():
+        expected = SETTING_TYPES.get(key)
+        if expected is not None:
+            check(isinstance(value, expected) and not (expected is not bool and isinstance(value, bool)),
+                  f'settings.{key}', {str: 'a string', bool: 'true or false'}.get(expected, 'a number'))
+    if isinstance(settings.get('template_style'), str):
+        check(settings['template_style'] in LAYOUTS, 'settings.template_style', 'one of ' + ', '.join(LAYOUTS))
+    if isinstance(settings.get('font_family'), str):
+        check(settings['font_family'] in FONTS, 'settings.font_family', 'one of ' + ', '.join(FONTS))
+    for key in ('base_color', 'accent_color'):
+        if isinstance(settings.get(key), str):
+            check(HEX_COLOR.match(settings[key]), f'settings.{key}', 'a #rgb or #rrggbb color')
+    for key, (low, high) in SETTING_RANGES.items():
+        value = settings.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            check(low <= value <= high, f'settings.{key}', f'a number from {low} to {high}')
+
+    if problems:
+        raise SchemaError(problems)
+    known = empty_cv_data()
+    data = normalize_cv_data({k: v for k, v in data.items() if k in known})
+    # Every entry gets every field, whatever schema version it came from (the Build tab indexes them).
+    for key, fields in ENTRY_FIELDS.items():
+        data[key] = [{**entry, **{field: entry.get(field) or '' for field in fields}} for entry in data[key]]
+    settings = {k: v for k, v in settings.items() if k in SETTING_TYPES}
+    return data, settings
+
+
+def load_payload(payload):
+    """``(cv_data, settings)`` from a decoded backup object of any schema version."""
+    payload = migrate(payload)
+    return validate(payload.get('cv_data'), payload.get('settings') or {})
+
+
+# --- JSON ---
+def dumps_json(data, settings=None, indent=True):
+    """The JSON backup of ``data`` (photo inlined as base64) and ``settings``, as UTF-8 bytes."""
+    from cvbuilder.photo import inline_photo
+    payload = {'schema': SCHEMA_VERSION, 'cv_data': inline_photo(data), 'settings': settings or {}}
+    return _json_dumps(payload, indent)
+
+
+def loads_json(raw):
+    """``(cv_data, settings)`` from a JSON backup of any schema version.
+
+    An inlined base64 photo is stored and replaced by its ``photo:`` reference;
+    one that is not a readable image is dropped.
+    """
+    data, settings = load_payload(_json_loads(raw))
+    info = data['personal_info']
+    if info['foto']:
+        from cvbuilder.photo import PHOTOS
+        info['foto'] = PHOTOS.resolve(info['foto'])
+    return data, settings
+
+
+# --- CVB (binary) ---
+def dumps_binary(data, settings=None, compress=False):
+    """The CVB encoding of ``data`` and ``settings``: header, JSON body, raw photo JPEG.
+
+    ``compress`` deflates the body (zlib level 1): about 4x smaller for the
+    text of a large CV, for a few ms on each side. Worth it for downloads and
+    long-term storage, not for hot batch paths.
+    """
+    from cvbuilder.photo import PHOTOS
+    info = data['personal_info']
+    ref = PHOTOS.resolve(info.get('foto'))
+    photo = (PHOTOS.read(ref) if ref else None) or b''
+    if info.get('foto') is not None:
+        data = dict(data, personal_info=dict(info, foto=None))
+    body = _json_dumps({'schema': SCHEMA_VERSION, 'cv_data': data, 'settings': settings or {}})
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    return CVB_HEADER.pack(CVB_MAGIC, SCHEMA_VERSION, flags, len(body), len(photo)) + body + photo
+
+
+def loads_binary(raw):
+    """``(cv_data, settings)`` from a CVB file; its photo is stored and referenced like an upload."""
+    if len(raw) < CVB_HEADER.size:
+        raise SchemaError(["truncated CVB file"])
+    magic, version, flags, body_length, photo_length = CVB_HEADER.unpack_from(raw)
+    if magic != CVB_MAGIC:
+        raise SchemaError(["not a CVB file"])
+    if CVB_HEADER.size + body_length + photo_length != len(raw):
+        raise SchemaError(["truncated CVB file"])
+    view = memoryview(raw)
+    body = view[CVB_HEADER.size:CVB_HEADER.size + body_length]
+    try:
+        body = zlib.decompress(body) if flags & FLAG_ZLIB else bytes(body)
+    except zlib.error as e:
+        raise SchemaError([f"corrupt CVB body ({e})"]) from e
+    data, settings = load_payload(_json_loads(body))
+    if photo_length:
+        from cvbuilder.photo import PHOTOS
+        try:
+            data['personal_info']['foto'] = PHOTOS.ingest(bytes(view[CVB_HEADER.size + body_length:]))
+        except ValueError as e:
+            raise SchemaError([f"personal_info.foto: {e}"]) from e
+    return data, settings
+
+
+def loads(raw):
+    """``(cv_data, settings)`` from a JSON backup or a CVB file."""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    if raw[:len(CVB_MAGIC)] == CVB_MAGIC:
+        return loads_binary(raw)
+    return loads_json(raw)
@@ -0,0 +1,448 @@
+"""Persistent storage for CVs, their settings and rendered artifacts.
+
+:class:`SQLiteStore` keeps everything in one SQLite database in WAL mode, so
+session startups (readers) never wait on the autosave writer. CVs are indexed
+by target position (``posisi_target``) and update time. Where SQLite cannot be
+used (a read-only or network file system that cannot hold the WAL, no
+``sqlite3`` module), :func:`open_store` falls back to :class:`FileStore`, one
+JSON file per CV plus one file per artifact, with the same interface.
+
+:class:`Autosaver` debounces writes: every rerun may hand it the latest
+``cv_data``, and a CV is written once it has been quiet for ``delay`` seconds
+(or every ``max_delay`` seconds while edits keep coming). Everything due at
+the same time goes out in one transaction, serialized only then.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import sqlite3
+except ImportError:  # Python builds without the _sqlite3 extension
+    sqlite3 = None
+
+logger = logging.getLogger(__name__)
+
+CVRecord = namedtuple('CVRecord', 'cv_id user_id data settings updated_at')
+
+CV_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+# The ids the app hands out (uuid.uuid4().hex); the only ones it accepts from a URL.
+UUID_CV_ID_PATTERN = re.compile(r'^[0-9a-f]{12}4[0-9a-f]{3}[89ab][0-9a-f]{15}$')
+# Anonymous sessions prove ownership with a random edit token (secrets.token_urlsafe(16)).
+EDIT_TOKEN_PATTERN = re.compile(r'^[A-Za-z0-9_-]{22}$')
+MAX_ARTIFACT_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cvs (
+    cv_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    posisi_target TEXT,
+    data TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cvs_posisi_target ON cvs (posisi_target);
+CREATE INDEX IF NOT EXISTS idx_cvs_updated_at ON cvs (updated_at);
+CREATE INDEX IF NOT EXISTS idx_cvs_user ON cvs (user_id, updated_at);
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_created_at ON artifacts (created_at);
+"""
+
+
+def check_cv_id(cv_id):
+    if not isinstance(cv_id, str) or not CV_ID_PATTERN.match(cv_id):
+        raise ValueError(f"Invalid CV id: {cv_id!r}")
+    return cv_id
+
+
+def new_edit_token():
+    return secrets.token_urlsafe(16)
+
+
+def anonymous_owner(edit_token):
+    """The ``user_id`` a CV edited with ``edit_token`` is stored under; only the token's hash is kept."""
+    return 'anon:' + hashlib.sha256(edit_token.encode()).hexdigest()
+
+
+def cv_row(cv_id, data, settings, user_id=None, updated_at=None):
+    """The serialized form both stores write: ``(cv_id, user_id, posisi_target, data_json, settings_json, updated_at)``."""
+    return (check_cv_id(cv_id), user_id, (data.get('personal_info') or {}).get('posisi_target') or None,
+            json.dumps(data, ensure_ascii=False), json.dumps(settings, ensure_ascii=False),
+            updated_at if updated_at is not None else time.time())
+
+
+def _snapshot(value):
+    """A copy of the dicts and lists in ``value``; the strings in it are shared, not copied."""
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    return value
+
+
+def _record(row):
+    cv_id, user_id, data, settings, updated_at = row
+    return CVRecord(cv_id, user_id, json.loads(data), json.loads(settings), updated_at)
+
+
+class _Store:
+    """What both stores share: record-level saves and write listeners."""
+
+    def __init__(self):
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Call ``listener.saved(rows)`` after every CV write and ``listener.deleted(cv_id)`` after every delete."""
+        self._listeners.append(listener)
+
+    def _notify_saved(self, rows):
+        # The rows are already committed; a failing listener must not make the write look failed.
+        for listener in self._listeners:
+            try:
+                listener.saved(rows)
+            except Exception:
+                logger.exception("Store listener %r failed", listener)
+
+    def _notify_deleted(self, cv_id):
+        for listener in self._listeners:
+            try:
+                listener.deleted(cv_id)
+            except Exception:
+                logger.exception("Store listener %r failed", listener)
+
+    def save_many(self, records):
+        self.write_rows([cv_row(r.cv_id, r.data, r.settings, r.user_id, r.updated_at) for r in records])
+
+    def save(self, cv_id, data, settings, user_id=None):
+        self.write_rows([cv_row(cv_id, data, settings, user_id)])
+
+
+class SQLiteStore(_Store):
+    def __init__(self, path, max_artifact_bytes=MAX_ARTIFACT_BYTES):
+        super().__init__()
+        self.path = path
+        self.max_artifact_bytes = max_artifact_bytes
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._artifact_writes = 0
+        conn = self._conn()
+        mode = conn.execute('PRAGMA journal_mode=WAL').fetchone()[0]
+        if mode.lower() != 'wal':
+            raise sqlite3.OperationalError(f"WAL not available for {path} (journal_mode={mode})")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        # sqlite3 connections are per thread; download callbacks and the autosaver run off the script thread.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    # --- CVs ---
+    def write_rows(self, rows):
+        """Upsert pre-serialized rows (see :func:`cv_row`) in one transaction."""
+        if not rows:
+            return
+        with self._write_lock, self._conn() as conn:
+            conn.executemany(
+                'INSERT INTO cvs (cv_id, user_id, posisi_target, data, settings, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(cv_id) DO UPDATE SET user_id=excluded.user_id, posisi_target=excluded.posisi_target, '
+                'data=excluded.data, settings=excluded.settings, updated_at=excluded.updated_at',
+                rows)
+        self._notify_saved(rows)
+
+    def load(self, cv_id):
+        row = self._conn().execute(
+            'SELECT cv_id, user_id, data, settings, updated_at FROM cvs WHERE cv_id = ?', (check_cv_id(cv_id),)).fetchone()
+        return _record(row) if row else None
+
+    def load_many(self, cv_ids):
+        """``{cv_id: CVRecord}`` for the ids that exist, read in chunks of 500."""
+        ids = [check_cv_id(cv_id) for cv_id in cv_ids]
+        records = {}
+        conn = self._conn()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT cv_id, user_id, data, settings, updated_at FROM cvs WHERE cv_id IN ({','.join('?' * len(chunk))})",
+                chunk)
+            for row in rows:
+                records[row[0]] = _record(row)
+        return records
+
+    def find(self, posisi_target=None, user_id=None, limit=50):
+        """Most recently updated CVs, optionally filtered by exact target position and/or user."""
+        where, args = [], []
+        if posisi_target is not None:
+            where.append('posisi_target = ?')
+            args.append(posisi_target)
+        if user_id is not None:
+            where.append('user_id = ?')
+            args.append(user_id)
+        sql = 'SELECT cv_id, user_id, data, settings, updated_at FROM cvs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY updated_at DESC LIMIT ?'
+        return [_record(row) for row in self._conn().execute(sql, args + [limit])]
+
+    def iter_records(self, batch_size=500):
+        """Every stored CV, fetched ``batch_size`` rows at a time."""
+        cursor = self._conn().execute('SELECT cv_id, user_id, data, settings, updated_at FROM cvs ORDER BY rowid')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _record(row)
+
+    def delete(self, cv_id):
+        with self._write_lock, self._conn() as conn:
+            conn.execute('DELETE FROM cvs WHERE cv_id = ?', (check_cv_id(cv_id),))
+        self._notify_deleted(cv_id)
+
+    # --- Artifacts ---
+    def get_artifact(self, key):
+        row = self._conn().execute('SELECT data FROM artifacts WHERE key = ?', (key,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put_artifact(self, key, kind, data):
+        with self._write_lock, self._conn() as conn:
+            conn.execute('INSERT OR REPLACE INTO artifacts (key, kind, data, size, created_at) VALUES (?, ?, ?, ?, ?)',
+                         (key, kind, data, len(data), time.time()))
+            self._artifact_writes += 1
+            if self._artifact_writes % 32 == 0:
+                self._prune(conn)
+
+    def _prune(self, conn):
+        total = 0
+        stale = []
+        for key, size in conn.execute('SELECT key, size FROM artifacts ORDER BY created_at DESC'):
+            total += size
+            if total > self.max_artifact_bytes:
+                stale.append((key,))
+        conn.executemany('DELETE FROM artifacts WHERE key = ?', stale)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class FileStore(_Store):
+    """Fallback store: ``cvs/<cv_id>.json`` and ``artifacts/<key>`` under ``root``. Lookups by position scan every file."""
+
+    def __init__(self, root, max_artifact_bytes=MAX_ARTIFACT_BYTES):
+        super().__init__()
+        self.root = root
+        self.max_artifact_bytes = max_artifact_bytes
+        self._cvs = os.path.join(root, 'cvs')
+        self._artifacts = os.path.join(root, 'artifacts')
+        os.makedirs(self._cvs, exist_ok=True)
+        os.makedirs(self._artifacts, exist_ok=True)
+        self._artifact_writes = 0
+
+    def _write_file(self, path, payload):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+
+    def _read_cv(self, path):
+        with open(path, encoding='utf-8') as f:
+            row = json.load(f)
+        return CVRecord(row['cv_id'], row['user_id'], row['data'], row['settings'], row['updated_at'])
+
+    def write_rows(self, rows):
+        for cv_id, user_id, posisi_target, data, settings, updated_at in rows:
+            payload = (f'{{"cv_id":{json.dumps(cv_id)},"user_id":{json.dumps(user_id)},'
+                       f'"posisi_target":{json.dumps(posisi_target)},"updated_at":{updated_at},'
+                       f'"data":{data},"settings":{settings}}}')
+            self._write_file(os.path.join(self._cvs, cv_id + '.json'), payload.encode('utf-8'))
+        self._notify_saved(rows)
+
+    def load(self, cv_id):
+        path = os.path.join(self._cvs, check_cv_id(cv_id) + '.json')
+        return self._read_cv(path) if os.path.exists(path) else None
+
+    def load_many(self, cv_ids):
+        records = {}
+        for cv_id in cv_ids:
+            record = self.load(cv_id)
+            if record is not None:
+                records[cv_id] = record
+        return records
+
+    def iter_records(self, batch_size=500):
+        for name in sorted(os.listdir(self._cvs)):
+            if name.endswith('.json'):
+                yield self._read_cv(os.path.join(self._cvs, name))
+
+    def find(self, posisi_target=None, user_id=None, limit=50):
+        records = list(self.iter_records())
+        records = [r for r in records
+                   if (posisi_target is None or (r.data.get('personal_info') or {}).get('posisi_target') == posisi_target)
+                   and (user_id is None or r.user_id == user_id)]
+        records.sort(key=lambda r: r.updated_at, reverse=True)
+        return records[:limit]
+
+    def delete(self, cv_id):
+        path = os.path.join(self._cvs, check_cv_id(cv_id) + '.json')
+        if os.path.exists(path):
+            os.remove(path)
+        self._notify_deleted(cv_id)
+
+    def get_artifact(self, key):
+        path = os.path.join(self._artifacts, key)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_artifact(self, key, kind, data):
+        self._write_file(os.path.join(self._artifacts, key), data)
+        self._artifact_writes += 1
+        if self._artifact_writes % 32 == 0:
+            self._prune()
+
+    def _prune(self):
+        entries = []
+        for entry in os.scandir(self._artifacts):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = 0
+        for _, size, path in sorted(entries, reverse=True):
+            total += size
+            if total > self.max_artifact_bytes:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        pass
+
+
+def open_store(path=None):
+    """Open the SQLite store at ``path`` (default ``$CVBUILDER_DB`` or ``cvbuilder.db``), or a :class:`FileStore` next to it."""
+    path = path or os.environ.get('CVBUILDER_DB', 'cvbuilder.db')
+    root = os.path.splitext(path)[0] + '_store'
+    if sqlite3 is None:
+        logger.warning("sqlite3 is not available; storing CVs as files under %s", root)
+        return FileStore(root)
+    try:
+        return SQLiteStore(path)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("SQLite store at %s unavailable (%s); storing CVs as files under %s", path, e, root)
+        return FileStore(root)
+
+
+class Autosaver:
+    def __init__(self, store, delay=2.0, max_delay=10.0):
+        self.store = store
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending = {}
+        self._scheduled = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='cv-autosave', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def schedule(self, cv_id, data, settings, user_id=None, version=None):
+        """Queue a save of ``cv_id``. A no-op if nothing changed since the last call; returns whether it queued.
+
+        ``version`` (an :attr:`EditHistory.version <cvbuilder.history.EditHistory.version>`)
+        stands in for ``data`` when deciding whether anything changed. ``data`` is
+        only copied when it did, and only serialized when the write goes out.
+        """
+        check_cv_id(cv_id)
+        now = time.monotonic()
+        with self._cond:
+            if self._scheduled.get(cv_id) == (user_id, settings, data if version is None else version):
+                return False
+            self._scheduled[cv_id] = self._fingerprint(data, settings, user_id, version)
+            first = self._pending[cv_id][1] if cv_id in self._pending else now
+            self._pending[cv_id] = ((cv_id, _snapshot(data), dict(settings), user_id), first, now)
+            self._cond.notify()
+        return True
+
+    def mark_saved(self, cv_id, data, settings, user_id=None, version=None):
+        """Record that ``cv_id`` already holds this content (e.g. it was just loaded), so it is not written back."""
+        with self._cond:
+            self._scheduled[cv_id] = self._fingerprint(data, settings, user_id, version)
+
+    @staticmethod
+    def _fingerprint(data, settings, user_id, version):
+        return user_id, dict(settings), _snapshot(data) if version is None else version
+
+    def _take(self, everything=False):
+        now = time.monotonic()
+        due = [cv_id for cv_id, (_, first, last) in self._pending.items()
+               if everything or now - last >= self.delay or now - first >= self.max_delay]
+        return [self._pending.pop(cv_id)[0] for cv_id in due]
+
+    def _wait_time(self):
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        return max(0.0, min(min(last + self.delay, first + self.max_delay) - now
+                            for _, first, last in self._pending.values()))
+
+    def _write(self, saves):
+        try:
+            self.store.write_rows([cv_row(*save) for save in saves])
+        except Exception:
+            logger.exception("Autosave of %d CV(s) failed", len(saves))
+            now = time.monotonic()
+            with self._cond:
+                if self._closed:
+                    return
+                for save in saves:
+                    self._pending.setdefault(save[0], (save, now, now))
+
+    def _run(self):
+        while True:
+            with self._cond:
+                saves = self._take()
+                while not saves and not self._closed:
+                    self._cond.wait(self._wait_time())
+                    saves = self._take()
+                if self._closed and not saves:
+                    return
+            self._write(saves)
+
+    def flush(self):
+        """Write everything pending now."""
+        with self._cond:
+            saves = self._take(everything=True)
+        if saves:
+            self._write(saves)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self.flush()
@@ -0,0 +1,77 @@
+"""Layout presets, theme colors, fonts and the default ``cv_data``/``settings``.
+
+Pure data, no third-party imports: this is what every other module (and the
+CLI/worker startup path) imports first.
+"""
+
+# --- DEFAULTS ---
+def empty_cv_data():
+    return {
+        'personal_info': {
+            'nama': '', 'email': '', 'telepon': '', 'alamat': '',
+            'linkedin': '', 'github': '', 'website': '', 'posisi_target': '',
+            'foto': None
+        },
+        'ringkasan': '',
+        'pengalaman': [],
+        'pendidikan': [],
+        'keahlian': [],
+        'sertifikasi': [],
+        'proyek': [],
+        'bahasa': [],
+        'hobi': []
+    }
+
+DEFAULT_SETTINGS = {
+    'template_style': 'modern_sidebar',
+    'font_family': 'Helvetica',
+    'base_color': '#2563eb',
+    'accent_color': '#1e40af',
+    'font_size_body': 10,
+    'font_size_header': 24,
+    'section_spacing': 5,
+    'show_icons': True,
+    'theme': 'light',
+    'ats_friendly': True
+}
+
+# Allowed (min, max) of the numeric settings; font_size_body is the Design tab's slider range.
+SETTING_RANGES = {
+    'font_size_body': (8, 14),
+    'font_size_header': (16, 36),
+    'section_spacing': (0, 15),
+}
+
+def normalize_cv_data(data):
+    """Fill in any keys missing from an imported/partial ``cv_data`` dict."""
+    cv = empty_cv_data()
+    cv['personal_info'].update(data.get('personal_info') or {})
+    for key, value in data.items():
+        if key != 'personal_info' and key in cv and value is not None:
+            cv[key] = value
+    return cv
+
+# --- DATA TEMPLATES & PRESETS ---
+LAYOUTS = {
+    'modern_sidebar': {'name': 'Modern Sidebar', 'type': '2_column', 'ats_score': 85},
+    'classic_vertical': {'name': 'ATS Professional', 'type': '1_column', 'ats_score': 95},
+    'minimal_clean': {'name': 'Minimalist Clean', 'type': '1_column_compact', 'ats_score': 80},
+    'executive': {'name': 'Executive Style', 'type': '2_column', 'ats_score': 90},
+    'creative': {'name': 'Creative Portfolio', 'type': 'creative', 'ats_score': 70}
+}
+
+THEME_COLORS = {
+    'professional_blue': {'primary': '#1e40af', 'secondary': '#3b82f6'},
+    'corporate_gray': {'primary': '#374151', 'secondary': '#6b7280'},
+    'green_teal': {'primary': '#0f766e', 'secondary': '#14b8a6'},
+    'purple_premium': {'primary': '#7c3aed', 'secondary': '#a78bfa'},
+    'red_passion': {'primary': '#dc2626', 'secondary': '#ef4444'}
+}
+
+FONTS = {
+    'Helvetica': {'pdf': 'Helvetica', 'docx': 'Calibri'},
+    'Times': {'pdf': 'Times', 'docx': 'Times New Roman'},
+    'Arial': {'pdf': 'Arial', 'docx': 'Arial'},
+    'Georgia': {'pdf': 'Georgia', 'docx': 'Georgia'},
+    'Verdana': {'pdf': 'Verdana', 'docx': 'Verdana'}
+}
@@ -0,0 +1,66 @@
+"""Plain text export and the cover letter template."""
+from datetime import datetime
+
+# --- PLAIN TEXT ---
+def generate_plain_text(data):
+    return f"""
+CV - {data['personal_info']['nama']}
+============================================
+
+CONTACT INFORMATION
+-------------------
+Name: {data['personal_info']['nama']}
+Email: {data['personal_info']['email']}
+Phone: {data['personal_info']['telepon']}
+Location: {data['personal_info']['alamat']}
+LinkedIn: {data['personal_info']['linkedin']}
+
+PROFESSIONAL SUMMARY
+--------------------
+{data['ringkasan']}
+
+WORK EXPERIENCE
+---------------
+{chr(10).join([f'- {exp["posisi"]} at {exp["perusahaan"]} ({exp["periode"]})' for exp in data['pengalaman']])}
+
+EDUCATION
+---------
+{chr(10).join([f'- {edu["gelar"]} from {edu["institusi"]} ({edu["tahun"]})' for edu in data['pendidikan']])}
+
+SKILLS
+------
+{', '.join(data['keahlian'])}
+
+LANGUAGES
+---------
+{', '.join(data['bahasa'])}
+            """
+
+# --- COVER LETTER ---
+def generate_cover_letter(data, date=None):
+    date = date or datetime.now()
+    return f"""
+Date: {date.strftime('%B %d, %Y')}
+
+Hiring Manager
+[Company Name]
+[Company Address]
+
+Dear Hiring Manager,
+
+I am writing to express my interest in the [Position Name] position at [Company Name]. 
+With my background in [Your Field] and experience in [Key Skill], I believe I would be 
+a valuable addition to your team.
+
+In my previous role at [Previous Company], I [Achievement 1]. Additionally, I 
+[Achievement 2]. These experiences have equipped me with the skills necessary to 
+contribute effectively to [Company Name].
+
+I have attached my CV for your review and would welcome the opportunity to discuss 
+how my skills and experiences align with your needs.
+
+Sincerely,
+{data['personal_info']['nama']}
+{data['personal_info']['email']}
+{data['personal_info']['telepon']}
+"""
@@ -0,0 +1,279 @@
+"""DOCX backend (python-docx). Only imported when a Word file is actually requested."""
+import io
+import re
+from functools import lru_cache
+
+import docx
+from docx.shared import Inches, Mm, Pt, RGBColor
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from cvbuilder.layouts import get_plan, bind_sections, contact_items, display_name
+from cvbuilder.photo import photo_path
+
+# --- STYLE CACHE (value objects dibagi ke semua render di proses ini) ---
+@lru_cache(maxsize=None)
+def _pt(size):
+    return Pt(size)
+
+@lru_cache(maxsize=None)
+def _rgb(color):
+    return RGBColor(*color)
+
+@lru_cache(maxsize=256)
+def _style_name(size, color, bold, italic):
+    parts = [f"{size:g}pt" if size else None, 'Bold' if bold else None, 'Italic' if italic else None,
+             '%02X%02X%02X' % color if color else None]
+    return 'CV ' + ' '.join(p for p in parts if p)
+
+# Parts of python-docx's default template that a CV never uses.
+UNUSED_PARTS = ('http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects', RT.THUMBNAIL, RT.CUSTOM_XML)
+
+@lru_cache(maxsize=1)
+def _blank_docx():
+    """python-docx's default document with only the default styles and no unused parts, saved once per process.
+
+    The default template defines ~160 styles plus latent-style exceptions
+    (~350 KB of styles.xml) and ships a styles-with-effects copy and a
+    thumbnail; every export used to parse, copy and re-save all of it.
+    """
+    doc = docx.Document()
+    styles = doc.styles.element
+    for child in list(styles):
+        if child.tag == qn('w:latentStyles') or (child.tag == qn('w:style') and child.get(qn('w:default')) != '1'
+                                                 and child.get(qn('w:styleId')) != 'Normal'):
+            styles.remove(child)
+    for part in (doc.part, doc.part.package):
+        for rel_id, rel in list(part.rels.items()):
+            if rel.reltype in UNUSED_PARTS:
+                del part.rels[rel_id]
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+class DocStyles:
+    """Paragraph styles of one document, one per distinct text look (size, color, bold, italic).
+
+    Each look is defined once in the styles part. Paragraphs that have a
+    single look (name, titles, summaries, bullets) reference it and their runs
+    carry no formatting of their own.
+    """
+
+    def __init__(self, doc):
+        self._styles = doc.styles
+        self._normal = doc.styles['Normal']
+        self._by_look = {}
+
+    def paragraph(self, size=None, color=None, bold=False, italic=False):
+        look = (size, color, bool(bold), bool(italic))
+        style = self._by_look.get(look)
+        if style is None:
+            style = self._styles.add_style(_style_name(*look), WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = self._normal
+            font = style.font
+            if size:
+                font.size = _pt(size)
+            if color:
+                font.color.rgb = _rgb(color)
+            if bold:
+                font.bold = True
+            if italic:
+                font.italic = True
+            self._by_look[look] = style
+        return style
+
+# --- BASE DOCUMENT PER LAYOUT (dibangun sekali, dibuka ulang per render) ---
+def _looks(plan):
+    """Every text look a document for ``plan`` uses for whole paragraphs."""
+    header = plan.header
+    yield (header.name_size, plan.primary, True, False)
+    yield (header.position_size, plan.accent, False, True)
+    yield (10, None, False, False)
+    for column in plan.columns:
+        for section in column.sections:
+            yield (section.title_size, section.title_color, True, False)
+            if section.body_size != plan.body_size:
+                yield (section.body_size, None, False, False)
+
+@lru_cache(maxsize=32)
+def _base_docx(plan):
+    """``(bytes, style ids)`` of an empty document for ``plan``, built once per plan.
+
+    Page setup, core properties, the Normal font, every named style the
+    layout uses and (for multi-column layouts) the column table are already
+    in place; a render only opens it and inserts the data paragraphs.
+    """
+    doc = docx.Document(io.BytesIO(_blank_docx()))
+    doc.core_properties.author = "CV Builder Pro Ultra"
+    for section in doc.sections:
+        section.top_margin = Inches(0.5)
+        section.bottom_margin = Inches(0.5)
+        section.left_margin = Inches(0.5)
+        section.right_margin = Inches(0.5)
+
+    normal = doc.styles['Normal'].font
+    normal.name = plan.font_docx
+    normal.size = _pt(plan.body_size)
+
+    styles = DocStyles(doc)
+    style_ids = {look: styles.paragraph(*look).style_id for look in _looks(plan)}
+    entry_style = doc.styles.add_style('CV Entry', WD_STYLE_TYPE.PARAGRAPH)
+    entry_style.base_style = doc.styles['Normal']
+    entry_style.paragraph_format.space_after = _pt(6)
+    style_ids['entry'] = entry_style.style_id
+
+    if len(plan.columns) > 1:
+        table = doc.add_table(rows=1, cols=len(plan.columns))
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        table.autofit = False
+        for i, column in enumerate(plan.columns):
+            table.cell(0, i).width = Inches(column.width / 25.4)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue(), style_ids
+
+# --- DATA PARAGRAPHS (WordprocessingML langsung, tanpa proxy python-docx) ---
+W_P, W_PPR, W_PSTYLE, W_JC = qn('w:p'), qn('w:pPr'), qn('w:pStyle'), qn('w:jc')
+W_R, W_RPR, W_B, W_I, W_SZ = qn('w:r'), qn('w:rPr'), qn('w:b'), qn('w:i'), qn('w:sz')
+W_T, W_BR, W_TAB, W_VAL = qn('w:t'), qn('w:br'), qn('w:tab'), qn('w:val')
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+RUN_BREAKS = re.compile(r'([\t\r\n])')
+
+class _Writer:
+    """Appends paragraphs to a body or table cell as raw WordprocessingML, the markup python-docx would write.
+
+    ``anchor`` is the element new paragraphs go before (the body's section
+    properties or the column table); a fresh cell's empty paragraph is filled
+    first instead of leaving a blank line.
+    """
+
+    def __init__(self, parent, anchor=None, style_ids=None):
+        self._parent = parent
+        self._anchor = anchor
+        self._style_ids = style_ids
+        empty = parent.findall(W_P) if anchor is None else []
+        self._reuse = empty[0] if len(empty) == 1 and len(empty[0]) == 0 else None
+
+    def paragraph(self, style_id=None, align=None):
+        if self._reuse is not None:
+            p, self._reuse = self._reuse, None
+        else:
+            p = self._parent.makeelement(W_P, {})
+            if self._anchor is not None:
+                self._anchor.addprevious(p)
+            else:
+                self._parent.append(p)
+        if style_id or align:
+            ppr = etree.SubElement(p, W_PPR)
+            if style_id:
+                etree.SubElement(ppr, W_PSTYLE).set(W_VAL, style_id)
+            if align:
+                etree.SubElement(ppr, W_JC).set(W_VAL, align)
+        return p
+
+    def styled(self, text, size=None, color=None, bold=False, italic=False, align=None):
+        look = (size, color, bool(bold), bool(italic))
+        style_id = self._style_ids[look] if size or color or bold or italic else None
+        p = self.paragraph(style_id, align)
+        _run(p, text)
+        return p
+
+def _run(p, text, size=None, bold=False, italic=False):
+    r = etree.SubElement(p, W_R)
+    if size or bold or italic:
+        rpr = etree.SubElement(r, W_RPR)
+        if bold:
+            etree.SubElement(rpr, W_B)
+        if italic:
+            etree.SubElement(rpr, W_I)
+        if size:
+            etree.SubElement(rpr, W_SZ).set(W_VAL, str(int(round(size * 2))))
+    for piece in RUN_BREAKS.split(text):
+        if piece == '\t':
+            etree.SubElement(r, W_TAB)
+        elif piece in ('\r', '\n'):
+            etree.SubElement(r, W_BR)
+        elif piece:
+            t = etree.SubElement(r, W_T)
+            t.text = piece
+            if piece[0].isspace() or piece[-1].isspace():
+                t.set(XML_SPACE, 'preserve')
+    return r
+
+def _add_header(doc, writer, plan, info):
+    header = plan.header
+    align = 'center' if header.kind in ('banner', 'centered') else None
+
+    path = photo_path(info) if header.photo else None
+    if path:
+        photo = Paragraph(writer.paragraph(align='right'), doc._body)
+        photo.add_run().add_picture(path, width=Mm(header.photo.width))
+
+    writer.styled(display_name(plan, info), header.name_size, plan.primary, bold=True, align=align)
+
+    if info['posisi_target']:
+        writer.styled(info['posisi_target'], header.position_size, plan.accent, italic=True, align=align)
+
+    contacts = contact_items(plan, info)
+    if contacts or header.contact_placeholder:
+        separator = "   " if header.kind == 'hero' else " | "
+        writer.styled(separator.join(contacts) if contacts else header.contact_placeholder, 10, align=align)
+
+    writer.paragraph()
+
+def _add_section(writer, plan, bound, entry_style):
+    section = bound.plan
+    body_size = section.body_size if section.body_size != plan.body_size else None
+
+    writer.styled(section.title, section.title_size, section.title_color, bold=True)
+
+    if section.kind == 'text':
+        writer.styled(bound.entries[0].body, body_size)
+
+    elif section.kind == 'list':
+        if section.style == 'bullets':
+            for entry in bound.entries:
+                writer.styled(f"• {entry.body}", body_size)
+        else:
+            writer.styled(section.joiner.join(e.body for e in bound.entries), body_size)
+
+    else:
+        # Mixed runs: bold/italic stay direct (<w:b/> is shorter than any style reference).
+        for entry in bound.entries:
+            p = writer.paragraph(entry_style)
+            _run(p, f"{entry.title}\n", bold=True)
+            _run(p, entry.meta + ("\n" if entry.body is not None else ""), italic=True)
+            if entry.body is not None:
+                _run(p, entry.body, body_size)
+
+# --- WORD DOCX GENERATOR ---
+def generate_word_doc(data, settings):
+    plan = get_plan(settings)
+    base, style_ids = _base_docx(plan)
+
+    doc = docx.Document(io.BytesIO(base))
+    doc.core_properties.title = f"CV - {data['personal_info']['nama']}"
+
+    body = doc.element.body
+    table = body.find(qn('w:tbl'))
+    anchor = table if table is not None else body.find(qn('w:sectPr'))
+    _add_header(doc, _Writer(body, anchor, style_ids), plan, data['personal_info'])
+
+    if table is None:
+        writers = [_Writer(body, anchor, style_ids)]
+    else:
+        writers = [_Writer(tc, style_ids=style_ids) for tc in table.iter(qn('w:tc'))]
+
+    for writer, bound_sections in zip(writers, bind_sections(plan, data)):
+        for bound in bound_sections:
+            _add_section(writer, plan, bound, style_ids['entry'])
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,54 @@
+from cvbuilder.analysis import AnalysisCache, analysis_key, analyze, calculate_ats_score, get_ai_suggestions
+from cvbuilder.templates import empty_cv_data
+
+
+def full_cv():
+    data = empty_cv_data()
+    data['personal_info'].update(nama='Rina', email='rina@example.com', posisi_target='Data Engineer')
+    data['ringkasan'] = 'Developed and managed pipelines, achieved targets and increased revenue; reduced costs by 30%.'
+    data['pengalaman'] = [{'posisi': 'Engineer', 'deskripsi': 'Built things quickly'} for _ in range(3)]
+    data['pendidikan'] = [{'institusi': 'ITB'}]
+    data['keahlian'] = [f'skill{i}' for i in range(10)]
+    return data
+
+
+def test_empty_cv():
+    result = analyze(empty_cv_data())
+    assert result.score == 0 and result.completion == 0
+    assert len(result.suggestions) == 4
+    assert not any(done for _, done in result.checklist)
+    assert result.word_counts == (0, 0, 0)
+
+
+def test_complete_cv():
+    result = analyze(full_cv())
+    assert result.score == 100 and result.completion == 100
+    assert result.suggestions == ()
+    assert all(done for _, done in result.checklist)
+    assert result.keyword_hits == ('managed', 'developed', 'increased', 'reduced', 'achieved')
+    assert result.word_counts == (13, 9, 22)
+    assert calculate_ats_score(full_cv()) == 100
+    assert get_ai_suggestions(full_cv()) == []
+
+
+def test_key_covers_only_the_fields_read():
+    data = full_cv()
+    key = analysis_key(data)
+    data['personal_info']['telepon'] = '0812'
+    data['pengalaman'][0]['posisi'] = 'Lead'
+    data['keahlian'][0] = 'renamed'
+    assert analysis_key(data) == key
+    data['pengalaman'][0]['deskripsi'] = 'changed'
+    assert analysis_key(data) != key
+
+
+def test_cache_reuses_results_and_is_bounded():
+    cache = AnalysisCache(max_entries=2)
+    first = cache.get(full_cv())
+    assert cache.get(full_cv()) is first
+    for name in ('a', 'b'):
+        data = full_cv()
+        data['personal_info']['nama'] = name
+        cache.get(data)
+    assert len(cache) == 2
+    assert cache.get(full_cv()) is not first
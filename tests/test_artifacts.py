@@ -0,0 +1,83 @@
+import io
+import os
+import threading
+import time
+
+from cvbuilder.artifacts import ArtifactCache
+from cvbuilder.cache import RenderCache, render_key
+
+KEY = 'ab' + '0' * 62
+
+
+def test_put_and_read_back(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    assert cache.get_artifact(KEY) is None
+    cache.put_artifact(KEY, 'pdf', b'PDF')
+    assert cache.get_artifact(KEY) == b'PDF'
+    with cache.view(KEY) as view:
+        assert bytes(view) == b'PDF'
+    cache.put_artifact(KEY, 'pdf', b'')
+    assert cache.get_artifact(KEY) == b''
+    assert not [name for name in os.listdir(os.path.dirname(cache.path(KEY))) if name.endswith('.tmp')]
+
+
+def test_get_or_render_renders_once(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    calls = []
+
+    def render():
+        calls.append(1)
+        return io.BytesIO(b'DOCX')
+
+    assert cache.get_or_render(KEY, 'docx', render) == b'DOCX'
+    # A second process pointing at the same directory reuses the file.
+    assert ArtifactCache(str(tmp_path)).get_or_render(KEY, 'docx', render) == b'DOCX'
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_render_once(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    calls = []
+
+    def render():
+        calls.append(1)
+        time.sleep(0.05)
+        return b'PDF'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_render(KEY, 'pdf', render)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b'PDF'] * 4 and len(calls) == 1
+    assert cache.stats()['renders'] == 1
+
+
+def test_prune_removes_least_recently_read(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=10)
+    keys = [f'{i:02x}' + '0' * 62 for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put_artifact(key, 'pdf', b'12345')
+        os.utime(cache.path(key), (1000 + age, 1000 + age))
+    os.utime(cache.path(keys[0]), (2000, 1000))  # read most recently
+    assert cache.prune() == 1
+    assert cache.get_artifact(keys[1]) is None
+    assert cache.get_artifact(keys[0]) == b'12345' and cache.get_artifact(keys[2]) == b'12345'
+    assert cache.stats()['bytes'] == 10
+
+
+def test_render_cache_reads_the_shared_file_once(tmp_path):
+    backing = ArtifactCache(str(tmp_path))
+    data, settings = {'nama': 'Rina'}, {}
+    backing.put_artifact(render_key('pdf', data, settings), 'pdf', b'PDF')
+    reads = []
+    get_artifact = backing.get_artifact
+    backing.get_artifact = lambda key: reads.append(key) or get_artifact(key)
+
+    cache = RenderCache(backing=backing)
+    assert cache.get_or_render('pdf', data, settings, lambda d, s: b'rendered') == b'PDF'
+    assert len(reads) == 1 and cache.backing_hits == 1
+    assert cache.get_or_render('pdf', data, settings, lambda d, s: b'rendered') == b'PDF'
+    assert len(reads) == 1
@@ -0,0 +1,90 @@
+import csv
+import json
+
+import pytest
+
+from cvbuilder.bulk import ImportedCV, RowError, import_records, resolve_mapping
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content if isinstance(content, bytes) else content.encode('utf-8'))
+    return str(path)
+
+
+def test_columns_are_matched_by_alias():
+    assert resolve_mapping(['Full Name', 'E-Mail', 'Job_Title', 'Notes']) == {
+        'nama': 'Full Name', 'email': 'E-Mail', 'posisi_target': 'Job_Title'}
+
+
+def test_explicit_mapping_is_checked():
+    assert resolve_mapping(['Kandidat'], {'nama': 'Kandidat'}) == {'nama': 'Kandidat'}
+    with pytest.raises(ValueError, match='unknown field'):
+        resolve_mapping(['Kandidat'], {'name': 'Kandidat'})
+    with pytest.raises(ValueError, match='not in the file'):
+        resolve_mapping(['Kandidat'], {'nama': 'Candidate'})
+
+
+def test_csv_rows(tmp_path):
+    path = write(tmp_path, 'cvs.csv', '﻿Name,Email,Skills,Summary\n'
+                                      'Rina Kusuma,rina@example.com,"Python, SQL ,",Data "engineer"\n'
+                                      ',nobody@example.com,,\n'
+                                      '"Budi\nSantoso",budi@example.com,Go,\n')
+    rows = list(import_records(path, settings={'theme': 'dark'}))
+    assert [type(row) for row in rows] == [ImportedCV, RowError, ImportedCV]
+    assert rows[0].data['personal_info']['nama'] == 'Rina Kusuma'
+    assert rows[0].data['keahlian'] == ['Python', 'SQL']
+    assert rows[0].settings == {'theme': 'dark'}
+    assert rows[1] == RowError(3, 'nama: required', {'Name': '', 'Email': 'nobody@example.com', 'Skills': '',
+                                                     'Summary': ''})
+    # A row is reported by the line it starts on.
+    assert rows[2].line == 4 and rows[2].data['personal_info']['nama'] == 'Budi\nSantoso'
+
+
+def test_jsonl_rows(tmp_path):
+    backup = {'schema': 2, 'cv_data': {'personal_info': {'nama': 'Budi'}}, 'settings': {'template_style': 'creative'}}
+    path = write(tmp_path, 'cvs.jsonl', '\n'.join([
+        json.dumps({'name': 'Rina', 'languages': 'Indonesia, English'}),
+        '',
+        '{broken',
+        json.dumps(backup),
+        json.dumps([1, 2]),
+        json.dumps({'name': 'Sari', 'summary': 5}),
+    ]))
+    rows = list(import_records(path, settings={'template_style': 'modern'}))
+    assert rows[0].line == 1 and rows[0].data['bahasa'] == ['Indonesia', 'English']
+    assert rows[1].line == 3 and 'not valid JSON' in rows[1].error
+    assert rows[2].settings == {'template_style': 'creative'}
+    assert rows[3] == RowError(5, 'expected an object', [1, 2])
+    assert rows[4].line == 6 and 'ringkasan: expected a string' in rows[4].error
+
+
+def test_undecodable_rows_are_skipped(tmp_path):
+    path = write(tmp_path, 'cvs.csv', b'name,email\nRina,rina@example.com\nJos\xe9,jose@example.com\nBudi,b@x.com\n')
+    rows = list(import_records(path))
+    assert [row.line for row in rows] == [2, 3, 4]
+    assert rows[1] == RowError(3, 'not valid UTF-8', {'name': 'Jos�', 'email': 'jose@example.com'})
+    assert rows[2].data['personal_info']['nama'] == 'Budi'
+
+    path = write(tmp_path, 'cvs.jsonl', b'{"name": "Jos\xe9"}\n{"name": "Budi"}\n')
+    rows = list(import_records(path))
+    assert rows[0] == RowError(1, 'not valid UTF-8', '{"name": "Jos�"}')
+    assert isinstance(rows[1], ImportedCV)
+
+
+def test_csv_errors_cost_one_row(tmp_path):
+    huge = 'x' * (csv.field_size_limit() + 1)
+    path = write(tmp_path, 'cvs.csv', f'name,ringkasan\nRina,ok\nBudi,{huge}\nSari,ok\n')
+    rows = list(import_records(path))
+    assert isinstance(rows[1], RowError) and rows[1].line == 3 and 'unreadable CSV row' in rows[1].error
+    assert [row.data['personal_info']['nama'] for row in (rows[0], rows[2])] == ['Rina', 'Sari']
+
+
+def test_unreadable_header(tmp_path):
+    with pytest.raises(ValueError, match='not valid UTF-8'):
+        list(import_records(write(tmp_path, 'cvs.csv', b'n\xe4me\nRina\n')))
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match='unknown import format'):
+        list(import_records('cvs.xlsx', fmt='xlsx'))
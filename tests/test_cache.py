@@ -0,0 +1,74 @@
+import io
+
+from cvbuilder.cache import RenderCache, render_key
+
+
+class Backing:
+    """Store-like backing: get_artifact/put_artifact only."""
+
+    def __init__(self):
+        self.artifacts = {}
+
+    def get_artifact(self, key):
+        return self.artifacts.get(key)
+
+    def put_artifact(self, key, kind, value):
+        self.artifacts[key] = value
+
+
+class Renderer:
+    def __init__(self, value=b'PDF'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self, data, settings):
+        self.calls += 1
+        return self.value
+
+
+def test_key_ignores_insertion_order():
+    a = render_key('pdf', {'nama': 'Rina', 'email': 'r@x.com'}, {'theme': 'dark', 'font_size_body': 10})
+    b = render_key('pdf', {'email': 'r@x.com', 'nama': 'Rina'}, {'font_size_body': 10, 'theme': 'dark'})
+    assert a == b
+    assert a != render_key('docx', {'nama': 'Rina', 'email': 'r@x.com'}, {'theme': 'dark', 'font_size_body': 10})
+    assert a != render_key('pdf', {'nama': 'Rina', 'email': 'r@x.org'}, {'theme': 'dark', 'font_size_body': 10})
+
+
+def test_renders_once_per_content():
+    cache, render = RenderCache(), Renderer()
+    assert cache.get_or_render('pdf', {'a': 1}, {}, render) == b'PDF'
+    assert cache.get_or_render('pdf', {'a': 1}, {}, render) == b'PDF'
+    assert render.calls == 1
+    cache.get_or_render('pdf', {'a': 2}, {}, render)
+    assert render.calls == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_file_like_results_are_stored_as_bytes():
+    cache = RenderCache()
+    value = cache.get_or_render('docx', {}, {}, lambda data, settings: io.BytesIO(b'DOCX'))
+    assert value == b'DOCX'
+    assert cache.get(render_key('docx', {}, {})) == b'DOCX'
+
+
+def test_bounded_by_entries_and_bytes():
+    cache = RenderCache(max_entries=2, max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    cache.get('a')
+    cache.put('c', b'1234')
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    cache.put('d', b'123456789')
+    assert list(cache._entries) == ['d']
+    assert cache.size == 9
+    cache.put('huge', b'x' * 11)
+    assert 'huge' not in cache
+
+
+def test_backing_store_survives_a_new_cache():
+    backing, render = Backing(), Renderer()
+    RenderCache(backing=backing).get_or_render('pdf', {'a': 1}, {}, render)
+    cache = RenderCache(backing=backing)
+    assert cache.get_or_render('pdf', {'a': 1}, {}, render) == b'PDF'
+    assert render.calls == 1
+    assert cache.backing_hits == 1
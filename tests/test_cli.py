@@ -0,0 +1,77 @@
+import csv
+import os
+
+import pytest
+
+from cvbuilder import cli
+
+render_record = cli.render_record
+
+
+def crash_on_line_3(task):
+    if task[0] == 3:
+        os._exit(1)
+    return render_record(task)
+
+
+def crash_always(task):
+    os._exit(1)
+
+
+def run(tmp_path, *extra, count=6):
+    rows = ['name,email'] + [f'Candidate {i},c{i}@example.com' for i in range(2, count + 2)]
+    (tmp_path / 'cvs.csv').write_text('\n'.join(rows) + '\n', encoding='utf-8')
+    return cli.main(['import', '--in', str(tmp_path / 'cvs.csv'), '--out', str(tmp_path / 'out'),
+                     '--formats', 'json', '--quiet', *extra])
+
+
+def outputs(tmp_path):
+    return sorted(path.name for path in (tmp_path / 'out').iterdir())
+
+
+def test_import_renders_every_row(tmp_path):
+    assert run(tmp_path, '--jobs', '1') == 0
+    assert outputs(tmp_path) == [f'{line:06d}_Candidate_{line}.json' for line in range(2, 8)]
+
+
+def test_invalid_rows_go_to_the_errors_file(tmp_path):
+    (tmp_path / 'cvs.csv').write_bytes(b'name,email\nRina,r@x.com\n,nobody@x.com\nJos\xe9,j@x.com\n')
+    errors = tmp_path / 'bad.csv'
+    assert cli.main(['import', '--in', str(tmp_path / 'cvs.csv'), '--out', str(tmp_path / 'out'), '--formats', 'json',
+                     '--jobs', '1', '--errors', str(errors), '--quiet']) == 1
+    assert outputs(tmp_path) == ['000002_Rina.json']
+    with open(errors, encoding='utf-8', newline='') as f:
+        assert [row[:2] for row in csv.reader(f)] == [['line', 'error'], ['3', 'nama: required'],
+                                                      ['4', 'not valid UTF-8']]
+
+
+def test_unknown_template_is_refused_before_starting(tmp_path, capsys):
+    with pytest.raises(SystemExit) as info:
+        run(tmp_path, '--template', 'nope')
+    assert info.value.code == 2
+    assert "invalid choice: 'nope'" in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
+
+
+def test_bad_settings_file_is_refused_before_starting(tmp_path, capsys):
+    (tmp_path / 'settings.json').write_text('{"font_family": "Comic Sans"}', encoding='utf-8')
+    assert run(tmp_path, '--settings', str(tmp_path / 'settings.json')) == 2
+    assert 'settings.font_family: expected one of' in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
+
+
+@pytest.mark.skipif('fork' not in cli.multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_pool_is_restarted_when_a_worker_dies(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, 'render_record', crash_on_line_3)
+    assert run(tmp_path, '--jobs', '2', count=40) == 1
+    err = capsys.readouterr().err
+    assert '[FAIL] line 3: worker process died' in err and 'restarting the pool (1/3)' in err
+    # Rows after the crash are still rendered.
+    assert '000041_Candidate_41.json' in outputs(tmp_path)
+
+
+@pytest.mark.skipif('fork' not in cli.multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_import_stops_when_workers_keep_dying(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(cli, 'render_record', crash_always)
+    assert run(tmp_path, '--jobs', '2', count=100) == 2
+    assert f'stopped after {cli.MAX_POOL_RESTARTS} restarts' in capsys.readouterr().err
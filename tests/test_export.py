@@ -0,0 +1,165 @@
+import io
+import sys
+import threading
+from concurrent.futures import BrokenExecutor, ThreadPoolExecutor
+
+import pytest
+
+from cvbuilder.cache import RenderCache
+from cvbuilder.export import (BATCH, FAILED, PENDING, READY, ExportJob, ExportQueue, QueueFull, get_export_job,
+                              process_pool, queued)
+from cvbuilder.serialize import loads
+from cvbuilder.templates import empty_cv_data
+
+
+class Renderer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, data, settings):
+        self.calls.append(data['nama'])
+        return io.BytesIO(('PDF ' + data['nama']).encode())
+
+
+def test_job_renders_only_when_called_and_once():
+    render = Renderer()
+    job = ExportJob('pdf', {'nama': 'Rina'}, {}, render)
+    assert job.status == PENDING and render.calls == []
+    assert job() == b'PDF Rina'
+    assert job() == b'PDF Rina'
+    assert job.status == READY and render.calls == ['Rina']
+
+
+def test_job_snapshots_its_input():
+    data = {'nama': 'Rina'}
+    job = ExportJob('pdf', data, {}, Renderer())
+    data['nama'] = 'edited'
+    assert job() == b'PDF Rina'
+    assert not job.matches(data, {})
+
+
+def test_failed_job_can_be_retried():
+    def broken(data, settings):
+        raise RuntimeError('boom')
+
+    job = ExportJob('pdf', {'nama': 'Rina'}, {}, broken)
+    with pytest.raises(RuntimeError):
+        job()
+    assert job.status == FAILED and str(job.error) == 'boom'
+    assert job(Renderer()) == b'PDF Rina'
+    assert job.status == READY and job.error is None
+
+
+def test_get_export_job_replaces_stale_jobs():
+    jobs, render = {}, Renderer()
+    job = get_export_job(jobs, 'pdf', {'nama': 'Rina'}, {}, render)
+    assert get_export_job(jobs, 'pdf', {'nama': 'Rina'}, {}, render) is job
+    assert get_export_job(jobs, 'pdf', {'nama': 'Rina'}, {'theme': 'dark'}, render) is not job
+    assert get_export_job(jobs, 'docx', {'nama': 'Rina'}, {}, render) is jobs['docx']
+    assert set(jobs) == {'pdf', 'docx'}
+
+
+def test_jobs_share_the_render_cache():
+    cache, render = RenderCache(), Renderer()
+    ExportJob('pdf', {'nama': 'Rina'}, {}, render, cache)()
+    assert ExportJob('pdf', {'nama': 'Rina'}, {}, render, cache)() == b'PDF Rina'
+    assert render.calls == ['Rina']
+
+
+class Gate:
+    """Jobs that block until released, recording the order they started in."""
+
+    def __init__(self):
+        self.started = []
+        self.release = threading.Event()
+
+    def __call__(self, name):
+        self.started.append(name)
+        assert self.release.wait(5)
+        return name
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def test_queue_runs_interactive_before_batch(pool):
+    gate = Gate()
+    queue = ExportQueue(pool, workers=1, per_session=2)
+    first = queue.submit('a', gate, 'first')
+    futures = [queue.submit('a', gate, 'package', priority=BATCH), queue.submit('b', gate, 'download')]
+    gate.release.set()
+    assert [f.result(5) for f in [first] + futures] == ['first', 'package', 'download']
+    assert gate.started == ['first', 'download', 'package']
+    assert queue.stats()['completed'] == 3
+
+
+def test_package_formats_run_side_by_side(pool):
+    queue = ExportQueue(pool, workers=2, per_session=2)
+    both = threading.Barrier(2, timeout=5)
+    futures = [queue.submit('a', both.wait, priority=BATCH) for _ in range(2)]
+    assert sorted(f.result(5) for f in futures) == [0, 1]
+
+
+def test_per_session_limit_does_not_block_others(pool):
+    gate = Gate()
+    queue = ExportQueue(pool, workers=2, per_session=1)
+    queue.submit('a', gate, 'a1')
+    waiting = queue.submit('a', gate, 'a2')
+    other = queue.submit('b', gate, 'b1')
+    assert queue.stats()['sessions_running'] == 2
+    gate.release.set()
+    assert other.result(5) == 'b1' and waiting.result(5) == 'a2'
+    assert gate.started.index('b1') < gate.started.index('a2')
+
+
+def test_queue_full_and_cancel(pool):
+    gate = Gate()
+    queue = ExportQueue(pool, workers=1, max_pending=2)
+    running = queue.submit('a', gate, 'running')
+    # Batch jobs are refused at half the queue depth.
+    batch = queue.submit('b', gate, 'batch', priority=BATCH)
+    with pytest.raises(QueueFull):
+        queue.submit('b', gate, 'batch', priority=BATCH)
+    queued_job = queue.submit('b', gate, 'queued')
+    assert queue.cancel_session('b') == 2
+    assert queued_job.cancelled() and batch.cancelled()
+    gate.release.set()
+    assert running.result(5) == 'running'
+    stats = queue.stats()
+    assert stats['rejected'] == 1 and stats['cancelled'] == 2
+
+
+def test_jobs_of_gone_sessions_are_dropped(pool):
+    gate = Gate()
+    alive = {'a', 'b'}
+    queue = ExportQueue(pool, workers=1, is_alive=lambda session: session in alive)
+    first = queue.submit('a', gate, 'a')
+    gone = queue.submit('b', gate, 'b')
+    alive.discard('b')
+    gate.release.set()
+    assert first.result(5) == 'a'
+    assert queue.stats()['queued_interactive'] == 0
+    assert gone.cancelled() and gate.started == ['a']
+
+
+def test_queued_renderer_falls_back_when_the_pool_is_broken():
+    class Broken:
+        def submit(self, fn, *args):
+            raise BrokenExecutor('gone')
+
+    render = queued(ExportQueue(Broken(), workers=1), 'json', 'a')
+    assert render.__name__ == 'render_json'
+    assert loads(render(empty_cv_data(), {}))[0] == empty_cv_data()
+
+
+def test_process_pool_keeps_main():
+    main = sys.modules['__main__']
+    pool = process_pool(1)
+    try:
+        assert sys.modules['__main__'] is main
+        assert pool.submit(abs, -3).result(30) == 3
+    finally:
+        pool.shutdown()
@@ -0,0 +1,107 @@
+import logging
+import os
+
+import pytest
+
+from cvbuilder import fonts
+from cvbuilder.fonts import FONT_DIR, GlyphSubset, char_widths, load_metrics, pdf_font, pdf_text, subset
+from cvbuilder.render import render
+from cvbuilder.templates import DEFAULT_SETTINGS, FONTS, empty_cv_data
+
+DEJAVU = os.path.join(FONT_DIR, 'DejaVuSans.ttf')
+DEJAVU_BOLD = os.path.join(FONT_DIR, 'DejaVuSans-Bold.ttf')
+
+
+@pytest.fixture
+def font_dirs(monkeypatch):
+    """Look for fonts only in the given directories (not the host's), with the lookups uncached."""
+    dirs = []
+    monkeypatch.setattr(fonts, 'font_dirs', lambda: dirs)
+    fonts.font_index.cache_clear()
+    pdf_font.cache_clear()
+    yield dirs
+    fonts.font_index.cache_clear()
+    pdf_font.cache_clear()
+
+
+@pytest.mark.parametrize('family', [entry['pdf'] for entry in FONTS.values()])
+def test_every_family_falls_back_to_bundled_dejavu(font_dirs, family):
+    font_dirs.append(FONT_DIR)
+    font = pdf_font(family)
+    assert font.family == family.lower() + '-ttf'
+    # No italics bundled: italic styles are drawn with the upright files.
+    assert font.files == {'': DEJAVU, 'B': DEJAVU_BOLD, 'I': DEJAVU, 'BI': DEJAVU_BOLD}
+
+
+def test_earlier_directories_and_better_files_win(font_dirs, tmp_path):
+    (tmp_path / 'Liberation Sans-Regular.ttf').write_bytes(b'')
+    font_dirs.extend([FONT_DIR, str(tmp_path)])
+    assert pdf_font('Helvetica').files[''] == str(tmp_path / 'Liberation Sans-Regular.ttf')
+    assert pdf_font('Verdana').files[''] == DEJAVU
+
+
+def test_core_font_fallback_warns(font_dirs, tmp_path, caplog):
+    font_dirs.append(str(tmp_path))
+    with caplog.at_level(logging.WARNING, logger='cvbuilder.fonts'):
+        font = pdf_font('Georgia')
+    assert font == fonts.PdfFont('Times', None)
+    assert "No TrueType font found for 'Georgia'" in caplog.text
+    # WinAnsi bytes as fpdf takes them: "•" is 0x95, "Ğ", "ş" and "✉" are dropped.
+    assert pdf_text(' Ğüneş • café ✉ ', 'Georgia') == 'üne \x95 café'
+
+
+def test_pdf_text_keeps_glyphs_the_font_has(font_dirs):
+    font_dirs.append(FONT_DIR)
+    assert pdf_text(' Ğüneş → ✉ 🚀 ', 'Helvetica') == 'Ğüneş → ✉'
+    assert pdf_text(42, 'Helvetica') == '42'
+
+
+def test_metrics_are_cached_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv('CVBUILDER_FONT_CACHE', str(tmp_path))
+    fonts._metrics.cache_clear()
+    metrics = load_metrics(DEJAVU)
+    assert len(list(tmp_path.glob('*.metrics'))) == 1
+
+    fonts._metrics.cache_clear()
+    monkeypatch.setattr(fonts, '_parse', lambda path: pytest.fail("parsed again"))
+    cached = load_metrics(DEJAVU)
+    fonts._metrics.cache_clear()
+    assert cached == metrics and cached['cw'][ord('A')] > 0
+
+
+def test_char_widths(font_dirs):
+    font_dirs.append(FONT_DIR)
+    widths = char_widths('Helvetica')
+    assert widths['A'] == load_metrics(DEJAVU)['cw'][ord('A')] > 0
+    assert char_widths('Helvetica', 'B')['A'] > widths['A']
+    # Combining marks are zero width, not fpdf's 65535.
+    assert widths['\u0301'] == 0
+
+
+def test_subsets_are_cached_per_glyph_set():
+    cw = load_metrics(DEJAVU)['cw']
+    codes = frozenset(map(ord, 'Rina'))
+    embedded = subset(DEJAVU, codes, cw)
+    assert subset(DEJAVU, frozenset(map(ord, 'aniR')), cw) is embedded
+    other = subset(DEJAVU, codes | {ord('→')}, cw)
+    assert other.tag != embedded.tag and other.length > embedded.length
+
+
+def test_glyph_subset_keeps_each_code_once():
+    codes = GlyphSubset()
+    for char in 'banana':
+        codes.append(ord(char))
+    assert list(codes) == [ord('b'), ord('a'), ord('n')]
+
+
+def test_unicode_survives_the_rendered_pdf():
+    pymupdf = pytest.importorskip('pymupdf')
+    data = empty_cv_data()
+    data['personal_info']['nama'] = 'Ğüneş Yılmaz'
+    data['ringkasan'] = 'Membangun pipeline data → Kafka'
+    pdf = render('pdf', data, dict(DEFAULT_SETTINGS))
+    pdf = pdf.getvalue() if hasattr(pdf, 'getvalue') else pdf
+    with pymupdf.open(stream=pdf, filetype='pdf') as document:
+        text = ''.join(page.get_text() for page in document)
+    assert 'Ğüneş' in text or 'ĞÜNEŞ' in text
+    assert 'pipeline data → Kafka' in text
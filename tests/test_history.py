@@ -0,0 +1,182 @@
+import copy
+
+import pytest
+
+from cvbuilder.history import ADD, REMOVE, REPLACE, EditHistory, Op, apply, diff, invert
+from cvbuilder.templates import empty_cv_data
+
+
+def cv(*positions):
+    data = empty_cv_data()
+    data['personal_info']['nama'] = 'Rina'
+    data['pengalaman'] = [{'posisi': p, 'perusahaan': 'Acme'} for p in positions]
+    data['keahlian'] = ['Python', 'SQL']
+    return data
+
+
+def test_diff_of_equal_documents_is_empty():
+    assert diff(cv('A', 'B'), cv('A', 'B')) == []
+
+
+def test_replace_keeps_old_value():
+    old, new = cv('A'), cv('A')
+    new['personal_info']['nama'] = 'Budi'
+    assert diff(old, new) == [Op(REPLACE, ('personal_info', 'nama'), 'Rina', 'Budi')]
+
+
+def test_list_insert_and_delete_are_one_op():
+    assert diff(cv('A', 'C'), cv('A', 'B', 'C')) == [
+        Op(ADD, ('pengalaman', 1), None, {'posisi': 'B', 'perusahaan': 'Acme'})]
+    assert diff(cv('A', 'B', 'C'), cv('A', 'C')) == [
+        Op(REMOVE, ('pengalaman', 1), {'posisi': 'B', 'perusahaan': 'Acme'}, None)]
+
+
+def test_keys_added_and_removed():
+    old, new = {'a': 1, 'b': 2}, {'b': 2, 'c': 3}
+    assert diff(old, new) == [Op(REMOVE, ('a',), 1, None), Op(ADD, ('c',), None, 3)]
+
+
+@pytest.mark.parametrize('old, new', [
+    (cv('A', 'B', 'C'), cv('C', 'A')),
+    (cv(), cv('A', 'B')),
+    (cv('A', 'B'), cv()),
+    ({'x': [1, [2, 3], {'y': 'z'}]}, {'x': [[2], {'y': 'w', 'v': None}], 'u': 'new'}),
+    ({'x': 'text'}, {'x': ['now', 'a', 'list']}),
+])
+def test_apply_and_invert_round_trip(old, new):
+    ops = diff(old, new)
+    doc = copy.deepcopy(old)
+    apply(doc, ops)
+    assert doc == new
+    apply(doc, invert(ops))
+    assert doc == old
+
+
+def test_ops_are_not_aliased():
+    old, new = cv('A'), cv('A', 'B')
+    ops = diff(old, new)
+    new['pengalaman'][1]['posisi'] = 'changed later'
+    doc = copy.deepcopy(old)
+    apply(doc, ops)
+    doc['pengalaman'][1]['posisi'] = 'changed again'
+    assert ops[0].new['posisi'] == 'B'
+
+
+def test_apply_refuses_root():
+    with pytest.raises(ValueError):
+        apply({}, [Op(REPLACE, (), {}, {'a': 1})])
+
+
+def test_undo_redo():
+    data = cv('A')
+    history = EditHistory(data, coalesce=0)
+    data['pengalaman'].append({'posisi': 'B', 'perusahaan': 'Acme'})
+    assert history.record(data)
+    data['personal_info']['nama'] = 'Budi'
+    assert history.record(data)
+    assert not history.record(data)
+    assert len(history) == 2
+
+    assert history.undo(data)
+    assert data == cv('A', 'B')
+    assert history.undo(data)
+    assert data == cv('A')
+    assert not history.undo(data)
+    assert history.redo(data) and history.redo(data)
+    assert data['personal_info']['nama'] == 'Budi' and len(data['pengalaman']) == 2
+    assert not history.redo(data)
+
+
+def test_new_edit_clears_redo():
+    data = cv('A')
+    history = EditHistory(data, coalesce=0)
+    data['personal_info']['nama'] = 'Budi'
+    history.record(data)
+    history.undo(data)
+    data['keahlian'].append('Go')
+    assert not history.redo(data)
+    assert not history.can_redo
+    assert data['personal_info']['nama'] == 'Rina'
+
+
+def test_typing_in_one_field_coalesces():
+    data = cv('A')
+    history = EditHistory(data, coalesce=60)
+    for name in ('B', 'Bu', 'Bud', 'Budi'):
+        data['personal_info']['nama'] = name
+        history.record(data)
+    assert len(history) == 1
+    history.undo(data)
+    assert data['personal_info']['nama'] == 'Rina'
+
+
+def test_history_is_bounded():
+    data = cv()
+    history = EditHistory(data, max_steps=3, coalesce=0)
+    for i in range(10):
+        data['keahlian'].append(str(i))
+        history.record(data)
+    assert len(history) == 3
+    while history.undo(data):
+        pass
+    assert data['keahlian'] == ['Python', 'SQL'] + [str(i) for i in range(7)]
+
+
+def test_version_changes_with_every_step():
+    data = cv('A')
+    history, other = EditHistory(data), EditHistory(data)
+    versions = [other.version, history.version]
+    data['personal_info']['nama'] = 'Budi'
+    history.record(data)
+    versions.append(history.version)
+    history.undo(data)
+    versions.append(history.version)
+    history.redo(data)
+    versions.append(history.version)
+    assert len(set(versions)) == len(versions)
+    assert not history.record(data)
+    assert history.version == versions[-1]
+
+
+def edits(history, data, count):
+    for i in range(count):
+        data['keahlian'].append(str(i))
+        history.record(data)
+
+
+def test_checkpoints_every_n_steps():
+    data = cv()
+    history = EditHistory(data, coalesce=0, checkpoint_every=10)
+    edits(history, data, 35)
+    assert [i for i, step in enumerate(history._undo) if step.checkpoint is not None] == [9, 19, 29]
+    assert history._rebuild() == data
+
+
+def test_rebuild_after_eviction():
+    data = cv()
+    history = EditHistory(data, max_steps=15, coalesce=0, checkpoint_every=10)
+    edits(history, data, 47)
+    assert len(history) == 15
+    assert history._base['keahlian'] == ['Python', 'SQL'] + [str(i) for i in range(32)]
+    assert history._rebuild() == data
+
+
+def test_broken_step_is_recovered_from_a_checkpoint(monkeypatch):
+    data = cv()
+    history = EditHistory(data, coalesce=0, checkpoint_every=10)
+    edits(history, data, 25)
+    expected = copy.deepcopy(data)
+    expected['keahlian'].pop()
+    last = history._undo[-1]
+    history._undo[-1] = last._replace(ops=[Op(REMOVE, ('missing', 3), 'x', None)])
+
+    import cvbuilder.history as module
+    calls = []
+    real_apply = module.apply
+    monkeypatch.setattr(module, 'apply', lambda doc, ops: calls.append(ops) or real_apply(doc, ops))
+    assert history.undo(data)
+    assert data == expected
+    # The failed inverse, then a replay from the checkpoint after step 20: four steps.
+    assert len(calls) == 1 + 4
+    assert history.redo(data)
+    assert data == expected
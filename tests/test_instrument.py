@@ -0,0 +1,36 @@
+import json
+
+from cvbuilder.instrument import Profiler
+
+
+def rerun(profiler, session, span='analyze'):
+    trace = profiler.start_rerun(session)
+    profiler.wrap(span, lambda: None)()
+    return profiler.finish_rerun(trace)
+
+
+def test_rerun_breakdown():
+    profiler = Profiler()
+    record = rerun(profiler, 'a')
+    assert record['session'] == 'a'
+    assert record['spans']['analyze']['calls'] == 1
+    assert profiler.summary()['analyze'][0] == 1
+    assert 'cvbuilder_span_seconds_count{span="rerun"} 1' in profiler.prometheus_text()
+
+
+def test_jsonl_can_be_limited_to_one_session():
+    profiler = Profiler()
+    rerun(profiler, 'a')
+    rerun(profiler, 'b')
+    rerun(profiler, 'a')
+    assert len(profiler.jsonl().splitlines()) == 3
+    own = [json.loads(line) for line in profiler.jsonl('a').splitlines()]
+    assert [record['session'] for record in own] == ['a', 'a']
+    assert profiler.jsonl('nobody') == ''
+
+
+def test_no_log_file_without_a_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profiler = Profiler(sample_rate=1.0)
+    rerun(profiler, 'a')
+    assert list(tmp_path.iterdir()) == []
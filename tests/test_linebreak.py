@@ -0,0 +1,43 @@
+import pytest
+
+from cvbuilder.linebreak import ORPHANS, WIDOWS, Line, lead, page_split
+
+
+@pytest.mark.parametrize('remaining, fit, expected', [
+    (3, 5, 3),    # fits
+    (5, 5, 5),
+    (10, 6, 6),   # split, enough left for the next page
+    (5, 4, 3),    # only as many as leave WIDOWS behind
+    (4, 3, 2),
+    (3, 2, 0),    # taking 2 would leave a widow; taking 1 an orphan
+    (10, 1, 0),   # room for an orphan only
+    (10, 0, 0),
+])
+def test_page_split(remaining, fit, expected):
+    assert page_split(remaining, fit) == expected
+
+
+def test_page_split_keeps_widow_and_orphan_limits():
+    for remaining in range(1, 12):
+        for fit in range(0, 12):
+            take = page_split(remaining, fit)
+            assert 0 <= take <= min(remaining, fit)
+            if 0 < take < remaining:
+                assert take >= ORPHANS and remaining - take >= WIDOWS
+
+
+def paragraph(n):
+    return [Line('word', 0.5, False)] * (n - 1) + [Line('end', 0, True)]
+
+
+@pytest.mark.parametrize('lines, expected', [
+    ([], 0),
+    (paragraph(1), 1),
+    (paragraph(3), 3),                        # too short to split: all of it
+    (paragraph(3) + paragraph(5), 3),
+    (paragraph(ORPHANS + WIDOWS), ORPHANS),   # splittable: only the orphan minimum
+    (paragraph(10) + paragraph(1), ORPHANS),
+    ([Line('no end', 0, False)] * 2, 2),
+])
+def test_lead(lines, expected):
+    assert lead(lines) == expected
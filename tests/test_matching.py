@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from cvbuilder.matching import JobIndex, cv_terms, split_postings, tokenize
+from cvbuilder.templates import empty_cv_data
+
+POSTINGS = [
+    'Data Engineer: Python, SQL and Apache Spark. Experience with machine learning pipelines.',
+    'Frontend developer with React and TypeScript.',
+    'Backend engineer: Go, PostgreSQL, Kubernetes.',
+]
+
+
+def data_engineer():
+    data = empty_cv_data()
+    data['personal_info']['posisi_target'] = 'Data Engineer'
+    data['ringkasan'] = 'Building machine learning pipelines on Spark.'
+    data['keahlian'] = ['Python', 'SQL']
+    return data
+
+
+def test_tokenize_drops_stopwords_and_keeps_bigrams():
+    assert tokenize('Machine learning and the C++ language') == [
+        'machine', 'learning', 'machine learning', 'c++', 'language', 'c++ language']
+    assert 'python sql' not in tokenize('Python, SQL')
+    assert tokenize('R and C, x y') == ['r', 'c']
+    assert tokenize('node.js v2.') == ['node.js', 'v2', 'node.js v2']
+
+
+def test_skills_are_weighted_up():
+    counts = cv_terms(data_engineer(), skill_weight=3)
+    assert counts['python'] == 3 and counts['sql'] == 3
+    assert counts['spark'] == 1
+
+
+def test_split_postings():
+    assert split_postings('one\n---\ntwo\n  -----  \n\nthree\n---') == ['one', 'two', 'three']
+    assert split_postings('') == [] and split_postings(None) == []
+
+
+@pytest.mark.parametrize('method', ['bm25', 'tfidf'])
+def test_best_posting_ranks_first(method):
+    index = JobIndex(POSTINGS)
+    scores = index.score(data_engineer(), method)
+    assert scores.shape == (3,)
+    assert ((scores >= 0) & (scores <= 1)).all()
+    ranked = index.rank(data_engineer(), method)
+    assert ranked[0].index == 0 and ranked[0].score == pytest.approx(scores[0])
+    assert [match.index for match in index.rank(data_engineer(), method, top=1)] == [0]
+
+
+def test_keywords_split_matched_and_missing():
+    matched, missing = JobIndex(POSTINGS).keywords(data_engineer(), 0)
+    assert {'python', 'sql', 'spark'} <= set(matched)
+    assert 'apache' in missing and 'python' not in missing
+
+
+def test_empty_inputs():
+    assert JobIndex([]).score(data_engineer()).shape == (0,)
+    assert np.array_equal(JobIndex(POSTINGS).score(empty_cv_data()), np.zeros(3))
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match='Unknown scoring method'):
+        JobIndex(POSTINGS).score(data_engineer(), 'cosine')
@@ -0,0 +1,60 @@
+import io
+import threading
+import zipfile
+
+import pytest
+
+from cvbuilder.package import build_package, write_package
+from cvbuilder.serialize import loads
+from cvbuilder.templates import empty_cv_data
+
+
+def sample_cv():
+    data = empty_cv_data()
+    data['personal_info'].update(nama='Rina Kusuma', posisi_target='Data Engineer')
+    return data
+
+
+def fake_render(fmt, data, settings):
+    return f'{fmt} for {data["personal_info"]["nama"]}'.encode()
+
+
+def test_package_contents():
+    raw = build_package(sample_cv(), {'theme': 'dark'}, fake_render)
+    with zipfile.ZipFile(io.BytesIO(raw)) as archive:
+        names = archive.namelist()
+        assert archive.read('CV_Rina_Kusuma.pdf') == b'pdf for Rina Kusuma'
+        assert archive.read('CV_Rina_Kusuma.docx') == b'docx for Rina Kusuma'
+        backup = next(name for name in names if name.startswith('CV_Backup_'))
+        assert loads(archive.read(backup)) == (sample_cv(), {'theme': 'dark'})
+        assert 'Cover_Letter_Template_Rina_Kusuma.txt' in names
+    assert len(names) == 4
+
+
+def test_artifacts_render_concurrently():
+    both_started = threading.Barrier(2, timeout=5)
+
+    def render(fmt, data, settings):
+        both_started.wait()
+        return fmt.encode()
+
+    build_package(sample_cv(), {}, render)
+
+
+def test_render_error_propagates():
+    def render(fmt, data, settings):
+        if fmt == 'docx':
+            raise RuntimeError('docx failed')
+        return b'pdf'
+
+    with pytest.raises(RuntimeError, match='docx failed'):
+        write_package(io.BytesIO(), sample_cv(), {}, render)
+
+
+def test_compression_is_configurable():
+    def render(fmt, data, settings):
+        return b'x' * 10000
+
+    stored = build_package(sample_cv(), {}, render)
+    deflated = build_package(sample_cv(), {}, render, compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+    assert len(deflated) < len(stored)
@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from cvbuilder.pagination import MARGIN, PAGE_BREAK, TextOp, estimate_pages, plan_pages
+from cvbuilder.render import render
+from cvbuilder.templates import DEFAULT_SETTINGS, LAYOUTS, empty_cv_data
+
+
+def cv(entries):
+    data = empty_cv_data()
+    data['personal_info'].update(nama='Rina Kusuma', email='rina@example.com', posisi_target='Data Engineer')
+    data['ringkasan'] = 'Builds reliable data pipelines for analytics teams. ' * 6
+    data['pengalaman'] = [{'posisi': f'Engineer {i}', 'perusahaan': 'Acme', 'periode': '2019 - 2023', 'lokasi': '',
+                           'deskripsi': 'Designed and operated streaming jobs on Kafka and Spark. ' * 8}
+                          for i in range(entries)]
+    data['pendidikan'] = [{'institusi': 'ITB', 'gelar': 'S1', 'tahun': '2015', 'deskripsi': ''}]
+    data['keahlian'] = ['Python', 'SQL', 'Kafka', 'Spark', 'Airflow']
+    data['bahasa'] = ['Indonesia', 'English']
+    return data
+
+
+def settings(layout):
+    return dict(DEFAULT_SETTINGS, template_style=layout)
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_pages_grow_with_content(layout):
+    assert estimate_pages(empty_cv_data(), settings(layout)) == 1
+    assert estimate_pages(cv(1), settings(layout)) == 1
+    assert estimate_pages(cv(12), settings(layout)) > 1
+
+
+@pytest.mark.parametrize('layout', list(LAYOUTS))
+def test_ops_stay_inside_their_page(layout):
+    page_plan = plan_pages(cv(12), settings(layout))
+    assert [op.page for op in page_plan.ops] == sorted(op.page for op in page_plan.ops)
+    assert max(op.page for op in page_plan.ops) == page_plan.pages - 1
+    for op in page_plan.ops:
+        if isinstance(op, TextOp):
+            assert op.y + op.h <= PAGE_BREAK
+            if op.page > 0:
+                assert op.y >= MARGIN
+
+
+def test_section_title_is_kept_with_its_first_line():
+    ops = [op for op in plan_pages(cv(12), settings('classic_vertical')).ops if isinstance(op, TextOp)]
+    for title, following in zip(ops, ops[1:]):
+        if title.style == 'B' and title.text.isupper():
+            assert following.page == title.page
+
+
+@pytest.mark.parametrize('layout', ['classic_vertical', 'modern_sidebar'])
+def test_estimate_matches_rendered_pdf(layout):
+    data = cv(12)
+    pdf = render('pdf', data, settings(layout))
+    pdf = pdf.getvalue() if hasattr(pdf, 'getvalue') else pdf
+    assert len(re.findall(rb'/Type /Page\b', pdf)) == estimate_pages(data, settings(layout))
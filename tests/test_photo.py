@@ -0,0 +1,63 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from cvbuilder.photo import PhotoStore, is_ref
+
+
+def jpeg(color='red', size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PhotoStore(str(tmp_path / 'photos'))
+
+
+def test_ingest_and_resolve(store):
+    ref = store.ingest(jpeg())
+    assert is_ref(ref)
+    assert store.resolve(ref) == ref
+    assert store.read(ref)[:2] == b'\xff\xd8'
+    assert store.ingest(jpeg()) == ref
+
+
+def test_legacy_base64(store):
+    encoded = base64.b64encode(jpeg('blue')).decode('ascii')
+    ref = store.resolve(encoded)
+    assert is_ref(ref)
+    assert store.resolve('data:image/jpeg;base64,' + encoded) == ref
+
+
+@pytest.mark.parametrize('foto', [
+    None, '', 42,
+    'photo:../../etc/passwd',
+    'photo:' + '0' * 31,
+    'photo:' + 'A' * 32,
+    'photo:' + '0' * 32 + '/../x',
+    'photo:' + '0' * 32,  # well formed, but not stored
+    'not base64!',
+    base64.b64encode(b'not an image').decode('ascii'),
+])
+def test_unusable_foto(store, foto):
+    assert store.resolve(foto) is None
+
+
+def test_path_rejects_traversal(store):
+    assert store.path('photo:../../etc/passwd') is None
+    ref = store.ingest(jpeg())
+    assert os.path.dirname(store.path(ref)) == store.root
+
+
+def test_symlink_out_of_the_store(store, tmp_path):
+    os.makedirs(store.root)
+    outside = tmp_path / 'outside.jpg'
+    outside.write_bytes(jpeg())
+    ref = 'photo:' + 'ab' * 16
+    os.symlink(outside, os.path.join(store.root, 'ab' * 16 + '.jpg'))
+    assert store.resolve(ref) is None
@@ -0,0 +1,53 @@
+from cvbuilder import preview
+from cvbuilder.preview import experience_fragment, get_html_preview_enhanced
+from cvbuilder.templates import DEFAULT_SETTINGS, empty_cv_data
+
+
+def sample_cv(jobs=3):
+    data = empty_cv_data()
+    data['personal_info'].update(nama='Rina Kusuma', posisi_target='Data Engineer', email='rina@example.com')
+    data['ringkasan'] = 'Builds data pipelines.'
+    data['pengalaman'] = [{'posisi': f'Engineer {i}', 'perusahaan': f'Company {i}', 'periode': f'{2010 + i} - {2011 + i}',
+                           'deskripsi': f'Job {i}', 'lokasi': ''} for i in range(jobs)]
+    data['pendidikan'] = [{'institusi': 'Universitas Indonesia', 'gelar': 'S1', 'tahun': '2009', 'deskripsi': ''}]
+    data['keahlian'] = ['Python', 'SQL']
+    data['bahasa'] = ['Indonesia']
+    return data
+
+
+def test_preview_contains_every_section():
+    html = get_html_preview_enhanced(sample_cv(), DEFAULT_SETTINGS)
+    for text in ('Rina Kusuma', 'rina@example.com', 'Builds data pipelines.', 'Engineer 2', 'Company 0',
+                 'Universitas Indonesia', 'skill-tag">SQL', 'Indonesia'):
+        assert text in html
+    assert html.count('timeline-item"') == 4
+
+
+def test_sections_follow_the_layout_order():
+    data = sample_cv()
+    sidebar = get_html_preview_enhanced(data, dict(DEFAULT_SETTINGS, template_style='modern_sidebar'))
+    classic = get_html_preview_enhanced(data, dict(DEFAULT_SETTINGS, template_style='classic_vertical'))
+    assert sidebar.index('Skills') < sidebar.index('Work Experience')
+    assert classic.index('Work Experience') < classic.index('Skills')
+
+
+def test_editing_one_entry_rebuilds_only_that_fragment():
+    data = sample_cv(jobs=5)
+    get_html_preview_enhanced(data, DEFAULT_SETTINGS)
+    before = experience_fragment.cache_info()
+    data['pengalaman'][3]['deskripsi'] = 'Edited'
+    html = get_html_preview_enhanced(data, DEFAULT_SETTINGS)
+    after = experience_fragment.cache_info()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 4
+    assert 'Edited' in html and 'Job 3' not in html
+
+
+def test_unchanged_rerun_is_all_hits():
+    data = sample_cv()
+    get_html_preview_enhanced(data, DEFAULT_SETTINGS)
+    fragments = (preview.header_fragment, preview.summary_fragment, preview.experience_fragment,
+                 preview.education_fragment, preview.skills_fragment, preview.languages_fragment)
+    before = [f.cache_info().misses for f in fragments]
+    get_html_preview_enhanced(sample_cv(), DEFAULT_SETTINGS)
+    assert [f.cache_info().misses for f in fragments] == before
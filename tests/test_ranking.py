@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from cvbuilder.ranking import CVIndex
+from cvbuilder.templates import empty_cv_data
+
+SKILLS = ['python', 'sql', 'kafka', 'spark', 'react', 'java', 'golang', 'kubernetes', 'figma', 'excel', 'tableau',
+          'docker', 'airflow', 'terraform', 'rust', 'swift']
+TITLES = ['Data Engineer', 'Backend Developer', 'Frontend Developer', 'Product Designer', 'Data Analyst',
+          'DevOps Engineer', 'Mobile Developer']
+
+
+def make_cv(rng):
+    data = empty_cv_data()
+    data['personal_info']['posisi_target'] = rng.choice(TITLES)
+    data['keahlian'] = rng.sample(SKILLS, rng.randint(1, 6))
+    data['pengalaman'] = [{'posisi': rng.choice(TITLES), 'perusahaan': 'Acme', 'periode': '', 'lokasi': '',
+                           'deskripsi': ' '.join(rng.choices(SKILLS, k=rng.randint(0, 30)))}]
+    data['ringkasan'] = ' '.join(rng.choices(SKILLS + ['team', 'pipeline', 'dashboard'], k=rng.randint(0, 12)))
+    return data
+
+
+@pytest.fixture(scope='module')
+def index():
+    rng = random.Random(7)
+    index = CVIndex()
+    for i in range(1500):
+        index.add(f'cv{i}', make_cv(rng))
+    # Replaced and removed CVs leave tombstones that top() must skip.
+    for i in range(0, 1500, 7):
+        index.add(f'cv{i}', make_cv(rng))
+    for i in range(3, 1500, 11):
+        index.remove(f'cv{i}')
+    return index
+
+
+QUERIES = [
+    'Senior Data Engineer: python, kafka, spark, airflow pipelines',
+    'Frontend Developer react figma',
+    'rust',
+    'DevOps Engineer kubernetes terraform docker golang python sql',
+    'Data Analyst excel tableau sql dashboard team',
+    'nothing matches this',
+]
+
+
+@pytest.mark.parametrize('text', QUERIES)
+@pytest.mark.parametrize('k', [1, 5, 20])
+def test_pruning_is_exact(index, text, k):
+    pruned = index.top(text, k)
+    full = index.top(text, k, prune=False)
+    assert [m.cv_id for m in pruned] == [m.cv_id for m in full]
+    assert [m.score for m in pruned] == pytest.approx([m.score for m in full])
+
+
+def test_top_is_sorted_and_alive(index):
+    matches = index.top(QUERIES[0], 50)
+    assert len(matches) == 50
+    assert all(a.score >= b.score for a, b in zip(matches, matches[1:]))
+    assert not any(m.cv_id in {f'cv{i}' for i in range(3, 1500, 11)} for m in matches)
+    assert all(m.cv_id in index for m in matches)
+
+
+def test_queries_leave_no_scores_behind(index):
+    for text in QUERIES:
+        index.top(text, 5)
+        index.top(text, 5, prune=False)
+    assert not index._scratch.any()
+    assert len(index._scratch) >= len(index._cv_ids)
+
+
+def test_small_and_empty_index():
+    index = CVIndex()
+    assert index.top('python') == []
+    data = empty_cv_data()
+    data['keahlian'] = ['Python']
+    index.add('only', data)
+    assert [m.cv_id for m in index.top('python', 10)] == ['only']
+    assert index.top('python', 0) == []
+    index.remove('only')
+    assert index.top('python') == []
+    assert len(index) == 0
+
+
+def test_compaction_keeps_results():
+    rng = random.Random(3)
+    index = CVIndex()
+    cvs = {f'cv{i}': make_cv(rng) for i in range(3000)}
+    for cv_id, data in cvs.items():
+        index.add(cv_id, data)
+    before = index.top(QUERIES[3], 10, prune=False)
+    # Enough removals to trigger a compaction of the posting lists.
+    removed = [cv_id for cv_id in cvs if cv_id not in {m.cv_id for m in before}][:1100]
+    for cv_id in removed:
+        index.remove(cv_id)
+    rebuilt = CVIndex()
+    for cv_id, data in cvs.items():
+        if cv_id not in removed:
+            rebuilt.add(cv_id, data)
+    for text in QUERIES:
+        assert [m.cv_id for m in index.top(text, 10)] == [m.cv_id for m in rebuilt.top(text, 10)]
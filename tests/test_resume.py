@@ -0,0 +1,59 @@
+import io
+
+from docx import Document
+
+from cvbuilder.resume import heading_section, parse_lines, parse_resume
+
+LINES = ['RINA KUSUMA', 'Data Engineer', 'rina@example.com | +62 812 3456 7890 | Jakarta',
+         '💼 WORK EXPERIENCE', 'Senior Data Engineer', 'Acme Corp', 'Jan 2020 - Present', '• Built pipelines',
+         '🎓', '️ EDUCATION', 'Universitas Indonesia', 'S1 Ilmu Komputer', '2012 - 2016', '️',
+         '🛠️ SKILLS', 'Python, SQL, Kafka']
+
+
+def test_headings_ignore_emoji():
+    assert heading_section('🎓️ EDUCATION') == 'education'
+    assert heading_section('✨ Skills & Expertise') == 'skills'
+    assert heading_section('💼') is None
+
+
+def test_parse_lines():
+    data = parse_lines(LINES)
+    assert data['personal_info']['nama'] == 'Rina Kusuma'
+    assert data['personal_info']['email'] == 'rina@example.com'
+    assert [(e['posisi'], e['perusahaan'], e['periode']) for e in data['pengalaman']] == [
+        ('Senior Data Engineer', 'Acme Corp', 'Jan 2020 - Present')]
+    assert data['pengalaman'][0]['deskripsi'] == 'Built pipelines'
+    assert data['pendidikan'] == [{'institusi': 'Universitas Indonesia', 'gelar': 'S1 Ilmu Komputer',
+                                   'tahun': '2012 - 2016', 'deskripsi': ''}]
+    assert data['keahlian'] == ['Python', 'SQL', 'Kafka']
+
+
+def test_symbol_only_entries_are_dropped():
+    data = parse_lines(['EDUCATION', '★ ✦', '(2019)', 'SKILLS', 'Go'])
+    assert data['pendidikan'] == []
+
+
+def docx(lines):
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_parse_docx():
+    parsed = parse_resume(docx(LINES), 'cv.docx')
+    assert parsed.kind == 'docx' and not parsed.partial
+    assert parsed.data == parse_lines(LINES)
+
+
+def test_budget_holds_inside_one_huge_line():
+    document = Document()
+    paragraph = document.add_paragraph()
+    for _ in range(20000):
+        paragraph.add_run('word ')
+    buffer = io.BytesIO()
+    document.save(buffer)
+    parsed = parse_resume(buffer.getvalue(), 'huge.docx', budget=0)
+    assert parsed.partial
@@ -0,0 +1,125 @@
+import json
+import zlib
+
+import pytest
+
+from cvbuilder.serialize import (CVB_HEADER, CVB_MAGIC, SCHEMA_VERSION, SchemaError, dumps_binary, dumps_json,
+                                 loads)
+from cvbuilder.templates import empty_cv_data
+
+
+def sample_cv():
+    data = empty_cv_data()
+    data['personal_info'].update(nama='Rina Kusuma', email='rina@example.com', posisi_target='Data Engineer')
+    data['ringkasan'] = 'Membangun pipeline data — Ğüneş → ✉'
+    data['pengalaman'] = [{'posisi': 'Data Engineer', 'perusahaan': 'Acme', 'periode': '2019 - 2023',
+                           'deskripsi': '• Kafka\n• Spark', 'lokasi': 'Jakarta'}]
+    data['pendidikan'] = [{'institusi': 'Universitas Indonesia', 'gelar': 'S1', 'tahun': '2015', 'deskripsi': ''}]
+    data['keahlian'] = ['Python', 'SQL']
+    data['bahasa'] = ['Indonesia', 'English']
+    return data
+
+
+SETTINGS = {'template_style': 'creative', 'font_size_body': 11, 'show_icons': False, 'base_color': '#123456'}
+
+
+def test_json_round_trip():
+    data, settings = loads(dumps_json(sample_cv(), SETTINGS))
+    assert data == sample_cv()
+    assert settings == SETTINGS
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_binary_round_trip(compress):
+    raw = dumps_binary(sample_cv(), SETTINGS, compress=compress)
+    assert raw.startswith(CVB_MAGIC)
+    assert loads(raw) == (sample_cv(), SETTINGS)
+
+
+def test_loads_accepts_str():
+    assert loads(dumps_json(sample_cv()).decode('utf-8'))[0] == sample_cv()
+
+
+def test_unversioned_backup_is_migrated():
+    legacy = sample_cv()
+    legacy['keahlian'] = 'Python, SQL , '
+    legacy['personal_info']['telepon'] = 62812345
+    legacy['pengalaman'] = [{'posisi': 'Data Engineer', 'perusahaan': None}]
+    data, settings = loads(json.dumps(legacy))
+    assert data['keahlian'] == ['Python', 'SQL']
+    assert data['personal_info']['telepon'] == '62812345'
+    assert data['pengalaman'] == [{'posisi': 'Data Engineer', 'perusahaan': '', 'periode': '', 'deskripsi': '',
+                                   'lokasi': ''}]
+    assert settings == {}
+
+
+def test_current_schema_entries_get_every_field():
+    payload = {'schema': SCHEMA_VERSION, 'cv_data': {'pendidikan': [{'institusi': 'ITB'}], 'unknown': 1},
+               'settings': {'theme': 'dark', 'unknown': 1}}
+    data, settings = loads(json.dumps(payload))
+    assert data['pendidikan'] == [{'institusi': 'ITB', 'gelar': '', 'tahun': '', 'deskripsi': ''}]
+    assert 'unknown' not in data
+    assert settings == {'theme': 'dark'}
+
+
+@pytest.mark.parametrize('raw, problem', [
+    (b'{not json', 'not valid JSON'),
+    (b'[1, 2]', 'expected a JSON object'),
+    (b'{"schema": 99, "cv_data": {}}', 'newer than this app supports'),
+    (b'{"schema": 2, "cv_data": []}', 'cv_data: expected an object'),
+    (b'{"schema": 2, "cv_data": {}, "settings": [1]}', 'settings: expected an object'),
+])
+def test_bad_input(raw, problem):
+    with pytest.raises(SchemaError, match=problem):
+        loads(raw)
+
+
+@pytest.mark.parametrize('settings', [{'font_size_body': 50}, {'font_size_body': 7.5}, {'font_size_header': 200},
+                                      {'section_spacing': -1}])
+def test_numeric_settings_out_of_range(settings):
+    with pytest.raises(SchemaError, match='expected a number from'):
+        loads(json.dumps({'schema': SCHEMA_VERSION, 'cv_data': sample_cv(), 'settings': settings}))
+
+
+def test_numeric_settings_at_the_limits():
+    settings = {'font_size_body': 14, 'font_size_header': 16, 'section_spacing': 0}
+    assert loads(json.dumps({'schema': SCHEMA_VERSION, 'cv_data': sample_cv(), 'settings': settings}))[1] == settings
+
+
+def test_every_problem_is_reported():
+    data = sample_cv()
+    data['personal_info']['nama'] = 5
+    data['pengalaman'][0]['posisi'] = ['x']
+    data['keahlian'] = ['Python', 3]
+    payload = {'schema': SCHEMA_VERSION, 'cv_data': data,
+               'settings': {'template_style': 'nope', 'font_size_body': True, 'base_color': 'blue'}}
+    with pytest.raises(SchemaError) as info:
+        loads(json.dumps(payload))
+    problems = ' '.join(info.value.problems)
+    for path in ('personal_info.nama', 'pengalaman[0].posisi', 'keahlian[1]', 'settings.template_style',
+                 'settings.font_size_body', 'settings.base_color'):
+        assert path in problems
+    assert len(info.value.problems) == 6
+
+
+@pytest.mark.parametrize('foto', ['photo:../../etc/passwd', 'photo:ABC', 'not base64!'])
+def test_bad_foto(foto):
+    data = sample_cv()
+    data['personal_info']['foto'] = foto
+    with pytest.raises(SchemaError, match='personal_info.foto'):
+        loads(json.dumps({'schema': SCHEMA_VERSION, 'cv_data': data}))
+
+
+def test_bad_binary():
+    raw = dumps_binary(sample_cv(), SETTINGS)
+    with pytest.raises(SchemaError, match='truncated'):
+        loads(raw[:-1])
+    with pytest.raises(SchemaError, match='truncated'):
+        loads(raw[:CVB_HEADER.size - 1])
+    body = b'not zlib'
+    corrupt = CVB_HEADER.pack(CVB_MAGIC, SCHEMA_VERSION, 1, len(body), 0) + body
+    with pytest.raises(SchemaError, match='corrupt CVB body'):
+        loads(corrupt)
+    body = zlib.compress(b'[]')
+    with pytest.raises(SchemaError, match='expected a JSON object'):
+        loads(CVB_HEADER.pack(CVB_MAGIC, SCHEMA_VERSION, 1, len(body), 0) + body)
@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from cvbuilder.history import EditHistory
+from cvbuilder.store import EDIT_TOKEN_PATTERN, UUID_CV_ID_PATTERN, Autosaver, FileStore, anonymous_owner, new_edit_token
+from cvbuilder.templates import empty_cv_data
+
+
+@pytest.fixture
+def autosaver(tmp_path):
+    autosaver = Autosaver(FileStore(str(tmp_path / 'store')), delay=60, max_delay=60)
+    yield autosaver
+    autosaver.close()
+
+
+def test_unchanged_version_is_not_queued(autosaver):
+    cv_id, data = uuid.uuid4().hex, empty_cv_data()
+    history = EditHistory(data)
+    assert autosaver.schedule(cv_id, data, {}, None, history.version)
+    assert not autosaver.schedule(cv_id, data, {}, None, history.version)
+    assert autosaver.schedule(cv_id, data, {'theme': 'dark'}, None, history.version)
+    assert autosaver.schedule(cv_id, data, {'theme': 'dark'}, 'rina@example.com', history.version)
+    data['personal_info']['nama'] = 'Rina'
+    history.record(data)
+    assert autosaver.schedule(cv_id, data, {'theme': 'dark'}, 'rina@example.com', history.version)
+
+
+def test_write_holds_the_scheduled_content(autosaver):
+    cv_id, data = uuid.uuid4().hex, empty_cv_data()
+    data['personal_info']['nama'] = 'Rina'
+    autosaver.schedule(cv_id, data, {}, 'rina@example.com')
+    data['personal_info']['nama'] = 'edited after scheduling'
+    autosaver.flush()
+    record = autosaver.store.load(cv_id)
+    assert record.data['personal_info']['nama'] == 'Rina'
+    assert record.user_id == 'rina@example.com'
+
+
+def test_mark_saved(autosaver):
+    cv_id, data = uuid.uuid4().hex, empty_cv_data()
+    autosaver.mark_saved(cv_id, data, {}, None, 1)
+    assert not autosaver.schedule(cv_id, data, {}, None, 1)
+    autosaver.mark_saved(cv_id, data, {}, None)
+    assert not autosaver.schedule(cv_id, data, {}, None)
+    autosaver.flush()
+    assert autosaver.store.load(cv_id) is None
+
+
+def test_bad_id_is_refused(autosaver):
+    with pytest.raises(ValueError):
+        autosaver.schedule('../x', empty_cv_data(), {})
+
+
+def test_uuid_cv_ids():
+    assert UUID_CV_ID_PATTERN.match(uuid.uuid4().hex)
+    for cv_id in ('cv1', uuid.uuid4().hex.upper(), uuid.uuid1().hex, uuid.uuid4().hex + '0', '../' + '0' * 29):
+        assert not UUID_CV_ID_PATTERN.match(cv_id)
+
+
+def test_anonymous_owner_keeps_only_a_hash_of_the_token(tmp_path):
+    token = new_edit_token()
+    assert EDIT_TOKEN_PATTERN.match(token)
+    assert new_edit_token() != token
+    owner = anonymous_owner(token)
+    assert owner == anonymous_owner(token) != anonymous_owner(new_edit_token())
+    assert token not in owner and owner.startswith('anon:')
+    store = FileStore(str(tmp_path / 'store'))
+    cv_id = uuid.uuid4().hex
+    store.save(cv_id, empty_cv_data(), {}, owner)
+    assert store.load(cv_id).user_id == owner